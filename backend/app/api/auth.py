@@ -2,13 +2,22 @@
 Authentication API endpoints.
 """
 
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db, get_current_active_user
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, decode_token
+from app.core.dependencies import (
+    get_db, get_current_active_user, oauth2_scheme, db_endpoint, refresh_revocations
+)
+from app.core.security import create_access_token, create_refresh_token, decode_token, password_needs_rehash
+from app.core.hashing import PasswordHasherBusy, hash_password, check_password
+from app.core.login_guard import login_throttle, login_keys
+from app.core.revocation import revocation_store
 from app.core.config import settings
+from app.db.counters import create_counters
+from app.db.session import run_db
 from app.domain.models import User
 from app.domain.schemas import UserCreate, UserResponse, Token
 
@@ -16,56 +25,118 @@ from app.domain.schemas import UserCreate, UserResponse, Token
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Look up a user by email."""
+    return db.query(User).filter(User.email == email).first()
+
+
+def _create_user(db: Session, email: str, password_hash: str) -> User:
+    """Insert a new user row and its (zeroed) entity counters."""
+    db_user = User(email=email, password_hash=password_hash)
+    db.add(db_user)
+    db.flush()
+    create_counters(db, db_user.id)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+def _update_password_hash(db: Session, user: User, password_hash: str) -> None:
+    """Persist a new password hash for a user."""
+    user.password_hash = password_hash
+    db.commit()
+
+
+def _hasher_busy_exception(exc: PasswordHasherBusy) -> HTTPException:
+    """503 response for a saturated password hashing pool."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user.
     
     - Validates email is unique
-    - Hashes password before storage
+    - Hashes password before storage (on the bounded hashing pool)
     - Returns user data (no password)
+    - Returns 503 with Retry-After when the hashing pool is saturated
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_db(db, _get_user_by_email, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    db_user = User(
-        email=user_data.email,
-        password_hash=get_password_hash(user_data.password)
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        password_hash = await hash_password(user_data.password)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy_exception(exc)
     
-    return db_user
+    # Create new user
+    return await run_db(db, _create_user, user_data.email, password_hash)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Login user and return JWT tokens.
     
-    - Validates email/password
+    - Rejects with 429 while the account or client IP is locked out after
+      repeated failures (before any DB query or password hash)
+    - Validates email/password (on the bounded hashing pool)
+    - Rehashes the stored password if its bcrypt cost is not the configured one
     - Returns access and refresh tokens
+    - Returns 503 with Retry-After when the hashing pool is saturated
     """
+    # Cheap brute-force rejection
+    client_ip = request.client.host if request.client else "unknown"
+    throttle_keys = login_keys(form_data.username, client_ip)
+    locked_for = login_throttle.retry_after(throttle_keys)
+    if locked_for > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(locked_for))},
+        )
+    
     # Find user by email (username field is used for email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await run_db(db, _get_user_by_email, form_data.username)
+    
+    try:
+        password_ok = bool(user) and await check_password(form_data.password, user.password_hash)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy_exception(exc)
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not password_ok:
+        login_throttle.record_failure(throttle_keys)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    login_throttle.reset(throttle_keys[0])
+    
+    # Upgrade a stored hash below the configured cost; best effort
+    if password_needs_rehash(user.password_hash):
+        try:
+            new_hash = await hash_password(form_data.password)
+        except PasswordHasherBusy:
+            new_hash = None
+        if new_hash:
+            await run_db(db, _update_password_hash, user, new_hash)
+    
     # Create tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -77,18 +148,20 @@ def login(
     }
 
 
-@router.post("/refresh", response_model=Token)
+@router.post("/refresh", response_model=Token, dependencies=[Depends(refresh_revocations)])
+@db_endpoint
 def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     """
     Refresh access token using refresh token.
     
-    - Validates refresh token
+    - Validates refresh token (rejects revoked ones)
     - Issues new access and refresh tokens
+    - Revokes the presented refresh token (rotation)
     """
-    # Decode refresh token
+    # Decode refresh token (the revocation set was refreshed by the dependency)
     payload = decode_token(refresh_token)
     
-    if not payload or payload.get("type") != "refresh":
+    if not payload or payload.get("type") != "refresh" or revocation_store.is_revoked(payload.get("jti")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token"
@@ -109,6 +182,10 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
             detail="User not found"
         )
     
+    # Rotate: the presented refresh token cannot be used again
+    if payload.get("jti"):
+        revocation_store.revoke(db, payload["jti"], payload["exp"])
+    
     # Create new tokens
     new_access_token = create_access_token(data={"sub": str(user.id)})
     new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -120,6 +197,36 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@db_endpoint
+def logout(
+    refresh_token: Optional[str] = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Logout by revoking the current access token.
+    
+    - Optionally revokes a refresh token belonging to the same user
+    """
+    payload = decode_token(token)
+    if payload and payload.get("jti"):
+        revocation_store.revoke(db, payload["jti"], payload["exp"])
+    
+    if refresh_token:
+        refresh_payload = decode_token(refresh_token)
+        if (
+            refresh_payload
+            and refresh_payload.get("type") == "refresh"
+            and refresh_payload.get("sub") == str(current_user.id)
+            and refresh_payload.get("jti")
+        ):
+            revocation_store.revoke(db, refresh_payload["jti"], refresh_payload["exp"])
+    
+    return None
+
+
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Get current authenticated user information."""
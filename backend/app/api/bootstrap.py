@@ -0,0 +1,67 @@
+"""
+Session bootstrap endpoint.
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session, load_only
+from app.core.dependencies import get_read_db, get_current_active_user, db_endpoint
+from app.db.counters import get_entity_counts
+from app.domain.models import User, Note, Task, CalendarEvent, note_summary_columns, task_due_order
+from app.domain.schemas import BootstrapResponse
+
+
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"])
+
+# First-page sizes, matching the list endpoint defaults
+NOTES_PAGE_SIZE = 10
+TASKS_PAGE_SIZE = 10
+EVENTS_PAGE_SIZE = 50
+
+
+@router.get("/", response_model=BootstrapResponse)
+@db_endpoint
+def get_bootstrap(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the initial app state in a single round trip.
+    
+    - User profile
+    - Note count, task counts by status, upcoming event count
+    - First page of notes (most recently updated, as summaries without
+      content), tasks (by due date) and upcoming events (by start time)
+    """
+    now = datetime.utcnow()
+
+    notes = (
+        db.query(Note)
+        .options(load_only(*note_summary_columns()))
+        .filter(Note.user_id == current_user.id)
+        .order_by(Note.updated_at.desc(), Note.id.desc())
+        .limit(NOTES_PAGE_SIZE)
+        .all()
+    )
+    tasks = (
+        db.query(Task)
+        .filter(Task.user_id == current_user.id)
+        .order_by(*task_due_order())
+        .limit(TASKS_PAGE_SIZE)
+        .all()
+    )
+    events = (
+        db.query(CalendarEvent)
+        .filter(CalendarEvent.user_id == current_user.id, CalendarEvent.end_time >= now)
+        .order_by(CalendarEvent.start_time.asc(), CalendarEvent.id.asc())
+        .limit(EVENTS_PAGE_SIZE)
+        .all()
+    )
+
+    return {
+        "user": current_user,
+        "counts": get_entity_counts(db, current_user.id, now),
+        "notes": notes,
+        "tasks": tasks,
+        "events": events,
+    }
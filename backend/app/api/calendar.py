@@ -2,32 +2,45 @@
 Calendar Events API endpoints.
 """
 
-from typing import List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from bisect import bisect_left
+from types import SimpleNamespace
+from typing import List, Optional
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, exists, literal, or_, select, tuple_
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db, get_current_active_user
+from app.core.dependencies import get_db, get_read_db, get_current_active_user, db_endpoint
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.domain.models import User, CalendarEvent, Task
-from app.domain.schemas import CalendarEventCreate, CalendarEventUpdate, CalendarEventResponse
+from app.db.counters import adjust_counters
+from app.db.writes import Batch, insert_row, update_owned, delete_owned, prepare_batch, apply_batch
+from app.domain.schemas import (
+    CalendarEventCreate, CalendarEventUpdate, CalendarEventResponse,
+    CalendarEventBatchRequest, CalendarEventBatchResponse,
+)
 
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
 
 @router.get("/", response_model=List[CalendarEventResponse])
+@db_endpoint
 def get_events(
+    response: Response,
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get calendar events for current user.
     
     - Optional filtering by date range
-    - Supports pagination
+    - Keyset pagination via ``cursor`` (from the X-Next-Cursor header);
+      skip is kept for older clients
     - Returns only user's own events
     """
     query = db.query(CalendarEvent).filter(CalendarEvent.user_id == current_user.id)
@@ -39,15 +52,24 @@ def get_events(
         query = query.filter(CalendarEvent.end_time <= end_date)
     
     # Apply pagination and ordering
-    events = query.order_by(CalendarEvent.start_time.asc()).offset(skip).limit(limit).all()
+    query = query.order_by(CalendarEvent.start_time.asc(), CalendarEvent.id.asc())
+    if cursor:
+        start_time, event_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(tuple_(CalendarEvent.start_time, CalendarEvent.id) > (start_time, event_id))
+    else:
+        query = query.offset(skip)
+    events = query.limit(limit).all()
+    
+    set_next_cursor(response, events, limit, lambda event: (event.start_time, event.id))
     
     return events
 
 
 @router.get("/{event_id}", response_model=CalendarEventResponse)
+@db_endpoint
 def get_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific calendar event by ID with ownership validation."""
@@ -66,6 +88,7 @@ def get_event(
 
 
 @router.post("/", response_model=CalendarEventResponse, status_code=status.HTTP_201_CREATED)
+@db_endpoint
 def create_event(
     event_data: CalendarEventCreate,
     db: Session = Depends(get_db),
@@ -105,98 +128,267 @@ def create_event(
         )
     
     # Create event
-    db_event = CalendarEvent(
-        user_id=current_user.id,
-        title=event_data.title,
-        description=event_data.description,
-        start_time=event_data.start_time,
-        end_time=event_data.end_time,
-        linked_task_id=event_data.linked_task_id
-    )
-    db.add(db_event)
+    db_event = insert_row(db, CalendarEvent, {
+        "user_id": current_user.id,
+        "title": event_data.title,
+        "description": event_data.description,
+        "start_time": event_data.start_time,
+        "end_time": event_data.end_time,
+        "linked_task_id": event_data.linked_task_id or None,
+    })
+    adjust_counters(db, current_user.id, events=1)
     db.commit()
-    db.refresh(db_event)
     
     return db_event
 
+@router.post("/batch", response_model=CalendarEventBatchResponse)
+@db_endpoint
+def batch_events(
+    batch_data: CalendarEventBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete calendar events in one request and one transaction.
+    
+    - Up to BATCH_MAX_ITEMS items per list
+    - Linked tasks, time ranges and conflicts are checked in bulk before
+      anything is written (new events are checked against existing events
+      and against each other)
+    - atomic=true (default): any failed item rejects the whole batch (422)
+    - atomic=false: failed items are skipped and reported in ``errors``
+    """
+    batch = prepare_batch(
+        db, CalendarEvent, current_user.id,
+        batch_data.create, batch_data.update, batch_data.delete
+    )
+    
+    for _, values in batch.creates + batch.updates:
+        # 0 means no linked task
+        if values.get("linked_task_id") == 0:
+            values["linked_task_id"] = None
+        # Times are compared in Python below; stored times are naive UTC
+        for field in ("start_time", "end_time"):
+            if field in values:
+                values[field] = _naive_utc(values[field])
+    
+    _check_batch_links(db, batch)
+    _check_batch_time_ranges(db, batch)
+    _check_batch_conflicts(db, batch)
+    
+    if batch_data.atomic and batch.errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Batch rejected", "errors": batch.errors}
+        )
+    
+    result = apply_batch(db, CalendarEvent, batch)
+    adjust_counters(db, current_user.id, events=len(result["created"]) - len(result["deleted"]))
+    db.commit()
+    
+    return result
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC (naive values are kept as-is)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _check_batch_links(db: Session, batch: Batch) -> None:
+    """Reject items linking to tasks the user does not own (one query)."""
+    items = [
+        (op, index, values)
+        for op in ("create", "update")
+        for index, values in batch.pending(op)
+        if values.get("linked_task_id")
+    ]
+    task_ids = {values["linked_task_id"] for _, _, values in items}
+    if not task_ids:
+        return
+    owned = set(db.scalars(
+        select(Task.id).where(Task.id.in_(task_ids), Task.user_id == batch.user_id)
+    ))
+    for op, index, values in items:
+        if values["linked_task_id"] not in owned:
+            batch.reject(op, index, "Linked task not found or not owned by user", values.get("id"))
+
+
+def _check_batch_time_ranges(db: Session, batch: Batch) -> None:
+    """Reject updates whose resulting time range is empty (one query)."""
+    items = [
+        (index, values) for index, values in batch.pending("update")
+        if "start_time" in values or "end_time" in values
+    ]
+    if not items:
+        return
+    current = {
+        row.id: row for row in db.execute(
+            select(CalendarEvent.id, CalendarEvent.start_time, CalendarEvent.end_time)
+            .where(CalendarEvent.id.in_([values["id"] for _, values in items]))
+        )
+    }
+    for index, values in items:
+        row = current.get(values["id"])
+        if row is None:
+            continue  # deleted meanwhile; apply_batch reports it
+        start = values.get("start_time", row.start_time)
+        end = values.get("end_time", row.end_time)
+        if end <= start:
+            batch.reject("update", index, "end_time must be after start_time", values["id"])
+
+
+def _check_batch_conflicts(db: Session, batch: Batch) -> None:
+    """
+    Reject new events that overlap an existing event or an earlier new one.
+    
+    Existing events are loaded with one query over the batch's overall time
+    window, plus any the batch moves (events deleted in the same batch are
+    ignored), and compared at the times and titles they will have once the
+    batch's updates are applied; overlaps are then found in memory with the
+    events sorted by start time.
+    """
+    creates = sorted(batch.pending("create"), key=lambda item: item[1]["start_time"])
+    if not creates:
+        return
+    deleted = [row_id for _, row_id in batch.pending("delete")]
+    updates = {values["id"]: values for _, values in batch.pending("update")}
+    moved = [
+        row_id for row_id, values in updates.items()
+        if "start_time" in values or "end_time" in values
+    ]
+    rows = db.execute(
+        select(CalendarEvent.id, CalendarEvent.title, CalendarEvent.start_time, CalendarEvent.end_time)
+        .where(
+            CalendarEvent.user_id == batch.user_id,
+            or_(
+                and_(
+                    CalendarEvent.start_time < max(values["end_time"] for _, values in creates),
+                    CalendarEvent.end_time > creates[0][1]["start_time"],
+                ),
+                CalendarEvent.id.in_(moved),
+            ),
+            CalendarEvent.id.not_in(deleted),
+        )
+    ).all()
+    existing = sorted(
+        (
+            SimpleNamespace(**{
+                field: updates.get(row.id, {}).get(field, getattr(row, field))
+                for field in ("title", "start_time", "end_time")
+            })
+            for row in rows
+        ),
+        key=lambda row: row.start_time,
+    )
+    starts = [row.start_time for row in existing]
+    
+    accepted_last = None  # accepted new event with the latest end so far
+    for index, values in creates:
+        # Existing events starting before this one ends; any that ends after it starts overlaps
+        candidates = existing[:bisect_left(starts, values["end_time"])]
+        conflict = next(
+            (row.title for row in reversed(candidates) if row.end_time > values["start_time"]),
+            None,
+        )
+        if conflict is None and accepted_last and accepted_last["end_time"] > values["start_time"]:
+            conflict = accepted_last["title"]
+        if conflict is not None:
+            batch.reject("create", index, f"Event conflicts with existing event: {conflict}")
+        elif accepted_last is None or values["end_time"] > accepted_last["end_time"]:
+            accepted_last = values
+
 
 @router.put("/{event_id}", response_model=CalendarEventResponse)
+@db_endpoint
 def update_event(
     event_id: int,
     event_data: CalendarEventUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Update an existing calendar event with ownership validation."""
+    """
+    Update an existing calendar event with ownership validation.
+    
+    Ownership, the linked task and the time range are all checked in the
+    UPDATE's WHERE clause; the cause is only looked up when it matches nothing.
+    """
+    changes = {
+        field: value for field, value in event_data.model_dump().items() if value is not None
+    }
+    criteria = []
+    
+    # Linked task must belong to the user (0 means remove link)
+    if event_data.linked_task_id is not None:
+        if event_data.linked_task_id != 0:
+            criteria.append(_owns_task(current_user.id, event_data.linked_task_id))
+        else:
+            changes["linked_task_id"] = None
+    
+    # Resulting time range must stay valid
+    if event_data.start_time is not None or event_data.end_time is not None:
+        start = literal(event_data.start_time) if event_data.start_time is not None else CalendarEvent.start_time
+        end = literal(event_data.end_time) if event_data.end_time is not None else CalendarEvent.end_time
+        criteria.append(end > start)
+    
+    event = update_owned(db, CalendarEvent, event_id, current_user.id, changes, *criteria)
+    
+    if not event:
+        raise _update_event_error(db, event_id, current_user.id, event_data)
+    
+    db.commit()
+    
+    return event
+
+
+def _owns_task(user_id: int, task_id: int):
+    """EXISTS condition: task_id is one of the user's tasks."""
+    return exists().where(Task.id == task_id, Task.user_id == user_id)
+
+
+def _update_event_error(
+    db: Session, event_id: int, user_id: int, event_data: CalendarEventUpdate
+) -> HTTPException:
+    """Work out why an event update matched no row."""
     event = db.query(CalendarEvent).filter(
         CalendarEvent.id == event_id,
-        CalendarEvent.user_id == current_user.id
+        CalendarEvent.user_id == user_id
     ).first()
     
     if not event:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Calendar event not found"
         )
     
-    # Validate linked task if being updated
-    if event_data.linked_task_id is not None:
-        if event_data.linked_task_id != 0:  # 0 means remove link
-            linked_task = db.query(Task).filter(
-                Task.id == event_data.linked_task_id,
-                Task.user_id == current_user.id
-            ).first()
-            
-            if not linked_task:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Linked task not found or not owned by user"
-                )
-    
-    # Update fields if provided
-    if event_data.title is not None:
-        event.title = event_data.title
-    if event_data.description is not None:
-        event.description = event_data.description
-    if event_data.start_time is not None:
-        event.start_time = event_data.start_time
-    if event_data.end_time is not None:
-        event.end_time = event_data.end_time
-    if event_data.linked_task_id is not None:
-        event.linked_task_id = event_data.linked_task_id if event_data.linked_task_id != 0 else None
-    
-    # Validate time range if updated
-    if event.end_time <= event.start_time:
-        raise HTTPException(
+    if event_data.linked_task_id and not db.query(_owns_task(user_id, event_data.linked_task_id)).scalar():
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="end_time must be after start_time"
+            detail="Linked task not found or not owned by user"
         )
     
-    db.commit()
-    db.refresh(event)
-    
-    return event
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="end_time must be after start_time"
+    )
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+@db_endpoint
 def delete_event(
     event_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a calendar event with ownership validation."""
-    event = db.query(CalendarEvent).filter(
-        CalendarEvent.id == event_id,
-        CalendarEvent.user_id == current_user.id
-    ).first()
-    
-    if not event:
+    if not delete_owned(db, CalendarEvent, event_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Calendar event not found"
         )
     
-    db.delete(event)
+    adjust_counters(db, current_user.id, events=-1)
     db.commit()
     
     return None
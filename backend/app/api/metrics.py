@@ -0,0 +1,34 @@
+"""
+Runtime metrics endpoint.
+"""
+
+import secrets
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from app.core import metrics
+from app.core.config import settings
+
+
+def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """Allow only callers sending METRICS_TOKEN (no token configured = nobody)."""
+    expected = settings.METRICS_TOKEN
+    if not expected or not x_metrics_token or not secrets.compare_digest(x_metrics_token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics token required"
+        )
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/")
+async def get_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get in-process runtime metrics for this worker.
+
+    - Cache sizes and hit rates
+    - Requires the X-Metrics-Token header (METRICS_TOKEN)
+    - Counters are per worker process
+    """
+    return metrics.snapshot()
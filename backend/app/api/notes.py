@@ -2,48 +2,157 @@
 Notes API endpoints.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.dependencies import get_db, get_current_active_user
-from app.domain.models import User, Note
-from app.domain.schemas import NoteCreate, NoteUpdate, NoteResponse
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from app.core.dependencies import get_db, get_read_db, get_current_active_user, db_endpoint
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.trigrams import cached_note_suggestions, fuzzy_search_notes, index_notes, title_suggestions
+from app.domain.models import User, Note, note_summary_columns, note_summary_values
+from app.db.bodies import attach_bodies, insert_bodies, update_bodies
+from app.db.counters import adjust_counters
+from app.db.session import run_db
+from app.db.search import apply_note_search, search_terms
+from app.db.writes import insert_row, update_owned, delete_owned, prepare_batch, apply_batch
+from app.domain.schemas import (
+    NoteCreate, NoteUpdate, NoteResponse, NoteSummary, NoteBatchRequest, NoteBatchResponse,
+    NoteSuggestions,
+)
 
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
 
+def _list_notes(
+    db: Session,
+    user_id: int,
+    response: Response,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    search: Optional[str],
+    summary: bool = False,
+):
+    """Shared query for the note list endpoints (summary = without the note bodies)."""
+    query = db.query(Note).filter(Note.user_id == user_id)
+    if summary:
+        query = query.options(load_only(*note_summary_columns()))
+    else:
+        # Bodies of the returned page only: a join would also read them for skipped rows
+        query = query.options(selectinload(Note.body))
+    
+    # Full-text search: ranked by relevance instead of recency
+    if search:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search results are paged with skip, not cursor"
+            )
+        terms = search_terms(search)
+        if not terms:
+            return []
+        matches = apply_note_search(query, db.get_bind().dialect.name, terms)
+        notes = matches.offset(skip).limit(limit).all()
+        if not notes and (skip == 0 or matches.first() is None):
+            # No full-text match at all (often a typo): rank by trigram similarity
+            ids = fuzzy_search_notes(user_id, search, skip + limit)[skip:]
+            by_id = {note.id: note for note in query.filter(Note.id.in_(ids))}
+            notes = [by_id[note_id] for note_id in ids if note_id in by_id]
+        return notes
+    
+    # Apply pagination and ordering (most recently updated first)
+    query = query.order_by(Note.updated_at.desc(), Note.id.desc())
+    if cursor:
+        updated_at, note_id = decode_cursor(cursor, datetime, int)
+        query = query.filter(tuple_(Note.updated_at, Note.id) < (updated_at, note_id))
+    else:
+        query = query.offset(skip)
+    notes = query.limit(limit).all()
+    
+    set_next_cursor(response, notes, limit, lambda note: (note.updated_at, note.id))
+    
+    return notes
+
+
 @router.get("/", response_model=List[NoteResponse])
+@db_endpoint
 def get_notes(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     search: str = Query(None, max_length=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all notes for current user with pagination and search.
     
-    - Supports pagination (skip, limit)
-    - Optional search by title
+    - Keyset pagination: pass the X-Next-Cursor header of a full page as
+      ``cursor`` to get the next one (skip still works, but deep pages are slow)
+    - Optional full-text search over title and content, best matches first
+      (search results are paged with skip); without any match, notes are
+      matched by trigram similarity so typos still find them
     - Returns only user's own notes
     """
-    query = db.query(Note).filter(Note.user_id == current_user.id)
+    return _list_notes(db, current_user.id, response, skip, limit, cursor, search)
+
+
+@router.get("/summary", response_model=List[NoteSummary])
+@db_endpoint
+def get_note_summaries(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    search: str = Query(None, max_length=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Same list as GET /notes/ without content: excerpt and content length instead.
     
-    # Apply search filter if provided
-    if search:
-        query = query.filter(Note.title.ilike(f"%{search}%"))
+    - Note bodies are never read, so pages stay small for long notes
+    - Fetch a note's full content with GET /notes/{id}
+    """
+    return _list_notes(db, current_user.id, response, skip, limit, cursor, search, summary=True)
+
+
+@router.get("/suggest", response_model=NoteSuggestions)
+async def suggest_notes(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Search-as-you-type suggestions for the notes search box.
     
-    # Apply pagination and ordering
-    notes = query.order_by(Note.updated_at.desc()).offset(skip).limit(limit).all()
+    - Titles with a word starting with the prefix (titles starting with it first)
+    - Terms from the user's notes starting with the prefix, most frequent first
+    - Answered on the event loop from the per-worker in-memory note index;
+      while it is built in the background (first use), only titles starting
+      with the prefix are read from the database
+    """
+    suggestions = cached_note_suggestions(current_user.id, prefix, limit)
+    if suggestions is None:
+        titles = await run_db(db, title_suggestions, current_user.id, prefix, limit)
+        suggestions = titles, []
+    titles, terms = suggestions
     
-    return notes
+    return {
+        "titles": [{"id": note_id, "title": title} for note_id, title in titles],
+        "terms": terms,
+    }
 
 
 @router.get("/{note_id}", response_model=NoteResponse)
+@db_endpoint
 def get_note(
     note_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -52,7 +161,7 @@ def get_note(
     - Validates ownership
     - Returns 404 if not found or not owned by user
     """
-    note = db.query(Note).filter(
+    note = db.query(Note).options(joinedload(Note.body)).filter(
         Note.id == note_id,
         Note.user_id == current_user.id
     ).first()
@@ -67,6 +176,7 @@ def get_note(
 
 
 @router.post("/", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
+@db_endpoint
 def create_note(
     note_data: NoteCreate,
     db: Session = Depends(get_db),
@@ -78,19 +188,67 @@ def create_note(
     - Associates note with current user
     - Returns created note
     """
-    db_note = Note(
-        user_id=current_user.id,
-        title=note_data.title,
-        content=note_data.content
-    )
-    db.add(db_note)
+    db_note = insert_row(db, Note, {
+        "user_id": current_user.id,
+        "title": note_data.title,
+        **note_summary_values(note_data.content),
+    })
+    insert_bodies(db, [db_note], [note_data.content])
+    adjust_counters(db, current_user.id, notes=1)
     db.commit()
-    db.refresh(db_note)
+    index_notes(current_user.id, [db_note])
     
     return db_note
 
 
+@router.post("/batch", response_model=NoteBatchResponse)
+@db_endpoint
+def batch_notes(
+    batch_data: NoteBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete notes in one request and one transaction.
+    
+    - Up to BATCH_MAX_ITEMS items per list
+    - Every item is validated before anything is written
+    - atomic=true (default): any failed item rejects the whole batch (422)
+    - atomic=false: failed items are skipped and reported in ``errors``
+    """
+    batch = prepare_batch(
+        db, Note, current_user.id, batch_data.create, batch_data.update, batch_data.delete
+    )
+    if batch_data.atomic and batch.errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Batch rejected", "errors": batch.errors}
+        )
+    for _, values in batch.creates + batch.updates:
+        if "content" in values:
+            values.update(note_summary_values(values["content"]))
+    # Content goes to note_bodies, written once the notes rows exist
+    created = [values.pop("content", None) for _, values in batch.pending("create")]
+    updated = {
+        values["id"]: values.pop("content")
+        for _, values in batch.pending("update") if "content" in values
+    }
+    
+    result = apply_batch(db, Note, batch)
+    # Notes deleted by another request since prepare_batch are not updated
+    updated = {note.id: updated[note.id] for note in result["updated"] if note.id in updated}
+    insert_bodies(db, result["created"], created)
+    update_bodies(db, updated)
+    attach_bodies(db, result["updated"], updated)
+    adjust_counters(db, current_user.id, notes=len(result["created"]) - len(result["deleted"]))
+    db.commit()
+    index_notes(current_user.id, result["created"] + result["updated"], result["deleted"])
+    
+    return result
+
+
 @router.put("/{note_id}", response_model=NoteResponse)
+@db_endpoint
 def update_note(
     note_id: int,
     note_data: NoteUpdate,
@@ -104,10 +262,15 @@ def update_note(
     - Only updates provided fields
     - Returns updated note
     """
-    note = db.query(Note).filter(
-        Note.id == note_id,
-        Note.user_id == current_user.id
-    ).first()
+    # Update fields if provided (ownership is part of the UPDATE's WHERE)
+    changes = {
+        field: value for field, value in note_data.model_dump().items() if value is not None
+    }
+    content = {}
+    if "content" in changes:
+        changes.update(note_summary_values(changes["content"]))
+        content[note_id] = changes.pop("content")
+    note = update_owned(db, Note, note_id, current_user.id, changes)
     
     if not note:
         raise HTTPException(
@@ -115,19 +278,16 @@ def update_note(
             detail="Note not found"
         )
     
-    # Update fields if provided
-    if note_data.title is not None:
-        note.title = note_data.title
-    if note_data.content is not None:
-        note.content = note_data.content
-    
+    update_bodies(db, content)
+    attach_bodies(db, [note], content)
     db.commit()
-    db.refresh(note)
+    index_notes(current_user.id, [note])
     
     return note
 
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
+@db_endpoint
 def delete_note(
     note_id: int,
     db: Session = Depends(get_db),
@@ -139,18 +299,14 @@ def delete_note(
     - Validates ownership
     - Permanently removes note
     """
-    note = db.query(Note).filter(
-        Note.id == note_id,
-        Note.user_id == current_user.id
-    ).first()
-    
-    if not note:
+    if not delete_owned(db, Note, note_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found"
         )
     
-    db.delete(note)
+    adjust_counters(db, current_user.id, notes=-1)
     db.commit()
+    index_notes(current_user.id, deleted=[note_id])
     
     return None
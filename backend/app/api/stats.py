@@ -0,0 +1,29 @@
+"""
+Statistics API endpoints.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.dependencies import get_read_db, get_current_active_user, db_endpoint
+from app.db.counters import get_entity_counts
+from app.domain.models import User
+from app.domain.schemas import EntityCounts
+
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+@router.get("/counts", response_model=EntityCounts)
+@db_endpoint
+def get_counts(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the current user's entity counts.
+    
+    - Notes, tasks by status and events come from maintained counters
+      (one primary-key lookup, independent of data size)
+    - Upcoming events (not yet ended) are an indexed range count
+    """
+    return get_entity_counts(db, current_user.id)
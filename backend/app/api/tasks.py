@@ -2,30 +2,43 @@
 Tasks API endpoints.
 """
 
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, literal, select, tuple_
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db, get_current_active_user
-from app.domain.models import User, Task, TaskStatus
-from app.domain.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.core.dependencies import get_db, get_read_db, get_current_active_user, db_endpoint
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.domain.models import User, Task, TaskStatus, task_due_order
+from app.db.counters import adjust_counters, task_status_deltas
+from app.db.writes import insert_row, update_owned, delete_owned, prepare_batch, apply_batch
+from app.domain.schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskBatchRequest, TaskBatchResponse
+)
 
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
 @router.get("/", response_model=List[TaskResponse])
+@db_endpoint
 def get_tasks(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     status_filter: Optional[TaskStatus] = Query(None, alias="status"),
-    db: Session = Depends(get_db),
+    include_completed: bool = Query(True),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all tasks for current user with filtering.
     
-    - Supports pagination
-    - Optional filter by status
+    - Keyset pagination via ``cursor`` (from the X-Next-Cursor header);
+      skip is kept for older clients
+    - Optional filter by status, or include_completed=false for open tasks
+    - Ordered by due date, tasks without one last
     - Returns only user's own tasks
     """
     query = db.query(Task).filter(Task.user_id == current_user.id)
@@ -33,17 +46,39 @@ def get_tasks(
     # Apply status filter if provided
     if status_filter:
         query = query.filter(Task.status == status_filter)
+    elif not include_completed:
+        query = query.filter(Task.status != TaskStatus.COMPLETED)
     
     # Apply pagination and ordering
-    tasks = query.order_by(Task.due_date.asc().nullslast()).offset(skip).limit(limit).all()
+    query = query.order_by(*task_due_order())
+    if cursor:
+        due_date, task_id = decode_cursor(cursor, Optional[datetime], int)
+        query = query.filter(_after_task(due_date, task_id))
+    else:
+        query = query.offset(skip)
+    tasks = query.limit(limit).all()
+    
+    set_next_cursor(response, tasks, limit, lambda task: (task.due_date, task.id))
     
     return tasks
 
 
+def _after_task(due_date: Optional[datetime], task_id: int):
+    """Keyset condition: tasks after (due_date, id) in task_due_order."""
+    if due_date is None:
+        # Already among the undated tasks at the end
+        return and_(Task.due_date.is_(None), Task.id > task_id)
+    # (is_null, due_date, id) > (0, due_date, id); undated rows win on the first element
+    return tuple_(Task.due_date.is_(None), Task.due_date, Task.id) > tuple_(
+        literal(False), literal(due_date), literal(task_id)
+    )
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
+@db_endpoint
 def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific task by ID with ownership validation."""
@@ -62,27 +97,72 @@ def get_task(
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+@db_endpoint
 def create_task(
     task_data: TaskCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new task associated with current user."""
-    db_task = Task(
-        user_id=current_user.id,
-        title=task_data.title,
-        description=task_data.description,
-        due_date=task_data.due_date,
-        status=task_data.status
-    )
-    db.add(db_task)
+    db_task = insert_row(db, Task, {
+        "user_id": current_user.id,
+        "title": task_data.title,
+        "description": task_data.description,
+        "due_date": task_data.due_date,
+        "status": task_data.status,
+    })
+    adjust_counters(db, current_user.id, **task_status_deltas(added=[db_task.status]))
     db.commit()
-    db.refresh(db_task)
     
     return db_task
 
 
+@router.post("/batch", response_model=TaskBatchResponse)
+@db_endpoint
+def batch_tasks(
+    batch_data: TaskBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete tasks in one request and one transaction.
+    
+    - Up to BATCH_MAX_ITEMS items per list
+    - Every item is validated before anything is written
+    - atomic=true (default): any failed item rejects the whole batch (422)
+    - atomic=false: failed items are skipped and reported in ``errors``
+    """
+    batch = prepare_batch(
+        db, Task, current_user.id, batch_data.create, batch_data.update, batch_data.delete
+    )
+    if batch_data.atomic and batch.errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Batch rejected", "errors": batch.errors}
+        )
+    
+    # Statuses before the change, for the per-status counters (rows locked)
+    status_changed = {values["id"] for _, values in batch.pending("update") if "status" in values}
+    deleted = [row_id for _, row_id in batch.pending("delete")]
+    old_status = dict(db.execute(
+        select(Task.id, Task.status).where(Task.id.in_([*status_changed, *deleted])).with_for_update()
+    ).all()) if status_changed or deleted else {}
+    
+    result = apply_batch(db, Task, batch)
+    # Only rows actually written count; ones deleted meanwhile are missing here
+    moved = [task for task in result["updated"] if task.id in old_status and task.id in status_changed]
+    adjust_counters(db, current_user.id, **task_status_deltas(
+        added=[task.status for task in result["created"]] + [task.status for task in moved],
+        removed=[old_status[task.id] for task in moved]
+        + [old_status[task_id] for task_id in result["deleted"] if task_id in old_status],
+    ))
+    db.commit()
+    
+    return result
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
+@db_endpoint
 def update_task(
     task_id: int,
     task_data: TaskUpdate,
@@ -90,10 +170,21 @@ def update_task(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update an existing task with ownership validation."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    # Update fields if provided (ownership is part of the UPDATE's WHERE)
+    changes = {
+        field: value for field, value in task_data.model_dump().items() if value is not None
+    }
+    
+    # A status change moves the task between counters; lock the row to read its old status
+    old_status = None
+    if "status" in changes:
+        old_status = db.scalar(
+            select(Task.status)
+            .where(Task.id == task_id, Task.user_id == current_user.id)
+            .with_for_update()
+        )
+    
+    task = update_owned(db, Task, task_id, current_user.id, changes)
     
     if not task:
         raise HTTPException(
@@ -101,41 +192,30 @@ def update_task(
             detail="Task not found"
         )
     
-    # Update fields if provided
-    if task_data.title is not None:
-        task.title = task_data.title
-    if task_data.description is not None:
-        task.description = task_data.description
-    if task_data.due_date is not None:
-        task.due_date = task_data.due_date
-    if task_data.status is not None:
-        task.status = task_data.status
-    
+    if old_status is not None and old_status != task.status:
+        adjust_counters(db, current_user.id, **task_status_deltas(added=[task.status], removed=[old_status]))
     db.commit()
-    db.refresh(task)
     
     return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@db_endpoint
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a task with ownership validation."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
-    
+    # Linked calendar events are unlinked by the foreign key (ON DELETE SET NULL)
+    task = delete_owned(db, Task, task_id, current_user.id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    db.delete(task)
+    adjust_counters(db, current_user.id, **task_status_deltas(removed=[task.status]))
     db.commit()
     
     return None
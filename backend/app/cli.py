@@ -0,0 +1,190 @@
+"""
+Command-line maintenance tasks.
+
+Usage:
+    python -m app.cli calibrate-bcrypt [--target-ms 250] [--save]
+    python -m app.cli migrate [--contract]
+    python -m app.cli schema-version
+    python -m app.cli train-dictionary [--samples 1000]
+    python -m app.cli recompress [--batch-size 500]
+"""
+
+import argparse
+import sys
+
+
+def calibrate_bcrypt(args: argparse.Namespace) -> int:
+    """Measure bcrypt on this machine and print (or store for all workers) the cost."""
+    from app.core.security import calibrate_bcrypt_rounds
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+    print(f"BCRYPT_ROUNDS={rounds}")
+    if args.save:
+        from app.db.hashing import save_bcrypt_rounds
+        from app.db.session import engine
+
+        with engine.begin() as connection:
+            save_bcrypt_rounds(connection, rounds, args.target_ms)
+        print("Stored; workers use it (if above BCRYPT_ROUNDS) from their next start")
+    return 0
+
+
+def migrate(args: argparse.Namespace) -> int:
+    """Apply pending schema migrations (contract steps only with --contract)."""
+    from app.db.migrations import current_version, migrate as apply_migrations
+    from app.db.session import engine
+
+    applied = apply_migrations(engine, contract=args.contract)
+    for migration in applied:
+        print(f"{migration.version}: {migration.description}")
+    print(f"Schema at version {current_version(engine)}" + ("" if applied else " (already current)"))
+    return 0
+
+
+def schema_version(args: argparse.Namespace) -> int:
+    """Print the database's schema version and the code's head version."""
+    from app.db.migrations import HEAD, current_version, pending_migrations
+    from app.db.session import engine
+
+    version = current_version(engine)
+    print(f"database: {version}\nhead: {HEAD}")
+    if version is None:
+        return 1
+    for migration in pending_migrations(version, contract=True):
+        if migration.contract:
+            print(f"contract step pending (migrate --contract): {migration.version} {migration.description}")
+    return 1 if pending_migrations(version) else 0
+
+
+def train_dictionary(args: argparse.Namespace) -> int:
+    """Train a compression dictionary on recent notes and make it the active one."""
+    from sqlalchemy import insert, select
+    from app.db import compression
+    from app.db.session import engine
+    from app.domain.models import CompressionDictionary, NoteBody
+
+    with engine.begin() as connection:
+        samples = connection.scalars(
+            select(NoteBody.content)
+            .where(NoteBody.content.is_not(None))
+            .order_by(NoteBody.note_id.desc())
+            .limit(args.samples)
+        ).all()
+        if len(samples) < 2:
+            print("Not enough notes to train a dictionary")
+            return 1
+        data = compression.train_dictionary(samples)
+        dictionary_id = connection.scalar(
+            insert(CompressionDictionary).values(data=data).returning(CompressionDictionary.id)
+        )
+    print(f"Dictionary {dictionary_id}: {len(data)} bytes from {len(samples)} notes")
+    print("Run `python -m app.cli recompress` to apply it to existing notes")
+    return 0
+
+
+def recompress(args: argparse.Namespace) -> int:
+    """
+    Rewrite stored note content in the current NOTE_COMPRESSION mode.
+
+    Works through the notes in id order, one short transaction per batch,
+    so the app can keep serving requests. Rows already in the wanted form
+    are left untouched, and notes themselves (updated_at) never are.
+    """
+    from sqlalchemy import Text, bindparam, select, type_coerce, update
+    from app.db import compression
+    from app.db.session import engine
+    from app.domain.models import NoteBody
+
+    if engine.dialect.name != "sqlite":
+        print("Note content is only compressed on SQLite; nothing to do")
+        return 0
+    bodies = NoteBody.__table__
+    stored = type_coerce(bodies.c.content, Text)  # raw stored value, not decoded
+    rewrite = (
+        update(bodies)
+        .where(bodies.c.note_id == bindparam("b_note_id"))
+        .values(content=type_coerce(bindparam("stored"), Text))
+    )
+
+    with engine.connect() as connection:
+        compression.load_dictionaries(connection)
+    last_id, rows, rewritten, before, after = 0, 0, 0, 0, 0
+    while True:
+        with engine.begin() as connection:
+            batch = connection.execute(
+                select(bodies.c.note_id, stored)
+                .where(bodies.c.note_id > last_id, bodies.c.content.is_not(None))
+                .order_by(bodies.c.note_id)
+                .limit(args.batch_size)
+            ).all()
+            if not batch:
+                break
+            changes = []
+            for note_id, value in batch:
+                wanted = compression.encode_content(compression.note_text(value), "sqlite")
+                size = len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+                new_size = len(wanted) if isinstance(wanted, bytes) else len(wanted.encode("utf-8"))
+                before += size
+                after += new_size
+                if wanted != value:
+                    changes.append({"b_note_id": note_id, "stored": wanted})
+            if changes:
+                connection.execute(rewrite, changes)
+        rows += len(batch)
+        rewritten += len(changes)
+        last_id = batch[-1][0]
+        print(f"{rows} notes checked, {rewritten} rewritten (up to id {last_id})")
+
+    ratio = after / before if before else 1.0
+    print(f"Content: {before} -> {after} bytes ({ratio:.0%})")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Parse arguments and run the selected command."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="NoteApp maintenance tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = commands.add_parser(
+        "calibrate-bcrypt", help="Pick a bcrypt cost factor that fits a latency budget"
+    )
+    calibrate.add_argument(
+        "--target-ms", type=float, default=None,
+        help="Per-hash latency budget in milliseconds (default: BCRYPT_TARGET_MS)"
+    )
+    calibrate.add_argument(
+        "--save", action="store_true", help="Store the cost in the database for every worker"
+    )
+    calibrate.set_defaults(handler=calibrate_bcrypt)
+
+    upgrade = commands.add_parser("migrate", help="Create the schema or apply pending migrations")
+    upgrade.add_argument(
+        "--contract", action="store_true",
+        help="Also run contract steps (drop what the previous release uses) once every worker is upgraded"
+    )
+    upgrade.set_defaults(handler=migrate)
+    commands.add_parser(
+        "schema-version", help="Show the database and code schema versions (exit 1 if behind, not counting contract steps)"
+    ).set_defaults(handler=schema_version)
+
+    train = commands.add_parser(
+        "train-dictionary", help="Train a note compression dictionary on existing notes"
+    )
+    train.add_argument("--samples", type=int, default=1000, help="Number of recent notes to sample")
+    train.set_defaults(handler=train_dictionary)
+
+    rewrite = commands.add_parser(
+        "recompress", help="Rewrite stored note content in the current NOTE_COMPRESSION mode"
+    )
+    rewrite.add_argument("--batch-size", type=int, default=500, help="Notes per transaction")
+    rewrite.set_defaults(handler=recompress)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "target_ms", 0) is None:
+        from app.core.config import settings
+        args.target_ms = settings.BCRYPT_TARGET_MS
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,32 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Use asyncpg / aiosqlite through an async engine. Off by default: handlers
+    # still run their ORM code through run_sync, and on SQLite this is slower
+    # than the threadpool (see DB_ASYNC in backend/README.md)
+    DB_ASYNC: bool = False
+    DB_AUTO_MIGRATE: bool = True  # apply pending migrations on startup (else refuse to start)
+    
+    # Read replicas (comma-separated URLs; empty = primary only)
+    DATABASE_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # pin a user's reads to the primary after a write
+    
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 never recycles
+    DB_POOL_PRE_PING: bool = True  # ping on checkout; disable to rely on recycle instead
+    DB_POOL_WARMUP: bool = False  # open DB_POOL_SIZE connections at startup
+    
+    # SQLite profile (applied only when DATABASE_URL is SQLite)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64 MiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_SERIALIZE_WRITES: bool = True  # one writer at a time per process (sync mode)
     
     # Security
     SECRET_KEY: str
@@ -30,11 +56,59 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = False
+    BCRYPT_TARGET_MS: int = 250
+    
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    
+    # Login brute-force protection
+    LOGIN_FAILURE_THRESHOLD: int = 5
+    LOGIN_BACKOFF_BASE_SECONDS: float = 1.0
+    LOGIN_BACKOFF_MAX_SECONDS: float = 900.0
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 3600
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    
+    # Token revocation (how often each worker reloads the revoked set)
+    REVOCATION_REFRESH_SECONDS: int = 30
+    
+    # Verified token cache (per worker, 0 disables)
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 1800
+    
+    # Principal cache (per worker, 0 disables)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    
+    # Typo-tolerant note search: per-user trigram indexes (per worker, 0 keeps none)
+    NOTE_TRIGRAM_INDEX_USERS: int = 200
+    NOTE_TRIGRAM_INDEX_TTL_SECONDS: int = 300  # idle expiry; older indexes in use are rebuilt in the background
+    
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     
-    # Rate Limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
+    # Rate Limiting (0 disables)
+    RATE_LIMIT_PER_MINUTE: int = 60  # per user (per IP for anonymous requests)
+    RATE_LIMIT_PER_IP_PER_MINUTE: int = 600  # every request from one IP, signed in or not
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared by workers)
+    RATE_LIMIT_SQLITE_PATH: str = ""  # defaults to <tmpdir>/noteapp-ratelimit.db
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    
+    # Metrics
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""  # required in the X-Metrics-Token header
+    
+    # Batch endpoints: max items per list (create / update / delete)
+    BATCH_MAX_ITEMS: int = 500
+    
+    # Note content compression at rest (SQLite only): "none" or "zlib"
+    NOTE_COMPRESSION: str = "none"
+    NOTE_COMPRESSION_MIN_BYTES: int = 1024  # shorter content is stored as plain text
     
     class Config:
         env_file = str(ENV_FILE)
@@ -2,12 +2,18 @@
 FastAPI dependencies for authentication and database sessions.
 """
 
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import functools
+from typing import AsyncGenerator, Callable, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db.routing import pin_from_request
+from app.db.session import SessionLocal, AsyncSessionLocal, run_db
 from app.core.security import decode_token
+from app.core.principals import get_cached_principal, cache_principal
+from app.core.revocation import revocation_store
 from app.domain.models import User
 
 
@@ -15,7 +21,7 @@ from app.domain.models import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db() -> Generator:
+def get_sync_db() -> Generator:
     """
     Database session dependency.
     Yields a database session and ensures it's closed after use.
@@ -27,6 +33,77 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator:
+    """
+    Async database session dependency (DB_ASYNC mode).
+    Yields an AsyncSession and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session dependency used by every route; DB_ASYNC selects the async engine
+get_db = get_async_db if settings.DB_ASYNC else get_sync_db
+
+
+async def get_read_db(request: Request, db: Session = Depends(get_db)) -> Session:
+    """
+    Database session for read-only routes.
+    
+    Marks the request's session as read-only so its queries may be served by
+    a replica (see app.db.routing). It is the same session that
+    get_current_user uses, which records the user id for read-your-writes;
+    a pin from the client's last write (any worker) keeps it on the primary.
+    """
+    db.info["read_only"] = True
+    db.info["pinned_user_id"] = pin_from_request(request)
+    return db
+
+
+def db_endpoint(handler: Callable) -> Callable:
+    """
+    Turn a sync route handler into an async one that never blocks the loop.
+    
+    The handler is written against a sync Session passed as ``db``. With a
+    sync session it runs in the threadpool (as FastAPI would run a ``def``
+    route); with an AsyncSession it runs through ``run_sync`` on the async
+    driver, so no worker thread is held for the request.
+    
+    The session is closed as soon as the handler returns, so its connection
+    goes back to the pool without waiting for dependency teardown (which
+    would otherwise need a free threadpool slot of its own).
+    """
+    @functools.wraps(handler)
+    async def endpoint(*args, **kwargs):
+        db = kwargs.pop("db")
+        
+        def call(session):
+            try:
+                return handler(*args, db=session, **kwargs)
+            finally:
+                session.close()
+        
+        return await run_db(db, call)
+    
+    return endpoint
+
+
+async def refresh_revocations() -> None:
+    """Rebuild the revocation set when it is stale, off the event loop."""
+    if revocation_store.is_stale():
+        await run_in_threadpool(revocation_store.refresh)
+
+
+def _load_principal(db: Session, user_id: int) -> Optional[User]:
+    """Load a user row and detach it so it can be cached across requests."""
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        db.expunge(user)
+    # Return the connection to the pool before the route handler is scheduled
+    db.close()
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -34,6 +111,9 @@ async def get_current_user(
     """
     Get the current authenticated user from JWT token.
     
+    Runs on the event loop; the database lookup on a cache miss is
+    offloaded (threadpool or async driver) so it never blocks other requests.
+    
     Args:
         token: JWT access token
         db: Database session
@@ -59,20 +139,31 @@ async def get_current_user(
     if payload.get("type") != "access":
         raise credentials_exception
     
+    # Reject revoked tokens (in-memory check, periodically rebuilt)
+    await refresh_revocations()
+    if revocation_store.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    
     # Get user ID from token
     user_id: Optional[int] = payload.get("sub")
     if user_id is None:
         raise credentials_exception
     
-    # Fetch user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Resolve user from the principal cache, falling back to the database
+    user = get_cached_principal(int(user_id))
     if user is None:
-        raise credentials_exception
+        user = await run_db(db, _load_principal, int(user_id))
+        if user is None:
+            raise credentials_exception
+        cache_principal(user)
+    
+    # Lets replica routing apply the user's read-your-writes window
+    db.info["user_id"] = user.id
     
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Get current active user (can add more checks here).
     
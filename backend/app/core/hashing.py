@@ -0,0 +1,153 @@
+"""
+Bounded worker pool for password hashing.
+
+bcrypt is deliberately slow. Running it on the shared request threadpool
+lets a burst of logins starve every other endpoint, so hashing runs on a
+small dedicated executor with admission control: when all workers are busy
+and the queue is full, or a job waited in the queue longer than the
+configured timeout, callers get PasswordHasherBusy instead of piling up.
+A queued caller is rejected as soon as its wait exceeds the timeout, not
+when a worker finally picks the job up.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.core.config import settings
+from app.core import metrics
+from app.core.security import verify_password, get_password_hash, get_bcrypt_rounds
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool cannot accept or start a job in time."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class _QueueTimeout(Exception):
+    """A job sat in the queue longer than the allowed wait."""
+
+
+class PasswordHasherPool:
+    """Size-limited executor with a bounded queue and a queue-wait timeout."""
+
+    def __init__(self, max_workers: int, max_queue: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) on the pool and await the result.
+
+        Raises:
+            PasswordHasherBusy: If the queue is full or the job timed out waiting
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_full += 1
+            raise PasswordHasherBusy(self.retry_after)
+
+        enqueued_at = time.monotonic()
+
+        def job():
+            started_at = time.monotonic()
+            waited = started_at - enqueued_at
+            with self._lock:
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            if waited > self.queue_timeout:
+                raise _QueueTimeout()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._run_total += time.monotonic() - started_at
+
+        def release(finished):
+            self._slots.release()
+            with self._lock:
+                self._pending -= 1
+                if not finished.cancelled():
+                    self.completed += 1
+
+        with self._lock:
+            self._pending += 1
+            self.submitted += 1
+        future = self._executor.submit(job)
+        future.add_done_callback(release)
+        result = asyncio.wrap_future(future)
+
+        try:
+            # Only the wait for a worker is bounded; a started job runs to completion
+            try:
+                return await asyncio.wait_for(asyncio.shield(result), self.queue_timeout)
+            except asyncio.TimeoutError:
+                if future.cancel():  # still queued: drop it and free its slot now
+                    raise _QueueTimeout()
+            return await result
+        except _QueueTimeout:
+            with self._lock:
+                self.rejected_timeout += 1
+            raise PasswordHasherBusy(self.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, rejection counters and timing averages."""
+        with self._lock:
+            completed = self.completed
+            return {
+                "bcrypt_rounds": get_bcrypt_rounds(),
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "submitted": self.submitted,
+                "completed": completed,
+                "rejected_full": self.rejected_full,
+                "rejected_timeout": self.rejected_timeout,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 2) if completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2) if completed else 0.0,
+            }
+
+
+password_pool = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the bounded pool."""
+    return await password_pool.run(get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded pool."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+metrics.register("password_hashing", password_pool.stats)
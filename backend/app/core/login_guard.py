@@ -0,0 +1,85 @@
+"""
+Brute-force protection for login.
+
+Failed attempts are counted per account and per client IP in a bounded,
+expiring in-memory map. Once a key reaches the failure threshold it is
+locked out with exponential backoff, and further attempts are rejected
+before any database query or bcrypt computation.
+"""
+
+import threading
+import time
+from typing import Iterable
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core import metrics
+
+
+class LoginThrottle:
+    """Per-key failure counters with exponential lockout."""
+
+    def __init__(
+        self,
+        threshold: int,
+        base_delay: float,
+        max_delay: float,
+        maxsize: int,
+        window: float
+    ):
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # key -> (consecutive failures, locked until [monotonic])
+        self._failures = TTLCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def retry_after(self, keys: Iterable[str]) -> float:
+        """Return seconds until all keys are unlocked (0 if none are locked)."""
+        now = time.monotonic()
+        wait = 0.0
+        for key in keys:
+            entry = self._failures.get(key)
+            if entry is not None:
+                wait = max(wait, entry[1] - now)
+        if wait > 0:
+            with self._lock:
+                self.rejected += 1
+        return wait
+
+    def record_failure(self, keys: Iterable[str]) -> None:
+        """Count a failed attempt and extend the lockout once over threshold."""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                count, locked_until = self._failures.get(key, (0, 0.0))
+                count += 1
+                if count >= self.threshold:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (count - self.threshold))
+                    locked_until = now + delay
+                self._failures.set(key, (count, locked_until))
+
+    def reset(self, key: str) -> None:
+        """Forget failures for a key after a successful login."""
+        self._failures.pop(key)
+
+    def stats(self):
+        """Return tracked key count and rejection counter."""
+        return {"tracked_keys": len(self._failures), "rejected": self.rejected}
+
+
+login_throttle = LoginThrottle(
+    threshold=settings.LOGIN_FAILURE_THRESHOLD,
+    base_delay=settings.LOGIN_BACKOFF_BASE_SECONDS,
+    max_delay=settings.LOGIN_BACKOFF_MAX_SECONDS,
+    maxsize=settings.LOGIN_THROTTLE_MAX_KEYS,
+    window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
+
+
+def login_keys(email: str, client_ip: str):
+    """Throttle keys for an attempt: the account and the client IP."""
+    return (f"account:{email.strip().lower()}", f"ip:{client_ip}")
+
+
+metrics.register("login_throttle", login_throttle.stats)
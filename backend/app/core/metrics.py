@@ -0,0 +1,21 @@
+"""
+Registry of in-process runtime metrics.
+
+Components register a callable that returns a dict of counters; the
+metrics endpoint collects them into a single snapshot.
+"""
+
+from typing import Any, Callable, Dict
+
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Register a metrics provider under a section name."""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Collect current metrics from all registered providers."""
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,76 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor holds the sort key of the last row on a page (for example
+``(updated_at, id)`` for notes), JSON-encoded and base64url-wrapped. The
+next page starts strictly after that key, so the database seeks straight to
+it through the list index instead of walking and discarding ``skip`` rows.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple, get_args
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a sort key (datetimes, ints, None) as an opaque cursor."""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Any) -> Tuple[Any, ...]:
+    """
+    Decode a cursor into a sort key of the given types.
+
+    None is only accepted for keys declared ``Optional[...]`` (sort columns
+    that can be null, such as a task's due date).
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or of another endpoint
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid
+    if not isinstance(values, list) or len(values) != len(types):
+        raise invalid
+
+    key = []
+    for value, kind in zip(values, types):
+        nullable = type(None) in get_args(kind)
+        if nullable:
+            kind = next(arg for arg in get_args(kind) if arg is not type(None))
+        if value is None and nullable:
+            key.append(None)
+        elif kind is datetime and isinstance(value, str):
+            try:
+                key.append(datetime.fromisoformat(value))
+            except ValueError:
+                raise invalid
+        elif kind is int and isinstance(value, int) and not isinstance(value, bool):
+            key.append(value)
+        else:
+            raise invalid
+    return tuple(key)
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, key) -> None:
+    """
+    Send the cursor for the page after ``rows`` in the X-Next-Cursor header.
+
+    Only set when the page is full; ``key(row)`` returns the row's sort key.
+    """
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
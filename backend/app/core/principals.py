@@ -0,0 +1,45 @@
+"""
+Per-worker cache of authenticated principals.
+
+Avoids a users SELECT on every authenticated request. Entries are detached
+User instances keyed by user id, bounded by an LRU with a TTL, and dropped
+whenever the user row is updated or deleted.
+"""
+
+from typing import Optional
+from sqlalchemy import event
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core import metrics
+from app.domain.models import User
+
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_principal(user_id: int) -> Optional[User]:
+    """Return the cached user for an id, or None on a miss."""
+    return principal_cache.get(user_id)
+
+
+def cache_principal(user: User) -> None:
+    """Cache a user that has been fully loaded and detached from its session."""
+    principal_cache.set(user.id, user)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a user from the cache."""
+    principal_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """Keep the cache consistent with writes made through the ORM."""
+    invalidate_principal(target.id)
+
+
+metrics.register("principal_cache", principal_cache.stats)
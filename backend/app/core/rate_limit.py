@@ -0,0 +1,257 @@
+"""
+Token-bucket rate limiting enforcing RATE_LIMIT_PER_MINUTE.
+
+Authenticated requests are limited per user, anonymous ones per client IP,
+and every request also draws from a larger per-IP bucket
+(RATE_LIMIT_PER_IP_PER_MINUTE) so one client cannot multiply its budget by
+rotating accounts or tokens. Each check is O(1) and never touches the
+application database:
+
+- ``memory``: buckets live in a sharded, bounded in-process map (per worker)
+- ``sqlite``: buckets live in a small local SQLite file shared by every
+  uvicorn worker on the host, so limits hold across workers; buckets idle
+  long enough to be full again are deleted about once a minute, since a
+  full bucket behaves like a missing one
+"""
+
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.security import decode_token
+from app.core import metrics
+
+
+# Paths that are never rate limited (the OpenAPI schema is served outside /api/)
+EXEMPT_PATHS = ("/api/docs", "/api/redoc")
+
+
+class MemoryRateLimiter:
+    """Token buckets in a sharded in-process map with LRU eviction per shard."""
+
+    blocking = False
+
+    def __init__(self, per_minute: int, shards: int = 16, max_keys: int = 100000):
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._max_keys_per_shard = max(1, max_keys // shards)
+
+    def hit(self, key: str) -> Tuple[bool, int, float]:
+        """
+        Consume one token for key.
+
+        Returns:
+            (allowed, remaining tokens, seconds until a token is available)
+        """
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        now = time.monotonic()
+        with self._locks[index]:
+            bucket = shard.get(key)
+            if bucket is None:
+                tokens = self.capacity
+            else:
+                tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            shard[key] = (tokens, now)
+            shard.move_to_end(key)
+            if len(shard) > self._max_keys_per_shard:
+                shard.popitem(last=False)
+        return allowed, int(tokens), _retry_after(tokens, self.refill_per_second)
+
+
+class SQLiteRateLimiter:
+    """Token buckets in a local SQLite file shared across worker processes."""
+
+    blocking = True
+
+    # Seconds between deletions of idle buckets (per process)
+    prune_interval = 60.0
+
+    def __init__(self, per_minute: int, path: str):
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.path = path
+        self._local = threading.local()
+        self._next_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str) -> Tuple[bool, int, float]:
+        """Consume one token for key (see MemoryRateLimiter.hit)."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                tokens = self.capacity
+            else:
+                tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now),
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                self._prune(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, int(tokens), _retry_after(tokens, self.refill_per_second)
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete buckets that have refilled completely (the same as no row)."""
+        full_after = self.capacity / self.refill_per_second
+        conn.execute("DELETE FROM buckets WHERE updated < ?", (now - full_after,))
+
+
+def _retry_after(tokens: float, refill_per_second: float) -> float:
+    """Seconds until at least one token is available."""
+    if tokens >= 1 or refill_per_second <= 0:
+        return 0.0
+    return (1 - tokens) / refill_per_second
+
+
+def _create_limiter(per_minute: int):
+    """Build a limiter on the configured backend, or None when per_minute disables it."""
+    if per_minute <= 0:
+        return None
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        path = settings.RATE_LIMIT_SQLITE_PATH or os.path.join(
+            tempfile.gettempdir(), "noteapp-ratelimit.db"
+        )
+        return SQLiteRateLimiter(per_minute, path)
+    if settings.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(
+            f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r} (expected memory or sqlite)"
+        )
+    return MemoryRateLimiter(
+        per_minute,
+        shards=settings.RATE_LIMIT_SHARDS,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    )
+
+
+limiter = _create_limiter(settings.RATE_LIMIT_PER_MINUTE)
+ip_limiter = _create_limiter(settings.RATE_LIMIT_PER_IP_PER_MINUTE)
+_counters = {"allowed": 0, "limited": 0}
+_counters_lock = threading.Lock()
+
+
+def _client_host(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _client_key(request: Request) -> str:
+    """Key a request by authenticated user, falling back to client IP."""
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        payload: Optional[Dict[str, Any]] = decode_token(authorization[7:])
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{_client_host(request)}"
+
+
+def _buckets(request: Request) -> List[Tuple[Any, str, int]]:
+    """(limiter, key, per-minute budget) for each bucket the request draws from."""
+    buckets = []
+    if ip_limiter is not None:
+        buckets.append((ip_limiter, f"net:{_client_host(request)}", settings.RATE_LIMIT_PER_IP_PER_MINUTE))
+    if limiter is not None:
+        buckets.append((limiter, _client_key(request), settings.RATE_LIMIT_PER_MINUTE))
+    return buckets
+
+
+def _hit_buckets(buckets: List[Tuple[Any, str, int]]) -> Tuple[bool, int, int, float]:
+    """
+    Take a token from each bucket in turn, stopping at the first empty one.
+
+    Returns:
+        (allowed, limit, remaining, retry_after) of the empty bucket, else of
+        the bucket with the fewest tokens left
+    """
+    result = None
+    for bucket_limiter, key, per_minute in buckets:
+        allowed, remaining, retry_after = bucket_limiter.hit(key)
+        if result is None or not allowed or remaining < result[2]:
+            result = (allowed, per_minute, remaining, retry_after)
+        if not allowed:
+            break
+    return result
+
+
+def _count(outcome: str) -> None:
+    with _counters_lock:
+        _counters[outcome] += 1
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    """Reject API requests over the per-minute budget with 429."""
+    path = request.url.path
+    if not path.startswith("/api/") or path.startswith(EXEMPT_PATHS):
+        return await call_next(request)
+    buckets = _buckets(request)
+    if not buckets:
+        return await call_next(request)
+
+    if any(bucket_limiter.blocking for bucket_limiter, _, _ in buckets):
+        allowed, limit, remaining, retry_after = await run_in_threadpool(_hit_buckets, buckets)
+    else:
+        allowed, limit, remaining, retry_after = _hit_buckets(buckets)
+
+    headers = {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+    }
+    if not allowed:
+        _count("limited")
+        headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Rate limit exceeded"},
+            headers=headers,
+        )
+
+    _count("allowed")
+    response = await call_next(request)
+    response.headers.update(headers)
+    return response
+
+
+metrics.register("rate_limit", lambda: {
+    "backend": settings.RATE_LIMIT_BACKEND if limiter or ip_limiter else "disabled",
+    "per_minute": settings.RATE_LIMIT_PER_MINUTE,
+    "per_ip_per_minute": settings.RATE_LIMIT_PER_IP_PER_MINUTE,
+    **_counters,
+})
@@ -0,0 +1,99 @@
+"""
+Token revocation without a per-request database lookup.
+
+Revoked token ids (``jti`` claims) are stored in the small revoked_tokens
+table. Each worker keeps an in-memory set of the live entries and rebuilds
+it from the table every REVOCATION_REFRESH_SECONDS, so the per-request
+check is a set membership test. Revocations made by this worker take
+effect immediately; those made by other workers within one refresh
+interval. A rebuild keeps this worker's revocations that committed after
+its snapshot was read, so a revoke racing a refresh is never dropped.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core import metrics
+from app.db.session import SessionLocal
+from app.domain.models import RevokedToken
+
+
+class RevocationStore:
+    """In-memory view of the revoked_tokens table."""
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._revoked: Set[str] = set()
+        self._loaded_at = 0.0
+        self._refresh_lock = threading.Lock()
+        # Local revocations (jti -> monotonic time after commit) not yet
+        # known to be in a snapshot; guarded by _local_lock
+        self._local: Dict[str, float] = {}
+        self._local_lock = threading.Lock()
+        self.refreshes = 0
+
+    def is_stale(self) -> bool:
+        """Check whether the in-memory set is due for a rebuild."""
+        return time.monotonic() - self._loaded_at >= self.refresh_interval
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Check a token id against the in-memory set."""
+        return jti is not None and jti in self._revoked
+
+    def refresh(self) -> None:
+        """
+        Purge expired rows and rebuild the in-memory set from the table.
+
+        Concurrent callers skip the rebuild and keep using the current set.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            started = time.monotonic()
+            db = SessionLocal()
+            try:
+                now = datetime.utcnow()
+                db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(
+                    synchronize_session=False
+                )
+                db.commit()
+                jtis = {jti for (jti,) in db.query(RevokedToken.jti)}
+            finally:
+                db.close()
+            with self._local_lock:
+                # Revocations committed before the snapshot started are in it
+                self._local = {jti: at for jti, at in self._local.items() if at >= started}
+                self._revoked = jtis | self._local.keys()
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+        finally:
+            self._refresh_lock.release()
+
+    def revoke(self, db: Session, jti: str, exp: int) -> None:
+        """
+        Revoke a token id until its expiry timestamp.
+
+        Args:
+            db: Database session (committed by this call)
+            jti: Token id claim
+            exp: Token expiry as a Unix timestamp
+        """
+        if jti in self._revoked:
+            return
+        db.merge(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(exp)))
+        db.commit()
+        with self._local_lock:
+            self._local[jti] = time.monotonic()
+            self._revoked.add(jti)
+
+    def stats(self):
+        """Return the set size and refresh count."""
+        return {"revoked": len(self._revoked), "refreshes": self.refreshes}
+
+
+revocation_store = RevocationStore(settings.REVOCATION_REFRESH_SECONDS)
+
+metrics.register("token_revocation", revocation_store.stats)
@@ -2,11 +2,71 @@
 Security utilities: password hashing, JWT token generation/validation.
 """
 
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 import bcrypt
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core import metrics
+
+
+# bcrypt cost factor used for new hashes; may be raised by the stored calibration
+_bcrypt_rounds = settings.BCRYPT_ROUNDS
+
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+# Verified claims keyed by token digest; entries never outlive the token's exp
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+metrics.register("token_cache", token_cache.stats)
+
+
+def get_bcrypt_rounds() -> int:
+    """Return the bcrypt cost factor used for new hashes."""
+    return _bcrypt_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Set the bcrypt cost factor used for new hashes (never below BCRYPT_ROUNDS)."""
+    global _bcrypt_rounds
+    _bcrypt_rounds = max(rounds, settings.BCRYPT_ROUNDS)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = MIN_BCRYPT_ROUNDS,
+    max_rounds: int = MAX_BCRYPT_ROUNDS
+) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time fits a latency budget.
+    
+    Each extra round doubles the work, so costs are measured upwards from
+    min_rounds and the search stops at the first one over budget.
+    
+    Args:
+        target_ms: Per-hash latency budget in milliseconds
+        min_rounds: Lowest cost ever returned
+        max_rounds: Highest cost considered
+    
+    Returns:
+        Selected cost factor
+    """
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        chosen = rounds
+    return chosen
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,12 +78,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    salt = bcrypt.gensalt()
+    """Hash a password with the configured cost factor."""
+    salt = bcrypt.gensalt(rounds=_bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses a lower cost than the configured one (never downgrade)."""
+    try:
+        cost = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return cost < _bcrypt_rounds
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -42,7 +111,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -59,7 +128,7 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -68,14 +137,26 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode and validate a JWT token.
     
+    Verified claims are cached by token digest until the token expires, so a
+    token presented repeatedly costs a hash lookup instead of a signature check.
+    
     Args:
         token: JWT token to decode
     
     Returns:
         Decoded payload or None if invalid
     """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return dict(payload)
@@ -0,0 +1,472 @@
+"""
+Per-worker note index for typo-tolerant search and search-as-you-type.
+
+Each user's index has two levels: trigrams (pg_trgm style: lowercase words
+padded with two leading and one trailing space) point at the distinct words
+of the user's notes, and each word points at the notes containing it. A
+misspelled search word is matched against the vocabulary by trigram
+similarity, so the work depends on the number of distinct words rather than
+on the total length of the notes.
+
+The same index keeps the vocabulary and the title words in sorted arrays,
+so suggestions for a typed prefix are a binary search plus a short scan.
+
+Indexes are built on a background thread on a user's first fuzzy search or
+suggestion request (one build per user at a time) and updated in place by
+note writes. They are bounded by an LRU over users and dropped when unused
+for a TTL; an index in use is rebuilt in the background once it is a TTL
+old, which bounds how stale another worker's writes can leave it, and keeps
+serving until the new one is ready.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from heapq import merge, nlargest
+from math import ceil
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core import metrics
+from app.db.session import SessionLocal
+from app.domain.models import Note, NoteBody
+
+# Minimum Dice similarity between a search word and a note word
+SIMILARITY_THRESHOLD = 0.4
+
+# Most similar vocabulary words considered per search word
+MAX_WORD_MATCHES = 20
+
+# Longest a background build runs before giving up the GIL, so request
+# threads wait at most about this long for it (not the 5 ms switch interval)
+_BUILD_SLICE_SECONDS = 0.0005
+
+# Sorted runs merged by finish_build (one sort of a run is one GIL hold)
+_SORT_RUN = 1024
+
+T = TypeVar("T")
+
+# Sorts after every other character, closing a prefix range in the sorted arrays
+_PREFIX_END = "\U0010ffff"
+
+
+def _sliced(items: Iterable[T]) -> Iterator[T]:
+    """Iterate items, giving up the GIL every _BUILD_SLICE_SECONDS."""
+    slice_end = time.perf_counter() + _BUILD_SLICE_SECONDS
+    for item in items:
+        yield item
+        if time.perf_counter() >= slice_end:
+            time.sleep(0)
+            slice_end = time.perf_counter() + _BUILD_SLICE_SECONDS
+
+
+def _sorted_sliced(items: Iterable[T]) -> List[T]:
+    """sorted(items) in short runs merged in Python, so no single sort holds the GIL for long."""
+    items = list(_sliced(items))
+    runs = [sorted(items[i:i + _SORT_RUN]) for i in _sliced(range(0, len(items), _SORT_RUN))]
+    return list(_sliced(merge(*runs)))
+
+
+def words(text: Optional[str]) -> Set[str]:
+    """Distinct lowercase words of text."""
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+
+@lru_cache(maxsize=65536)
+def word_trigrams(word: str) -> FrozenSet[str]:
+    """Trigrams of one lowercase word."""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class _PrefixArray:
+    """(key, note id) pairs as parallel sorted arrays, for prefix range lookups."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, int]] = ()):
+        ordered = _sorted_sliced(pairs)
+        self._keys = [key for key, _ in _sliced(ordered)]
+        self._ids = [note_id for _, note_id in _sliced(ordered)]
+
+    def insert(self, key: str, note_id: int) -> None:
+        """Add a pair, keeping the arrays sorted."""
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._ids.insert(i, note_id)
+
+    def remove(self, key: str, note_id: int) -> None:
+        """Remove a pair."""
+        i = self._ids.index(note_id, bisect_left(self._keys, key), bisect_right(self._keys, key))
+        del self._keys[i]
+        del self._ids[i]
+
+    def ids_with_prefix(self, prefix: str) -> Set[int]:
+        """Ids of the pairs whose key starts with prefix."""
+        low = bisect_left(self._keys, prefix)
+        high = bisect_left(self._keys, prefix + _PREFIX_END)
+        return set(self._ids[low:high])
+
+
+class TrigramIndex:
+    """
+    Two-level trigram index over one user's notes (thread-safe).
+
+    The prefix arrays are filled in one go by finish_build() and kept sorted
+    by later adds and removes.
+    """
+
+    def __init__(self):
+        self._words_by_gram: Dict[str, Set[str]] = {}
+        self._notes_by_word: Dict[str, Set[int]] = {}
+        self._titles_by_word: Dict[str, Set[int]] = {}
+        self._notes: Dict[int, Tuple[Set[str], Set[str]]] = {}  # id -> (title, all) words
+        self._titles: Dict[int, str] = {}
+        self._word_counts: Dict[str, int] = {}  # notes containing each word
+        self._sorted_words: List[str] = []
+        self._title_words = _PrefixArray()
+        self._title_starts = _PrefixArray()  # lowercase full titles
+        self._built = False
+        self._lock = threading.Lock()
+
+    def finish_build(self) -> None:
+        """Sort the prefix arrays after the initial bulk load (in short GIL holds)."""
+        with self._lock:
+            self._sorted_words = _sorted_sliced(self._notes_by_word)
+            self._title_words = _PrefixArray(
+                (word, note_id) for note_id, (title_words, _) in self._notes.items() for word in title_words
+            )
+            self._title_starts = _PrefixArray(
+                (title.lower(), note_id) for note_id, title in self._titles.items()
+            )
+            self._built = True
+
+    def add(self, note_id: int, title: Optional[str], content: Optional[str]) -> None:
+        """Index a note, replacing any previous version of it."""
+        title = title or ""
+        title_words = words(title)
+        note_words = title_words | words(content)
+        with self._lock:
+            self._remove(note_id)
+            self._notes[note_id] = (title_words, note_words)
+            self._titles[note_id] = title
+            for word in note_words:
+                notes = self._notes_by_word.get(word)
+                if notes is None:
+                    notes = self._notes_by_word[word] = set()
+                    for gram in word_trigrams(word):
+                        self._words_by_gram.setdefault(gram, set()).add(word)
+                    if self._built:
+                        insort(self._sorted_words, word)
+                notes.add(note_id)
+                self._word_counts[word] = len(notes)
+            for word in title_words:
+                self._titles_by_word.setdefault(word, set()).add(note_id)
+                if self._built:
+                    self._title_words.insert(word, note_id)
+            if self._built:
+                self._title_starts.insert(title.lower(), note_id)
+
+    def remove(self, note_id: int) -> None:
+        """Drop a note from the index."""
+        with self._lock:
+            self._remove(note_id)
+
+    def _remove(self, note_id: int) -> None:
+        entry = self._notes.pop(note_id, None)
+        if entry is None:
+            return
+        title_words, note_words = entry
+        title = self._titles.pop(note_id)
+        if self._built:
+            self._title_starts.remove(title.lower(), note_id)
+        for word in title_words:
+            titles = self._titles_by_word[word]
+            titles.discard(note_id)
+            if not titles:
+                del self._titles_by_word[word]
+            if self._built:
+                self._title_words.remove(word, note_id)
+        for word in note_words:
+            notes = self._notes_by_word[word]
+            notes.discard(note_id)
+            self._word_counts[word] = len(notes)
+            if notes:
+                continue
+            del self._notes_by_word[word]
+            del self._word_counts[word]
+            if self._built:
+                del self._sorted_words[bisect_left(self._sorted_words, word)]
+            for gram in word_trigrams(word):
+                vocabulary = self._words_by_gram[gram]
+                vocabulary.discard(word)
+                if not vocabulary:
+                    del self._words_by_gram[gram]
+
+    def _similar_words(self, word: str, threshold: float) -> List[Tuple[float, str]]:
+        """Vocabulary words similar to word as (Dice similarity, word), best first."""
+        grams = word_trigrams(word)
+        # A word reaching the threshold shares at least `needed` trigrams, so it
+        # has one of the len(grams) - needed + 1 rarest: the common ones (word
+        # starts such as "  s") never need to be scanned
+        needed = max(1, ceil(threshold * len(grams) / (2 - threshold)))
+        ordered = sorted(grams, key=lambda gram: len(self._words_by_gram.get(gram, ())))
+        candidates = set().union(
+            *(self._words_by_gram.get(gram, ()) for gram in ordered[:len(grams) - needed + 1])
+        )
+        matches = []
+        for candidate in candidates:
+            other = word_trigrams(candidate)
+            similarity = 2 * len(grams & other) / (len(grams) + len(other))
+            if similarity >= threshold:
+                matches.append((similarity, candidate))
+        return nlargest(MAX_WORD_MATCHES, matches)
+
+    def search(self, text: str, limit: int, threshold: float = SIMILARITY_THRESHOLD) -> List[int]:
+        """
+        Ids of the notes most similar to text, best first.
+
+        A note scores, for each search word, the similarity of its closest
+        word to it; ties go to notes matching in the title, then newest id.
+        """
+        scores: Dict[int, float] = {}
+        title_hits: Dict[int, int] = {}
+        with self._lock:
+            for search_word in words(text):
+                best: Dict[int, float] = {}
+                for similarity, word in self._similar_words(search_word, threshold):
+                    for note_id in self._notes_by_word[word]:
+                        best.setdefault(note_id, similarity)
+                    for note_id in self._titles_by_word.get(word, ()):
+                        title_hits[note_id] = title_hits.get(note_id, 0) + 1
+                for note_id, similarity in best.items():
+                    scores[note_id] = scores.get(note_id, 0.0) + similarity
+        return nlargest(
+            limit, scores, key=lambda note_id: (scores[note_id], title_hits.get(note_id, 0), note_id)
+        )
+
+    def suggest(self, prefix: str, limit: int) -> Tuple[List[Tuple[int, str]], List[str]]:
+        """
+        Suggestions for a search being typed.
+
+        The last word of prefix is matched as a word prefix and any earlier
+        words must each start a title word too.
+
+        Returns:
+            (note id, title) pairs, titles starting with prefix first, then
+            newest; and vocabulary terms, most frequent first
+        """
+        typed = re.findall(r"\w+", prefix.lower())
+        if not typed:
+            return [], []
+        with self._lock:
+            matching = self._title_words.ids_with_prefix(typed[-1])
+            for word in typed[:-1]:
+                matching &= self._title_words.ids_with_prefix(word)
+            starting = matching & self._title_starts.ids_with_prefix(prefix.strip().lower())
+            note_ids = nlargest(limit, starting)
+            note_ids += nlargest(limit - len(note_ids), matching - starting)
+            titles = [(note_id, self._titles[note_id]) for note_id in note_ids]
+
+            low = bisect_left(self._sorted_words, typed[-1])
+            high = bisect_left(self._sorted_words, typed[-1] + _PREFIX_END)
+            terms = nlargest(limit, self._sorted_words[low:high], key=self._word_counts.__getitem__)
+        return titles, terms
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+
+class TrigramIndexCache:
+    """
+    Per-user TrigramIndex instances, built in the background and bounded by an LRU.
+
+    A miss starts one build per user on the build thread and returns None
+    (callers that may block can wait for it). Entries expire after ``ttl``
+    seconds without use; an index older than ``ttl`` keeps being served
+    while a fresh one is built to pick up other workers' writes. Writes
+    arriving during a build are replayed onto the new index before it is
+    published.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, loader: Callable[[int], Iterable[tuple]]):
+        self._indexes = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trigram-build")
+        # user id -> (build future, writes to replay); guarded by _lock
+        self._building: Dict[int, Tuple[Future, list]] = {}
+        self.builds = 0
+        self.build_errors = 0
+
+    def get(self, user_id: int) -> Optional[TrigramIndex]:
+        """Return the user's index without blocking (None while the first build runs)."""
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            self._start_build(user_id)
+            return None
+        index, built_at = entry
+        self._indexes.set(user_id, entry)  # in use: keep it
+        if time.monotonic() - built_at >= self.ttl:
+            self._start_build(user_id)
+        return index
+
+    def wait(self, user_id: int) -> Optional[TrigramIndex]:
+        """Return the user's index, waiting for a build in progress (blocks the caller)."""
+        index = self.get(user_id)
+        if index is not None:
+            return index
+        with self._lock:
+            building = self._building.get(user_id)
+        if building is not None:
+            try:
+                building[0].result()
+            except Exception:
+                return None
+        entry = self._indexes.get(user_id)
+        return entry[0] if entry else None
+
+    def _start_build(self, user_id: int) -> None:
+        with self._lock:
+            if user_id not in self._building:
+                self._building[user_id] = (self._executor.submit(self._build, user_id), [])
+
+    def _build(self, user_id: int) -> None:
+        try:
+            index = TrigramIndex()
+            for note_id, title, content in _sliced(self._loader(user_id)):
+                index.add(note_id, title, content)
+            index.finish_build()
+        except Exception:
+            with self._lock:
+                self._building.pop(user_id, None)
+                self.build_errors += 1
+            raise
+        with self._lock:
+            # Writes that committed during the build may be missing from it
+            _, writes = self._building.pop(user_id)
+            for note_id, title, content in writes:
+                if title is None:
+                    index.remove(note_id)
+                else:
+                    index.add(note_id, title, content)
+            self._indexes.set(user_id, (index, time.monotonic()))
+            self.builds += 1
+
+    def update(self, user_id: int, notes: Iterable[Note] = (), deleted: Iterable[int] = ()) -> None:
+        """Apply committed note writes to the user's cached index (if any)."""
+        writes = [(note.id, note.title or "", note.content) for note in notes]
+        writes += [(note_id, None, None) for note_id in deleted]
+        with self._lock:
+            building = self._building.get(user_id)
+            if building is not None:
+                building[1].extend(writes)
+            entry = self._indexes.get(user_id)
+        if entry is None:
+            return
+        index = entry[0]
+        for note_id, title, content in writes:
+            if title is None:
+                index.remove(note_id)
+            else:
+                index.add(note_id, title, content)
+
+    def clear(self) -> None:
+        """Drop every cached index."""
+        self._indexes.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """Return cache counters and the number of index builds."""
+        return {
+            **self._indexes.stats(),
+            "builds": self.builds,
+            "building": len(self._building),
+            "build_errors": self.build_errors,
+        }
+
+
+def _load_notes(user_id: int) -> Iterator[tuple]:
+    """(id, title, content) of every note of the user, read from the primary in batches."""
+    db = SessionLocal()
+    try:
+        yield from db.execute(
+            select(Note.id, Note.title, NoteBody.content)
+            .outerjoin(NoteBody, NoteBody.note_id == Note.id)
+            .where(Note.user_id == user_id)
+            .execution_options(yield_per=256)
+        )
+    finally:
+        db.close()
+
+
+note_trigram_indexes = TrigramIndexCache(
+    maxsize=settings.NOTE_TRIGRAM_INDEX_USERS,
+    ttl=settings.NOTE_TRIGRAM_INDEX_TTL_SECONDS,
+    loader=_load_notes,
+)
+
+
+def _on_event_loop() -> bool:
+    """Check whether the caller runs on the event loop (DB_ASYNC handlers do)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _index_for(user_id: int) -> Optional[TrigramIndex]:
+    """
+    The user's index. Handlers in the threadpool wait for its first build;
+    on the event loop it is None until the build is ready.
+    """
+    if _on_event_loop():
+        return note_trigram_indexes.get(user_id)
+    return note_trigram_indexes.wait(user_id)
+
+
+def fuzzy_search_notes(user_id: int, text: str, limit: int) -> List[int]:
+    """Ids of the user's notes most similar to text (typo-tolerant), best first."""
+    index = _index_for(user_id)
+    return index.search(text, limit) if index is not None else []
+
+
+def cached_note_suggestions(
+    user_id: int, prefix: str, limit: int
+) -> Optional[Tuple[List[Tuple[int, str]], List[str]]]:
+    """
+    Title and term suggestions for a typed prefix (see TrigramIndex.suggest),
+    or None while the user's index is not built. Never waits and never touches
+    the database, so handlers can call it on the event loop.
+    """
+    index = note_trigram_indexes.get(user_id)
+    return index.suggest(prefix, limit) if index is not None else None
+
+
+def title_suggestions(db: Session, user_id: int, prefix: str, limit: int) -> List[Tuple[int, str]]:
+    """Ids and titles of the user's notes whose title starts with prefix, newest first."""
+    if not prefix.strip():
+        return []
+    titles = db.execute(
+        select(Note.id, Note.title)
+        .where(
+            Note.user_id == user_id,
+            func.lower(Note.title).startswith(prefix.strip().lower(), autoescape=True),
+        )
+        .order_by(Note.id.desc())
+        .limit(limit)
+    ).all()
+    return [tuple(row) for row in titles]
+
+
+def index_notes(user_id: int, notes: Iterable[Note] = (), deleted: Iterable[int] = ()) -> None:
+    """Apply committed creates/updates (notes) and deletes (ids) to the user's index."""
+    note_trigram_indexes.update(user_id, notes, deleted)
+
+
+metrics.register("note_trigram_index", note_trigram_indexes.stats)
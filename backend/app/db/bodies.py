@@ -0,0 +1,47 @@
+"""
+Note content writes (the note_bodies table).
+
+Every note has exactly one note_bodies row, written in the same transaction
+as the note. The write helpers in app.db.writes only touch the narrow notes
+row; these write the matching bodies and attach them to the returned
+(detached) notes, so responses carry content without another query.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.domain.models import Note, NoteBody
+
+
+def insert_bodies(db: Session, notes: List[Note], contents: List[Optional[str]]) -> None:
+    """INSERT the bodies of new notes (contents in the same order) and attach them."""
+    rows = [{"note_id": note.id, "content": content} for note, content in zip(notes, contents)]
+    if rows:
+        db.execute(insert(NoteBody), rows)
+    for note, row in zip(notes, rows):
+        set_committed_value(note, "body", NoteBody(**row))
+
+
+def update_bodies(db: Session, contents: Dict[int, Optional[str]]) -> None:
+    """Replace the content of existing notes (one executemany UPDATE by note id)."""
+    if contents:
+        db.execute(
+            update(NoteBody).execution_options(synchronize_session=False),
+            [{"note_id": note_id, "content": content} for note_id, content in contents.items()],
+        )
+
+
+def attach_bodies(
+    db: Session, notes: Iterable[Note], known: Optional[Dict[int, Optional[str]]] = None
+) -> None:
+    """Attach bodies to detached notes: known contents as given, the rest read in one SELECT."""
+    notes = list(notes)
+    contents = dict(known or {})
+    missing = [note.id for note in notes if note.id not in contents]
+    if missing:
+        contents.update(db.execute(
+            select(NoteBody.note_id, NoteBody.content).where(NoteBody.note_id.in_(missing))
+        ).all())
+    for note in notes:
+        set_committed_value(note, "body", NoteBody(note_id=note.id, content=contents.get(note.id)))
@@ -0,0 +1,159 @@
+"""
+Transparent compression of large note content (SQLite).
+
+With NOTE_COMPRESSION=zlib, note content of at least
+NOTE_COMPRESSION_MIN_BYTES is stored as a zlib BLOB; shorter content, and
+everything written with compression off, stays plain TEXT. Reads accept
+both, so the mode can be switched at any time and existing rows converted
+with ``python -m app.cli recompress``.
+
+Compression can use a preset dictionary trained on existing notes
+(``python -m app.cli train-dictionary``). Dictionaries are kept in the
+compression_dictionaries table and every compressed value records the one
+it was written with, so older rows stay readable after retraining.
+
+Stored format (BLOB): ``b"\\x01" + zlib data`` or
+``b"\\x02" + dictionary id (4 bytes, big endian) + zlib data``.
+
+PostgreSQL already compresses large values itself (TOAST), and its
+search_vector trigger needs the plain text, so content is never
+compressed there.
+"""
+
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from sqlalchemy import Text, select
+from sqlalchemy.types import TypeDecorator
+from app.core.config import settings
+
+_PLAIN = b"\x01"
+_WITH_DICTIONARY = b"\x02"
+_DICTIONARY_ID = struct.Struct(">I")
+
+# zlib preset dictionaries are limited to the 32 KiB window
+MAX_DICTIONARY_BYTES = 32768
+_LEVEL = 6
+
+_dictionaries: Dict[int, bytes] = {}
+_active_dictionary: Optional[int] = None
+_lock = threading.Lock()
+
+
+def load_dictionaries(connection) -> None:
+    """Load every stored dictionary; the newest is used for new values."""
+    from app.domain.models import CompressionDictionary
+
+    global _active_dictionary
+    rows = connection.execute(select(CompressionDictionary.id, CompressionDictionary.data)).all()
+    with _lock:
+        _dictionaries.update({dictionary_id: bytes(data) for dictionary_id, data in rows})
+        _active_dictionary = max(_dictionaries, default=None)
+
+
+def _dictionary(dictionary_id: int) -> bytes:
+    """Return a dictionary, loading it from the database if another process added it."""
+    if dictionary_id not in _dictionaries:
+        from app.db.session import engine
+
+        with engine.connect() as connection:
+            load_dictionaries(connection)
+    return _dictionaries[dictionary_id]
+
+
+def compress(text: str) -> bytes:
+    """Compress text in the stored format, with the active dictionary if any."""
+    raw = text.encode("utf-8")
+    dictionary_id = _active_dictionary
+    if dictionary_id is None:
+        return _PLAIN + zlib.compress(raw, _LEVEL)
+    compressor = zlib.compressobj(_LEVEL, zdict=_dictionaries[dictionary_id])
+    data = compressor.compress(raw) + compressor.flush()
+    return _WITH_DICTIONARY + _DICTIONARY_ID.pack(dictionary_id) + data
+
+
+def decompress(value: bytes) -> str:
+    """Decode a value in the stored format."""
+    value = bytes(value)
+    if value[:1] == _PLAIN:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    if value[:1] == _WITH_DICTIONARY:
+        (dictionary_id,) = _DICTIONARY_ID.unpack_from(value, 1)
+        decompressor = zlib.decompressobj(zdict=_dictionary(dictionary_id))
+        return (decompressor.decompress(value[5:]) + decompressor.flush()).decode("utf-8")
+    raise ValueError("Unknown compressed content format")
+
+
+def encode_content(text: Optional[str], dialect_name: str):
+    """The stored form of content: compressed bytes when enabled and worthwhile, else text."""
+    if (
+        text is None
+        or dialect_name != "sqlite"
+        or settings.NOTE_COMPRESSION != "zlib"
+        or len(text) < settings.NOTE_COMPRESSION_MIN_BYTES  # characters <= bytes
+    ):
+        return text
+    compressed = compress(text)
+    return compressed if len(compressed) < len(text.encode("utf-8")) else text
+
+
+def note_text(value):
+    """SQL function note_text(content): the plain text of stored content (for FTS triggers)."""
+    if isinstance(value, bytes):
+        return decompress(value)
+    return value
+
+
+def register_sqlite_functions(dbapi_connection) -> None:
+    """Make note_text() available on a SQLite connection (sync or aiosqlite adapter)."""
+    dbapi_connection.create_function("note_text", 1, note_text, deterministic=True)
+
+
+class CompressedText(TypeDecorator):
+    """Text column whose large values may be stored compressed (see module docstring)."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encode_content(value, dialect.name)
+
+    def process_result_value(self, value, dialect):
+        return note_text(value)
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_BYTES) -> bytes:
+    """
+    Build a zlib preset dictionary from sample notes.
+
+    Picks the word sequences (one to four words) found in the most notes,
+    weighted by length, and places the most valuable last, where zlib
+    reaches them with the shortest distances. Repeats within one note are
+    not counted: zlib already finds those without a dictionary.
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        tokens = re.findall(r"\S+\s*", sample)
+        counts.update({
+            "".join(tokens[i:i + length])
+            for length in range(1, 5)
+            for i in range(len(tokens) - length + 1)
+        })
+
+    chosen = []
+    total = 0
+    for phrase, count in sorted(
+        counts.items(), key=lambda item: (item[1] - 1) * len(item[0]), reverse=True
+    ):
+        if count < 2 or total > size - 4:
+            break
+        encoded = phrase.encode("utf-8")
+        if len(encoded) < 4 or total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
@@ -0,0 +1,159 @@
+"""
+Per-user entity counters.
+
+Write handlers call adjust_counters in the same transaction as the change
+itself, so the user_counters row always matches the committed data and
+counts are read with a primary-key lookup instead of COUNT(*) over the
+user's rows. Upcoming events depend on the current time, so that one
+number is an index range count on (user_id, end_time).
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.domain.models import CalendarEvent, Note, Task, TaskStatus, User, UserCounters
+from app.domain.schemas import EntityCounts, TaskCounts
+
+# Counter column per task status
+TASK_STATUS_COUNTERS = {
+    TaskStatus.TODO: "tasks_todo",
+    TaskStatus.IN_PROGRESS: "tasks_in_progress",
+    TaskStatus.COMPLETED: "tasks_completed",
+}
+
+
+def task_status_deltas(
+    added: Iterable[TaskStatus] = (), removed: Iterable[TaskStatus] = ()
+) -> Dict[str, int]:
+    """Counter deltas for tasks entering (added) and leaving (removed) statuses."""
+    deltas: Dict[str, int] = {}
+    for statuses, sign in ((added, 1), (removed, -1)):
+        for task_status in statuses:
+            column = TASK_STATUS_COUNTERS[TaskStatus(task_status)]
+            deltas[column] = deltas.get(column, 0) + sign
+    return deltas
+
+
+def _actual_counts(user_id) -> Dict[str, object]:
+    """
+    Scalar subqueries computing a counters row from the data itself.
+
+    user_id is a value or a column to correlate with (see backfill_counters_statement).
+    """
+    def count(model, *criteria):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.user_id == user_id, *criteria)
+            .scalar_subquery()
+        )
+
+    values = {
+        "notes": count(Note),
+        "events": count(CalendarEvent),
+    }
+    for task_status, column in TASK_STATUS_COUNTERS.items():
+        values[column] = count(Task, Task.status == task_status)
+    return values
+
+
+def create_counters(db: Session, user_id: int) -> None:
+    """Insert a user's counters row, computed from existing data (zeros for a new user)."""
+    db.execute(insert(UserCounters).values(user_id=user_id, **_actual_counts(user_id)))
+
+
+def backfill_counters_statement():
+    """INSERT ... SELECT creating counters rows for every user that lacks one."""
+    actual = _actual_counts(User.id)
+    return insert(UserCounters).from_select(
+        ["user_id", *actual],
+        select(User.id, *actual.values()).where(
+            ~select(UserCounters.user_id).where(UserCounters.user_id == User.id).exists()
+        ),
+    )
+
+
+def adjust_counters(db: Session, user_id: int, **deltas: int) -> None:
+    """
+    Apply counter deltas inside the caller's transaction (not committed).
+
+    A user without a counters row (created before counters existed) gets one
+    computed from the data, which already includes this transaction's change;
+    two writes racing to create it both succeed (see _upsert_counters).
+    """
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    result = db.execute(
+        update(UserCounters)
+        .where(UserCounters.user_id == user_id)
+        .values({
+            getattr(UserCounters, column): getattr(UserCounters, column) + delta
+            for column, delta in deltas.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        _upsert_counters(db, user_id, deltas)
+
+
+def _upsert_counters(db: Session, user_id: int, deltas: Dict[str, int]) -> None:
+    """
+    Create a missing counters row from the data, or apply the deltas if a
+    concurrent write created it first (one INSERT ... ON CONFLICT DO UPDATE).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(UserCounters)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(UserCounters)
+    else:
+        create_counters(db, user_id)
+        return
+    db.execute(
+        statement.values(user_id=user_id, **_actual_counts(user_id)).on_conflict_do_update(
+            index_elements=[UserCounters.user_id],
+            set_={column: getattr(UserCounters, column) + delta for column, delta in deltas.items()},
+        )
+    )
+
+
+def get_entity_counts(db: Session, user_id: int, now: Optional[datetime] = None) -> EntityCounts:
+    """
+    Read a user's counts: the counters row plus an indexed count of upcoming events.
+
+    Users without a counters row yet are counted from the data (read-only;
+    the row is created by their next write).
+    """
+    now = now or datetime.utcnow()
+    upcoming = (
+        select(func.count())
+        .select_from(CalendarEvent)
+        .where(CalendarEvent.user_id == user_id, CalendarEvent.end_time >= now)
+        .scalar_subquery()
+        .label("upcoming_events")
+    )
+    columns = ("notes", "events", *TASK_STATUS_COUNTERS.values())
+    row = db.execute(
+        select(*(getattr(UserCounters, column) for column in columns), upcoming)
+        .where(UserCounters.user_id == user_id)
+    ).first()
+    if row is None:
+        actual = _actual_counts(user_id)
+        row = db.execute(
+            select(*(actual[column].label(column) for column in columns), upcoming)
+        ).one()
+
+    return EntityCounts(
+        notes=row.notes,
+        tasks=TaskCounts(
+            todo=row.tasks_todo,
+            in_progress=row.tasks_in_progress,
+            completed=row.tasks_completed,
+            total=row.tasks_todo + row.tasks_in_progress + row.tasks_completed,
+        ),
+        events=row.events,
+        upcoming_events=row.upcoming_events,
+    )
@@ -0,0 +1,48 @@
+"""
+bcrypt cost shared by every worker.
+
+Calibrating in each worker gives different answers (workers start together
+and compete for CPU), and a login served by a worker with a higher cost
+than the stored hash rewrites it. So the cost is measured once, by
+``python -m app.cli calibrate-bcrypt --save`` or by the first worker that
+starts with BCRYPT_CALIBRATE_ON_STARTUP, and kept in the bcrypt_cost table
+for every worker to load.
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from app.core.security import calibrate_bcrypt_rounds
+from app.db.migrations import locked_transaction
+from app.domain.models import BcryptCost
+
+
+def save_bcrypt_rounds(connection: Connection, rounds: int, target_ms: float) -> None:
+    """Replace the stored cost."""
+    connection.execute(BcryptCost.__table__.delete())
+    connection.execute(BcryptCost.__table__.insert().values(
+        rounds=rounds, target_ms=int(target_ms), calibrated_at=datetime.utcnow()
+    ))
+
+
+def load_bcrypt_rounds(engine: Engine, calibrate: bool, target_ms: float) -> Optional[int]:
+    """
+    Return the stored cost, measuring and storing it first if calibrate and none is stored.
+
+    A stored cost is read without locking. Only calibration runs under the
+    database-wide migration lock, so of several workers starting together
+    one calibrates and the others wait for its result (without competing
+    for CPU while it measures).
+    """
+    with engine.connect() as connection:
+        rounds = connection.scalar(select(BcryptCost.rounds))
+    if rounds is not None or not calibrate:
+        return rounds
+    with locked_transaction(engine) as connection:
+        # Another worker may have stored it while this one waited for the lock
+        rounds = connection.scalar(select(BcryptCost.rounds))
+        if rounds is None:
+            rounds = calibrate_bcrypt_rounds(target_ms)
+            save_bcrypt_rounds(connection, rounds, target_ms)
+    return rounds
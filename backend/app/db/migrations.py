@@ -0,0 +1,541 @@
+"""
+Versioned schema migrations.
+
+The applied version lives in the single-row schema_version table, so the
+startup check is one SELECT and no reflection. Schema changes run only when
+the database is behind:
+
+- Empty database: create_all from the models, then stamp the head version
+- Database created before versioning (tables but no schema_version): treated
+  as version 1 and upgraded from there
+- Otherwise: each pending migration runs in order
+
+Migrations run in a transaction that holds a database-wide lock
+(pg_advisory_xact_lock on PostgreSQL, BEGIN IMMEDIATE on SQLite), and the
+version is re-read under the lock, so workers starting together never race
+on DDL. Two kinds of step run differently:
+
+- online: a data copy that runs in its own short, committed batches outside
+  the lock, so app writers are never blocked behind it. It must be safe to
+  repeat and to run from several workers at once; the version is stamped
+  once it completes
+- contract: removes what the previous release still uses (a column that
+  old workers read or write), so it only runs on request (``migrate
+  --contract``) once every worker runs the new code. Startup treats a
+  database whose only pending steps are contract steps as current
+
+To change the schema: update the models, then append a Migration that brings
+a database at the previous version to the new one. A change that old
+workers would notice is split in two (expand/contract): an expand step the
+old and new code both work with, and a later contract step.
+"""
+
+import itertools
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional
+from sqlalchemy import Integer, bindparam, column, exists, func, inspect, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateTable
+from app.db.compression import CompressedText, load_dictionaries, register_sqlite_functions
+from app.db.counters import backfill_counters_statement
+from app.db.search import install_note_search
+from app.db.session import Base
+from app.domain import models
+from app.domain.models import SchemaVersion
+
+# Arbitrary key for pg_advisory_xact_lock
+_PG_LOCK_KEY = 7261_0001
+
+# notes.content before migration 8 moved it to note_bodies
+_legacy_notes = table("notes", column("id", Integer), column("content", CompressedText))
+
+# Rows per statement in data migrations
+_BATCH_SIZE = 1000
+
+
+class Migration(NamedTuple):
+    """
+    One schema step: upgrade takes the schema from version - 1 to version.
+
+    upgrade gets the locked migration connection, or the engine for online steps.
+    """
+    version: int
+    description: str
+    upgrade: Callable[[Any], None]
+    online: bool = False
+    contract: bool = False
+
+
+def _rebuild_index(connection: Connection, index) -> None:
+    """(Re)create an index from its model definition.
+
+    Uses DROP INDEX IF EXISTS rather than checkfirst: SQLite reflection does
+    not report expression indexes such as the task due-date ones.
+    """
+    connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    index.create(connection)
+
+
+def _list_tables():
+    return (models.Note.__table__, models.Task.__table__, models.CalendarEvent.__table__)
+
+
+def _list_indexes(connection: Connection) -> None:
+    """Composite list indexes replace the single-column user_id indexes; add revoked_tokens."""
+    models.RevokedToken.__table__.create(connection, checkfirst=True)
+    for name in ("ix_notes_user_id", "ix_tasks_user_id", "ix_calendar_events_user_id"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in _list_tables():
+        for index in table.indexes:
+            _rebuild_index(connection, index)
+
+
+def _keyset_indexes(connection: Connection) -> None:
+    """Rebuild the list indexes with id as the final key (keyset pagination)."""
+    for table in _list_tables():
+        for index in table.indexes:
+            if index.name.startswith(f"ix_{table.name}_user_"):
+                _rebuild_index(connection, index)
+
+
+def _user_counters(connection: Connection) -> None:
+    """Per-user counters table, backfilled from existing rows; index for upcoming events."""
+    models.UserCounters.__table__.create(connection, checkfirst=True)
+    connection.execute(backfill_counters_statement())
+    for index in models.CalendarEvent.__table__.indexes:
+        if index.name == "ix_calendar_events_user_end":
+            _rebuild_index(connection, index)
+
+
+# Full-text index over notes.content as migrations 5 and 6 installed it
+# (app.db.search has the note_bodies layout that replaced it)
+_LEGACY_PG_SEARCH = [
+    """
+    ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_notes_search ON notes USING GIN (search_vector)",
+]
+
+_LEGACY_SQLITE_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+    USING fts5(title, content, content='notes', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, note_text(new.content));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, note_text(old.content));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, note_text(old.content));
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, note_text(new.content));
+    END
+    """,
+    "INSERT INTO notes_fts (notes_fts) VALUES ('delete-all')",
+    "INSERT INTO notes_fts (rowid, title, content) SELECT id, title, note_text(content) FROM notes",
+]
+
+_LEGACY_SQLITE_TRIGGERS = ("notes_fts_insert", "notes_fts_delete", "notes_fts_update")
+
+
+def _legacy_note_search(connection: Connection) -> None:
+    """Full-text index on notes.title and notes.content; indexes existing rows."""
+    if connection.dialect.name == "sqlite":
+        register_sqlite_functions(connection.connection.dbapi_connection)
+    statements = {"postgresql": _LEGACY_PG_SEARCH, "sqlite": _LEGACY_SQLITE_SEARCH}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+def _compressed_content(connection: Connection) -> None:
+    """Dictionary table for compressed note content; FTS triggers read note_text(content)."""
+    models.CompressionDictionary.__table__.create(connection, checkfirst=True)
+    if connection.dialect.name == "sqlite":
+        for trigger in _LEGACY_SQLITE_TRIGGERS:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    _legacy_note_search(connection)
+
+
+def _note_summaries(connection: Connection) -> None:
+    """Excerpt and content length columns, backfilled from content in batches."""
+    notes = models.Note.__table__
+    connection.execute(text(
+        f"ALTER TABLE notes ADD COLUMN excerpt VARCHAR({models.NOTE_EXCERPT_LENGTH})"
+    ))
+    connection.execute(text("ALTER TABLE notes ADD COLUMN content_length INTEGER NOT NULL DEFAULT 0"))
+    fill = (
+        notes.update()
+        .where(notes.c.id == bindparam("note_id"))
+        .values(
+            excerpt=bindparam("excerpt"),
+            content_length=bindparam("content_length"),
+            updated_at=notes.c.updated_at,
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(_legacy_notes.c.id, _legacy_notes.c.content)
+            .where(_legacy_notes.c.id > last_id, _legacy_notes.c.content.is_not(None))
+            .order_by(_legacy_notes.c.id)
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(fill, [
+            {"note_id": note_id, **models.note_summary_values(content)} for note_id, content in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def _drop_legacy_note_search(connection: Connection) -> None:
+    """Drop the full-text index that read notes.content (migrations 5 and 6)."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS ix_notes_search"))
+        connection.execute(text("ALTER TABLE notes DROP COLUMN IF EXISTS search_vector"))
+    elif connection.dialect.name == "sqlite":
+        for trigger in _LEGACY_SQLITE_TRIGGERS:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text("DROP TABLE IF EXISTS notes_fts"))
+
+
+# Keep notes.content and note_bodies equal while both exist: old workers
+# write notes.content, new ones note_bodies. Each copy skips equal values,
+# so a write that comes back through the other trigger stops there. A note
+# inserted without content gets its body from the new code's own INSERT,
+# or from the copy and contract steps if an old worker created it.
+_PG_CONTENT_SYNC = [
+    """
+    CREATE OR REPLACE FUNCTION notes_content_to_body() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO note_bodies (note_id, content) VALUES (NEW.id, NEW.content)
+        ON CONFLICT (note_id) DO UPDATE SET content = EXCLUDED.content
+        WHERE note_bodies.content IS DISTINCT FROM EXCLUDED.content;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION note_body_to_notes() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE notes SET content = NEW.content
+        WHERE id = NEW.note_id AND content IS DISTINCT FROM NEW.content;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER notes_content_insert AFTER INSERT ON notes
+    FOR EACH ROW WHEN (NEW.content IS NOT NULL) EXECUTE FUNCTION notes_content_to_body()
+    """,
+    """
+    CREATE TRIGGER notes_content_update AFTER UPDATE OF content ON notes
+    FOR EACH ROW WHEN (OLD.content IS DISTINCT FROM NEW.content) EXECUTE FUNCTION notes_content_to_body()
+    """,
+    """
+    CREATE TRIGGER note_bodies_content AFTER INSERT OR UPDATE OF content ON note_bodies
+    FOR EACH ROW EXECUTE FUNCTION note_body_to_notes()
+    """,
+]
+
+_SQLITE_COPY_TO_BODY = """
+        INSERT INTO note_bodies (note_id, content) VALUES (new.id, new.content)
+        ON CONFLICT (note_id) DO UPDATE SET content = excluded.content
+        WHERE content IS NOT excluded.content;
+"""
+
+_SQLITE_COPY_TO_NOTE = """
+        UPDATE notes SET content = new.content WHERE id = new.note_id AND content IS NOT new.content;
+"""
+
+_SQLITE_CONTENT_SYNC = [
+    f"""
+    CREATE TRIGGER notes_content_insert AFTER INSERT ON notes
+    WHEN new.content IS NOT NULL BEGIN {_SQLITE_COPY_TO_BODY} END
+    """,
+    f"""
+    CREATE TRIGGER notes_content_update AFTER UPDATE OF content ON notes
+    WHEN new.content IS NOT old.content BEGIN {_SQLITE_COPY_TO_BODY} END
+    """,
+    f"CREATE TRIGGER note_bodies_content_insert AFTER INSERT ON note_bodies BEGIN {_SQLITE_COPY_TO_NOTE} END",
+    f"""
+    CREATE TRIGGER note_bodies_content_update AFTER UPDATE OF content ON note_bodies
+    BEGIN {_SQLITE_COPY_TO_NOTE} END
+    """,
+]
+
+_PG_CONTENT_SYNC_DROP = [
+    "DROP TRIGGER IF EXISTS notes_content_insert ON notes",
+    "DROP TRIGGER IF EXISTS notes_content_update ON notes",
+    "DROP TRIGGER IF EXISTS note_bodies_content ON note_bodies",
+    "DROP FUNCTION IF EXISTS notes_content_to_body()",
+    "DROP FUNCTION IF EXISTS note_body_to_notes()",
+]
+
+_SQLITE_CONTENT_SYNC_DROP = [
+    f"DROP TRIGGER IF EXISTS {trigger}" for trigger in (
+        "notes_content_insert", "notes_content_update",
+        "note_bodies_content_insert", "note_bodies_content_update",
+    )
+]
+
+
+def _note_bodies(connection: Connection) -> None:
+    """
+    Expand: the note_bodies table, kept equal to notes.content by triggers.
+
+    Creates no rows: existing content is copied by the next online step.
+    PostgreSQL gets the note_bodies full-text index now (its search_vector
+    is set as rows arrive); SQLite keeps the notes.content index, which
+    answers the same queries, until the contract step replaces it.
+    """
+    connection.execute(CreateTable(models.NoteBody.__table__))
+    if connection.dialect.name != "sqlite":
+        install_note_search(connection)
+    statements = {"postgresql": _PG_CONTENT_SYNC, "sqlite": _SQLITE_CONTENT_SYNC}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+def _insert_missing(connection: Connection, table):
+    """INSERT that skips rows whose primary key already exists (where supported)."""
+    if connection.dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if connection.dialect.name == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    return table.insert()
+
+
+def _missing_bodies(last_id: int, upto: int):
+    """Notes in (last_id, upto] without a note_bodies row, as (id, content)."""
+    bodies = models.NoteBody.__table__
+    return (
+        select(_legacy_notes.c.id, _legacy_notes.c.content)
+        .where(
+            _legacy_notes.c.id > last_id,
+            _legacy_notes.c.id <= upto,
+            ~exists().where(bodies.c.note_id == _legacy_notes.c.id),
+        )
+    )
+
+
+def copy_note_bodies(engine: Engine) -> int:
+    """
+    Copy notes.content into note_bodies, one committed id range at a time.
+
+    Stored values are copied as they are (compressed ones stay compressed).
+    Notes that already have a body are skipped and a body written meanwhile
+    is never overwritten, so this is safe to repeat and to run while old and
+    new workers write notes (the sync triggers cover those writes).
+
+    Returns:
+        Number of bodies created
+    """
+    copied = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            batch = (
+                select(_legacy_notes.c.id)
+                .where(_legacy_notes.c.id > last_id)
+                .order_by(_legacy_notes.c.id)
+                .limit(_BATCH_SIZE)
+                .subquery()
+            )
+            upto = connection.scalar(select(func.max(batch.c.id)))
+            if upto is None:
+                return copied
+            copied += connection.execute(
+                _insert_missing(connection, models.NoteBody.__table__)
+                .from_select(["note_id", "content"], _missing_bodies(last_id, upto))
+            ).rowcount
+        last_id = upto
+
+
+def _drop_note_content(connection: Connection) -> None:
+    """
+    Contract: drop notes.content, its sync triggers and its full-text index.
+
+    Runs once every worker is on the new code, so no one writes notes.content
+    any more; first copies the content of notes that still have no body
+    (ones old workers created without content after the copy). On SQLite
+    the note_bodies full-text index replaces the old one here and indexes
+    every note.
+    """
+    upto = connection.scalar(select(func.max(_legacy_notes.c.id))) or 0
+    connection.execute(
+        _insert_missing(connection, models.NoteBody.__table__)
+        .from_select(["note_id", "content"], _missing_bodies(0, upto))
+    )
+    statements = {"postgresql": _PG_CONTENT_SYNC_DROP, "sqlite": _SQLITE_CONTENT_SYNC_DROP}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+    _drop_legacy_note_search(connection)
+    connection.execute(text("ALTER TABLE notes DROP COLUMN content"))
+    if connection.dialect.name == "sqlite":
+        load_dictionaries(connection)  # note_text decompresses stored values
+        install_note_search(connection)
+        connection.execute(text(
+            "INSERT INTO notes_fts (rowid, title, content) "
+            "SELECT notes.id, notes.title, note_text(note_bodies.content) "
+            "FROM notes JOIN note_bodies ON note_bodies.note_id = notes.id"
+        ))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Initial schema (users, notes, tasks, calendar events)", lambda connection: None),
+    Migration(2, "Composite list indexes and revoked tokens", _list_indexes),
+    Migration(3, "Id tie-breaker in list indexes", _keyset_indexes),
+    Migration(4, "Per-user entity counters", _user_counters),
+    Migration(5, "Full-text index on note titles and content", _legacy_note_search),
+    Migration(6, "Compressed note content", _compressed_content),
+    Migration(7, "Note excerpts for list views", _note_summaries),
+    Migration(8, "Note bodies table, kept in sync with notes.content", _note_bodies),
+    Migration(
+        9, "Shared bcrypt cost",
+        lambda connection: models.BcryptCost.__table__.create(connection, checkfirst=True),
+    ),
+    Migration(10, "Copy note content to note_bodies", copy_note_bodies, online=True),
+    Migration(11, "Drop notes.content", _drop_note_content, contract=True),
+]
+
+HEAD = MIGRATIONS[-1].version
+
+
+def _read_version(connection: Connection) -> Optional[int]:
+    """Return the stamped version, 1 for a pre-versioning database, None if empty."""
+    tables = inspect(connection).get_table_names()
+    if SchemaVersion.__tablename__ in tables:
+        return connection.execute(select(SchemaVersion.version)).scalar()
+    if models.User.__tablename__ in tables:
+        return 1
+    return None
+
+
+def current_version(engine: Engine) -> Optional[int]:
+    """
+    Read the schema version with a single query.
+
+    Falls back to inspecting table names only when schema_version is missing.
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(SchemaVersion.version)).scalar()
+    except DBAPIError:
+        pass
+    with engine.connect() as connection:
+        return _read_version(connection)
+
+
+@contextmanager
+def locked_transaction(engine: Engine) -> Iterator[Connection]:
+    """Transaction holding a database-wide lock (migrations, shared one-time setup)."""
+    if engine.dialect.name == "sqlite":
+        # pysqlite would not start a transaction for DDL; take the write lock explicitly
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+            connection.exec_driver_sql("COMMIT")
+        return
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+        yield connection
+
+
+def _stamp(connection: Connection, version: int) -> None:
+    connection.execute(SchemaVersion.__table__.delete())
+    connection.execute(
+        SchemaVersion.__table__.insert().values(version=version, applied_at=datetime.utcnow())
+    )
+
+
+def pending_migrations(version: int, contract: bool = False) -> List[Migration]:
+    """Migrations after version, without contract steps unless contract is set."""
+    return [
+        migration for migration in MIGRATIONS
+        if migration.version > version and (contract or not migration.contract)
+    ]
+
+
+def migrate(engine: Engine, contract: bool = False) -> List[Migration]:
+    """
+    Bring the database schema up to HEAD (up to the first contract step unless contract is set).
+
+    Locked steps run together in one transaction; each online step runs
+    outside the lock and is stamped when it completes.
+
+    Returns:
+        The migrations that were applied (empty if already current)
+    """
+    applied: List[Migration] = []
+    while True:
+        with locked_transaction(engine) as connection:
+            version = _read_version(connection)
+            if version is None:
+                Base.metadata.create_all(connection)
+                _stamp(connection, HEAD)
+                return list(MIGRATIONS)
+            if version > HEAD:
+                raise RuntimeError(
+                    f"Database schema version {version} is newer than this code (head {HEAD})"
+                )
+            pending = pending_migrations(version, contract)
+            if not pending:
+                return applied
+            SchemaVersion.__table__.create(connection, checkfirst=True)
+            locked = list(itertools.takewhile(lambda migration: not migration.online, pending))
+            for migration in locked:
+                migration.upgrade(connection)
+            if locked:
+                _stamp(connection, locked[-1].version)
+                applied += locked
+                continue
+        online = pending[0]
+        online.upgrade(engine)
+        with locked_transaction(engine) as connection:
+            # Another worker may have finished the same step meanwhile
+            if _read_version(connection) < online.version:
+                _stamp(connection, online.version)
+        applied.append(online)
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool) -> None:
+    """
+    Startup check: one SELECT when the schema is current.
+
+    A database whose only pending migrations are contract steps counts as current.
+
+    Raises:
+        RuntimeError: If the schema is behind and auto_migrate is off
+    """
+    version = current_version(engine)
+    if version is not None and not pending_migrations(version):
+        return
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {HEAD}. "
+            "Run `python -m app.cli migrate` or set DB_AUTO_MIGRATE=True."
+        )
+    migrate(engine)
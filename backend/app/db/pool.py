@@ -0,0 +1,115 @@
+"""
+Connection pool configuration, instrumentation and warm-up.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+
+
+# Checkout wait statistics per pool (keyed by pool logging name)
+_wait_stats: Dict[str, Dict[str, float]] = {}
+_wait_lock = threading.Lock()
+
+
+def _record_wait(name: str, waited: float, timed_out: bool) -> None:
+    with _wait_lock:
+        stats = _wait_stats.setdefault(
+            name, {"checkouts": 0, "wait_total": 0.0, "wait_max": 0.0, "timeouts": 0}
+        )
+        stats["checkouts"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        if timed_out:
+            stats["timeouts"] += 1
+
+
+class _TimedCheckoutMixin:
+    """Measure how long callers wait for a pooled connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            _record_wait(self.logging_name or "default", time.perf_counter() - start, timed_out)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool that records checkout wait time."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait time."""
+
+
+def pool_options(url: str, name: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Engine keyword arguments for the configured pool.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_logging_name=name,
+    )
+    return options
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Return live connection counts and checkout wait times for an engine."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    with _wait_lock:
+        waits = dict(_wait_stats.get(pool.logging_name or "default", {}))
+    if waits:
+        checkouts = waits["checkouts"]
+        stats.update(
+            checkouts=checkouts,
+            avg_wait_ms=round(waits["wait_total"] / checkouts * 1000, 3),
+            max_wait_ms=round(waits["wait_max"] * 1000, 3),
+            timeouts=waits["timeouts"],
+        )
+    return stats
+
+
+def warm_pool(engine, size: int) -> None:
+    """Open `size` connections at once so the pool is full before traffic."""
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warm_async_pool(engine, size: int) -> None:
+    """Async counterpart of warm_pool."""
+    connections = await asyncio.gather(*(engine.connect().start() for _ in range(size)))
+    await asyncio.gather(*(connection.close() for connection in connections))
@@ -0,0 +1,149 @@
+"""
+Read-replica routing with read-your-writes.
+
+Sessions marked read-only (see get_read_db) send their queries to a
+replica, chosen at random, once the requesting user is known. Everything
+else goes to the primary: writes, flushes, sessions without a user, and
+users who committed a write within READ_YOUR_WRITES_SECONDS, so a user
+never reads stale data right after saving.
+
+The window travels with the client, so it holds whichever worker serves
+the next read: a request that commits a write answers with a signed pin
+(user id and write time) in the ``rw_pin`` cookie and the X-Read-Your-Writes
+header, and get_read_db accepts it back from either. Writes seen by this
+worker are also remembered in-process for clients that send neither.
+"""
+
+import base64
+import hashlib
+import hmac
+import math
+import random
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core import metrics
+
+
+# Users who committed a write recently -> pinned to the primary
+recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+_counters = {"primary_reads": 0, "replica_reads": 0}
+
+PIN_COOKIE = "rw_pin"
+PIN_HEADER = "X-Read-Your-Writes"
+
+# Per request: filled by after_commit when the request wrote, so the
+# middleware can hand the pin to the client (a dict, shared with the
+# threadpool / run_sync copies of the context)
+_request_writes: ContextVar[Optional[dict]] = ContextVar("request_writes", default=None)
+
+
+def replica_urls() -> List[str]:
+    """Parse DATABASE_REPLICA_URLS (comma-separated)."""
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+class RoutingSession(Session):
+    """Session that sends read-only work to replicas when it is safe to."""
+
+    replicas: List[Engine] = []
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if not self.replicas or not self.info.get("read_only"):
+            return primary
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            return primary
+        user_id = self.info.get("user_id")
+        if user_id is None or recent_writers.get(user_id) or self.info.get("pinned_user_id") == user_id:
+            _counters["primary_reads"] += 1
+            return primary
+        _counters["replica_reads"] += 1
+        return random.choice(self.replicas)
+
+
+def _mark_write(session: Session) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    _mark_write(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _after_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        recent_writers.set(session.info["user_id"], True)
+        writes = _request_writes.get()
+        if writes is not None and session.replicas:
+            writes["user_id"] = session.info["user_id"]
+            writes["at"] = time.time()
+
+
+def _pin_signature(message: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+
+def sign_pin(user_id: int, at: float) -> str:
+    """Encode a read-your-writes pin for a write committed at ``at``."""
+    message = f"{user_id}.{at:.3f}"
+    return f"{message}.{_pin_signature(message)}"
+
+
+def pinned_user(pin: Optional[str]) -> Optional[int]:
+    """Return the user id of a valid pin still inside its window, else None."""
+    try:
+        message, _, signature = pin.rpartition(".")
+        user_id, _, at = message.partition(".")
+        if not hmac.compare_digest(signature, _pin_signature(message)):
+            return None
+        if time.time() - float(at) >= settings.READ_YOUR_WRITES_SECONDS:
+            return None
+        return int(user_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def pin_from_request(request: Request) -> Optional[int]:
+    """User id pinned to the primary by the request's cookie or header."""
+    return pinned_user(request.cookies.get(PIN_COOKIE) or request.headers.get(PIN_HEADER))
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Return a signed pin to clients whose request committed a write."""
+    writes = {}
+    token = _request_writes.set(writes)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_writes.reset(token)
+    if writes:
+        pin = sign_pin(writes["user_id"], writes["at"])
+        response.headers[PIN_HEADER] = pin
+        response.set_cookie(
+            PIN_COOKIE, pin, max_age=math.ceil(settings.READ_YOUR_WRITES_SECONDS),
+            httponly=True, samesite="lax",
+        )
+    return response
+
+
+metrics.register("db_routing", lambda: {
+    "replicas": len(replica_urls()),
+    "pinned_users": len(recent_writers),
+    **_counters,
+})
@@ -0,0 +1,183 @@
+"""
+Full-text search over note titles and content.
+
+Titles live in ``notes`` and content in ``note_bodies``, so the index is
+maintained by triggers on both tables:
+
+- PostgreSQL: a ``search_vector`` tsvector column on note_bodies (title
+  weighted above content) with a GIN index, set by a trigger on note_bodies
+  and refreshed by one on notes when the title changes
+- SQLite: a contentless FTS5 table ``notes_fts`` (rowid = note id); the
+  triggers index ``note_text(content)``, the plain text of content that may
+  be stored compressed (app.db.compression)
+- Other databases: ILIKE over title and content (no index)
+
+Both index structures live outside the ORM model and are installed when
+the note_bodies table is created (DDL event below); on existing databases
+migration 8 installs them on PostgreSQL and migration 11 on SQLite, where
+the notes.content index serves the same queries until then.
+Results are ranked by relevance, title matches first.
+"""
+
+import re
+from typing import List
+from sqlalchemy import column, event, func, literal_column, or_, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+from app.db.compression import register_sqlite_functions
+from app.domain.models import Note, NoteBody
+
+# Search terms beyond this are ignored (keeps MATCH expressions small)
+MAX_SEARCH_TERMS = 8
+
+# Text search configuration: no stemming, like FTS5's default tokenizer
+_PG_CONFIG = "simple"
+
+_PG_DDL = [
+    "ALTER TABLE note_bodies ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION note_search_vector(title text, content text) RETURNS tsvector
+    LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('{_PG_CONFIG}', coalesce(title, '')), 'A') ||
+               setweight(to_tsvector('{_PG_CONFIG}', coalesce(content, '')), 'B')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION note_bodies_search_vector() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := note_search_vector(
+            (SELECT title FROM notes WHERE id = NEW.note_id), NEW.content
+        );
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notes_title_search_vector() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE note_bodies SET search_vector = note_search_vector(NEW.title, content)
+        WHERE note_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS note_bodies_search ON note_bodies",
+    """
+    CREATE TRIGGER note_bodies_search BEFORE INSERT OR UPDATE OF content ON note_bodies
+    FOR EACH ROW EXECUTE FUNCTION note_bodies_search_vector()
+    """,
+    "DROP TRIGGER IF EXISTS notes_title_search ON notes",
+    """
+    CREATE TRIGGER notes_title_search AFTER UPDATE OF title ON notes
+    FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION notes_title_search_vector()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_note_bodies_search ON note_bodies USING GIN (search_vector)",
+]
+
+# A contentless FTS5 table only accepts a deletion with the exact values
+# that were indexed, so every trigger reads the current title and content
+# from whichever table did not change. A note's body is inserted right
+# after the note and deleted with it (ON DELETE CASCADE), hence the
+# BEFORE DELETE trigger on notes and none on note_bodies.
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, content='')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_bodies_fts_insert AFTER INSERT ON note_bodies BEGIN
+        INSERT INTO notes_fts (rowid, title, content)
+        SELECT id, title, note_text(new.content) FROM notes WHERE id = new.note_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_bodies_fts_update AFTER UPDATE OF content ON note_bodies BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        SELECT 'delete', id, title, note_text(old.content) FROM notes WHERE id = old.note_id;
+        INSERT INTO notes_fts (rowid, title, content)
+        SELECT id, title, note_text(new.content) FROM notes WHERE id = new.note_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_title AFTER UPDATE OF title ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        SELECT 'delete', old.id, old.title, note_text(content) FROM note_bodies WHERE note_id = old.id;
+        INSERT INTO notes_fts (rowid, title, content)
+        SELECT new.id, new.title, note_text(content) FROM note_bodies WHERE note_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete BEFORE DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        SELECT 'delete', old.id, old.title, note_text(content) FROM note_bodies WHERE note_id = old.id;
+    END
+    """,
+]
+
+_notes_fts = table("notes_fts", column("rowid"))
+_note_bodies = table("note_bodies", column("note_id"), column("search_vector"))
+
+
+def install_note_search(connection: Connection) -> None:
+    """Create the full-text index for notes (with the note_bodies table, before it has rows)."""
+    if connection.dialect.name == "sqlite":
+        # Also needed by connections that did not come from the app's engines
+        register_sqlite_functions(connection.connection.dbapi_connection)
+    statements = {"postgresql": _PG_DDL, "sqlite": _SQLITE_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+@event.listens_for(NoteBody.__table__, "after_create")
+def _after_note_bodies_create(target, connection, **kw):
+    install_note_search(connection)
+
+
+@event.listens_for(NoteBody.__table__, "after_drop")
+def _after_note_bodies_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS notes_fts"))
+
+
+def search_terms(search: str) -> List[str]:
+    """Split a search string into lowercase word terms (punctuation is dropped)."""
+    return re.findall(r"\w+", search.lower())[:MAX_SEARCH_TERMS]
+
+
+def apply_note_search(query: Query, dialect: str, terms: List[str]) -> Query:
+    """
+    Restrict a note query to notes matching every term, best matches first.
+
+    The last term matches as a prefix, so results keep up while typing.
+    """
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(
+            literal_column(f"'{_PG_CONFIG}'::regconfig"),
+            " & ".join(terms) + ":*",
+        )
+        vector = _note_bodies.c.search_vector
+        return (
+            query.join(_note_bodies, _note_bodies.c.note_id == Note.id)
+            .filter(vector.op("@@")(tsquery))
+            .order_by(
+                func.ts_rank_cd(vector, tsquery).desc(), Note.updated_at.desc(), Note.id.desc()
+            )
+        )
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        fts = literal_column("notes_fts")
+        return (
+            query.join(_notes_fts, _notes_fts.c.rowid == Note.id)
+            .filter(fts.op("MATCH")(match))
+            # bm25 is lower for better matches; title hits weigh 10x content hits
+            .order_by(func.bm25(fts, 10.0, 1.0), Note.updated_at.desc(), Note.id.desc())
+        )
+
+    conditions = [
+        or_(Note.title.ilike(f"%{term}%"), Note.body.has(NoteBody.content.ilike(f"%{term}%")))
+        for term in terms
+    ]
+    return query.filter(*conditions).order_by(Note.updated_at.desc(), Note.id.desc())
@@ -2,27 +2,136 @@
 Database session configuration.
 """
 
+from typing import Any, Callable, Union
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core import metrics
+from app.db.pool import pool_options, pool_stats
+from app.db.sqlite import is_sqlite, sqlite_connect_args, configure_sqlite_engine, serialize_writes
+from app.db.routing import RoutingSession, replica_urls
 
 
-# Create database engine
+# Async drivers used when DB_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"DB_ASYNC is not supported for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+USE_SQLITE = is_sqlite(settings.DATABASE_URL)
+
+# Create database engine (pool sizing and pre-ping come from DB_POOL_* settings)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
     echo=settings.DEBUG,  # Log SQL queries in debug mode
+    connect_args=sqlite_connect_args() if USE_SQLITE else {},
+    **pool_options(settings.DATABASE_URL, "primary"),
 )
 
+# Read replicas (optional); read-only sessions are routed to them
+replica_engines = [
+    create_engine(
+        url,
+        echo=settings.DEBUG,
+        connect_args=sqlite_connect_args() if is_sqlite(url) else {},
+        **pool_options(url, f"replica-{index}"),
+    )
+    for index, url in enumerate(replica_urls())
+]
+
+
+class SyncRoutingSession(RoutingSession):
+    """Routing session over the sync engines."""
+    replicas = replica_engines
+
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=SyncRoutingSession
+)
+
+# SQLite profile: pragmas on every connection, single writer at a time
+if USE_SQLITE:
+    configure_sqlite_engine(engine)
+    if settings.SQLITE_SERIALIZE_WRITES:
+        serialize_writes(SessionLocal)
+for replica in replica_engines:
+    if replica.dialect.name == "sqlite":
+        configure_sqlite_engine(replica)
+
+# Async engine and session factory (only when DB_ASYNC is enabled). The sync
+# engine above is still used for schema setup and maintenance tasks.
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        echo=settings.DEBUG,
+        **pool_options(settings.DATABASE_URL, "primary-async", is_async=True),
+    )
+    async_replica_engines = [
+        create_async_engine(
+            async_database_url(url),
+            echo=settings.DEBUG,
+            **pool_options(url, f"replica-{index}-async", is_async=True),
+        )
+        for index, url in enumerate(replica_urls())
+    ]
+
+    class AsyncRoutingSession(RoutingSession):
+        """Routing session used inside AsyncSession (binds are sync facades)."""
+        replicas = [replica.sync_engine for replica in async_replica_engines]
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=AsyncRoutingSession,
+    )
+    # Pragmas only: a blocking writer lock has no place on the event loop
+    for async_db in [async_engine, *async_replica_engines]:
+        if async_db.dialect.name == "sqlite":
+            configure_sqlite_engine(async_db.sync_engine)
+
+metrics.register("db_pool", lambda: {
+    "primary": pool_stats(engine),
+    **{f"replica_{i}": pool_stats(e) for i, e in enumerate(replica_engines)},
+    **({"primary_async": pool_stats(async_engine.sync_engine)} if async_engine else {}),
+    **{f"replica_{i}_async": pool_stats(e.sync_engine) for i, e in enumerate(async_replica_engines)},
+})
 
 # Base class for models
 Base = declarative_base()
 
 
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(session, *args) without blocking the event loop.
+
+    Sync sessions run fn in the threadpool; async sessions run it through
+    AsyncSession.run_sync, so the same ORM code drives the async driver.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+
 def init_db():
-    """Initialize database tables."""
-    from app.domain import models  # Import models to register them
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the database schema (see app.db.migrations)."""
+    from app.db.migrations import migrate  # Imports the models
+    migrate(engine)
@@ -0,0 +1,150 @@
+"""
+SQLite deployment profile.
+
+Applied automatically when DATABASE_URL points at SQLite:
+
+- Per-connection pragmas: WAL journal, synchronous=NORMAL, mmap, page
+  cache size, busy timeout, in-memory temp store and foreign key
+  enforcement
+- The note_text() SQL function, which the full-text index triggers use
+  to read (possibly compressed) note content
+- ``check_same_thread=False`` so pooled connections can move between
+  threadpool workers (a connection is still only used by one thread at a
+  time)
+- A process-wide writer lock that serializes write transactions, so
+  concurrent note edits queue in Python instead of failing with
+  "database is locked". WAL lets reads proceed alongside the writer.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core import metrics
+from app.db.compression import register_sqlite_functions
+
+
+def is_sqlite(url: str) -> bool:
+    """Check whether a database URL points at SQLite."""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _keyword(value: str) -> str:
+    """Validate a pragma keyword value (pragmas cannot take bound parameters)."""
+    value = value.strip().upper()
+    if not value.isalpha():
+        raise ValueError(f"Invalid SQLite pragma value: {value!r}")
+    return value
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Pragmas applied to every new SQLite connection."""
+    return {
+        "journal_mode": _keyword(settings.SQLITE_JOURNAL_MODE),
+        "synchronous": _keyword(settings.SQLITE_SYNCHRONOUS),
+        "mmap_size": int(settings.SQLITE_MMAP_SIZE),
+        "cache_size": int(settings.SQLITE_CACHE_SIZE),
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT_MS),
+        "temp_store": _keyword(settings.SQLITE_TEMP_STORE),
+        # Enforce ON DELETE rules (SQLite ignores foreign keys by default)
+        "foreign_keys": "ON",
+    }
+
+
+def sqlite_connect_args() -> Dict[str, Any]:
+    """DBAPI connect arguments for the sync pysqlite driver."""
+    return {
+        "check_same_thread": False,
+        "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
+
+def configure_sqlite_engine(engine: Engine) -> None:
+    """Apply the pragma profile and SQL functions to every connection the engine opens."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+        register_sqlite_functions(dbapi_connection)
+
+
+class WriterLock:
+    """Serializes write transactions across all sessions in this process."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+
+    def acquire(self, session: Session) -> None:
+        """Take the lock for a session's transaction (no-op if already held)."""
+        if session.info.get("sqlite_writer"):
+            return
+        if not self._lock.acquire(blocking=False):
+            self.contended += 1
+            start = time.perf_counter()
+            acquired = self._lock.acquire(timeout=self.timeout)
+            self.wait_total += time.perf_counter() - start
+            if not acquired:
+                # Fall back to SQLite's own busy handling
+                self.timeouts += 1
+                return
+        self.acquisitions += 1
+        session.info["sqlite_writer"] = True
+
+    def release(self, session: Session) -> None:
+        """Release the lock if this session holds it."""
+        if session.info.pop("sqlite_writer", False):
+            self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return acquisition and contention counters."""
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+            "wait_total_ms": round(self.wait_total * 1000, 2),
+        }
+
+
+writer_lock = WriterLock(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+
+
+def serialize_writes(session_factory: sessionmaker) -> None:
+    """
+    Hold the writer lock from a session's first write until its transaction ends.
+
+    Writes are ORM flushes, bulk INSERT/UPDATE/DELETE statements and
+    SELECT ... FOR UPDATE (read-before-write).
+    """
+    @event.listens_for(session_factory, "before_flush")
+    def _before_flush(session, flush_context, instances):
+        writer_lock.acquire(session)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _before_dml(orm_execute_state):
+        if (
+            orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+            # SQLite has no SELECT ... FOR UPDATE; holding the writer lock gives the same guarantee
+            or getattr(orm_execute_state.statement, "_for_update_arg", None) is not None
+        ):
+            writer_lock.acquire(orm_execute_state.session)
+
+    @event.listens_for(session_factory, "after_transaction_end")
+    def _after_transaction_end(session, transaction):
+        if transaction.parent is None:
+            writer_lock.release(session)
+
+    metrics.register("sqlite_writer", writer_lock.stats)
@@ -0,0 +1,252 @@
+"""
+Single-round-trip writes for user-owned rows.
+
+Create, update and delete handlers scope each statement to the owner
+(``WHERE id = ? AND user_id = ?``) and read the row back with RETURNING, so
+ownership check, write and reload are one statement instead of a SELECT, a
+write and a refresh. Backends without RETURNING fall back to the ORM (a
+SELECT followed by a flush).
+
+Returned instances are detached from the session, so committing afterwards
+does not expire them and the response is built without another query.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def supports_returning(db: Session) -> bool:
+    """Check whether the session's database supports INSERT/UPDATE/DELETE ... RETURNING."""
+    dialect = db.get_bind().dialect
+    return dialect.insert_returning and dialect.update_returning and dialect.delete_returning
+
+
+def insert_row(db: Session, model: Type[T], values: Dict[str, Any]) -> T:
+    """INSERT a row and return it fully loaded (server-side values included)."""
+    if supports_returning(db):
+        obj = db.scalars(insert(model).values(**values).returning(model)).one()
+    else:
+        obj = model(**values)
+        db.add(obj)
+        db.flush()
+    db.expunge(obj)
+    return obj
+
+
+def update_owned(
+    db: Session,
+    model: Type[T],
+    row_id: int,
+    user_id: int,
+    values: Dict[str, Any],
+    *criteria: Any,
+) -> Optional[T]:
+    """
+    UPDATE one row owned by user_id and return it.
+
+    Args:
+        db: Database session (not committed)
+        model: Mapped class with ``id`` and ``user_id`` columns
+        row_id: Primary key of the row
+        user_id: Owner the row must belong to
+        values: Column values to set (empty = read the row unchanged)
+        *criteria: Extra conditions the row must satisfy to be updated
+
+    Returns:
+        The updated row, or None if no owned row matched
+    """
+    conditions = (model.id == row_id, model.user_id == user_id, *criteria)
+    if values and supports_returning(db):
+        obj = db.scalars(
+            update(model)
+            .where(*conditions)
+            .values(**values)
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+    else:
+        obj = db.query(model).filter(*conditions).first()
+        if obj is not None and values:
+            for name, value in values.items():
+                setattr(obj, name, value)
+            db.flush()
+    if obj is not None:
+        db.expunge(obj)
+    return obj
+
+
+def delete_owned(db: Session, model: Type[T], row_id: int, user_id: int) -> Optional[T]:
+    """
+    DELETE one row owned by user_id.
+
+    Relies on the foreign keys' ON DELETE rules for dependent rows.
+
+    Returns:
+        The deleted row (detached), or None if no owned row matched
+    """
+    conditions = (model.id == row_id, model.user_id == user_id)
+    if supports_returning(db):
+        obj = db.scalars(
+            delete(model)
+            .where(*conditions)
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        ).first()
+    else:
+        obj = db.query(model).filter(*conditions).first()
+        if obj is not None:
+            db.delete(obj)
+            db.flush()
+    if obj is not None:
+        db.expunge(obj)
+    return obj
+
+
+class Batch:
+    """
+    A validated set of creates, updates and deletes for one user's rows.
+    
+    Items are kept with their position in the request so rejections can be
+    reported per item; rejected items are skipped by apply_batch.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.creates: List[Tuple[int, Dict[str, Any]]] = []
+        self.updates: List[Tuple[int, Dict[str, Any]]] = []
+        self.deletes: List[Tuple[int, int]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self._rejected = set()
+
+    def reject(self, op: str, index: int, detail: str, row_id: Optional[int] = None) -> None:
+        """Mark an item as failed."""
+        self._rejected.add((op, index))
+        self.errors.append({"op": op, "index": index, "id": row_id, "detail": detail})
+
+    def pending(self, op: str) -> list:
+        """Items of one kind ("create", "update", "delete") not rejected so far."""
+        items = {"create": self.creates, "update": self.updates, "delete": self.deletes}[op]
+        return [(index, item) for index, item in items if (op, index) not in self._rejected]
+
+
+def prepare_batch(
+    db: Session,
+    model: Type[T],
+    user_id: int,
+    creates: Iterable[Any],
+    updates: Iterable[Any],
+    deletes: Iterable[int],
+) -> Batch:
+    """
+    Turn request items into a Batch and check ownership in one query.
+    
+    Updates take only the fields that were provided; ids that are not the
+    user's, repeated within a list, or both updated and deleted are rejected.
+    """
+    batch = Batch(user_id)
+    batch.creates = [
+        (index, {**item.model_dump(), "user_id": user_id}) for index, item in enumerate(creates)
+    ]
+    batch.updates = [
+        (index, {field: value for field, value in item.model_dump().items() if value is not None})
+        for index, item in enumerate(updates)
+    ]
+    batch.deletes = list(enumerate(deletes))
+
+    requested = {values["id"] for _, values in batch.updates} | {row_id for _, row_id in batch.deletes}
+    owned = set(db.scalars(
+        select(model.id).where(model.id.in_(requested), model.user_id == user_id)
+    )) if requested else set()
+
+    deleted = {row_id for _, row_id in batch.deletes}
+    for op, items in (("update", batch.updates), ("delete", batch.deletes)):
+        seen = set()
+        for index, item in items:
+            row_id = item["id"] if op == "update" else item
+            if row_id not in owned:
+                batch.reject(op, index, "Not found", row_id)
+            elif row_id in seen:
+                batch.reject(op, index, "Duplicate id in batch", row_id)
+            elif op == "update" and row_id in deleted:
+                batch.reject(op, index, "Deleted in the same batch", row_id)
+            seen.add(row_id)
+    return batch
+
+
+def apply_batch(db: Session, model: Type[T], batch: Batch) -> Dict[str, Any]:
+    """
+    Apply a batch's accepted items inside the current transaction.
+    
+    - Creates: one multi-row INSERT ... RETURNING
+    - Updates: one SELECT ... FOR UPDATE of the ids that still exist, one
+      executemany UPDATE by primary key, then one SELECT
+    - Deletes: one DELETE ... WHERE id IN (...) AND user_id = ? RETURNING id
+    
+    Rows deleted by another request since prepare_batch are reported as
+    "Not found" errors and left out of ``updated`` and ``deleted``, so
+    callers can derive counter changes from the rows actually written.
+    
+    Returns:
+        created and updated rows (detached), deleted ids and item errors
+    """
+    result: Dict[str, Any] = {"created": [], "updated": [], "deleted": [], "errors": batch.errors}
+
+    deletes = batch.pending("delete")
+    if deletes:
+        conditions = (model.id.in_([row_id for _, row_id in deletes]), model.user_id == batch.user_id)
+        if supports_returning(db):
+            gone = set(db.scalars(
+                delete(model).where(*conditions).returning(model.id)
+                .execution_options(synchronize_session=False)
+            ))
+        else:
+            # No RETURNING: lock the rows that still exist, then delete those
+            gone = set(db.scalars(select(model.id).where(*conditions).with_for_update()))
+            db.execute(
+                delete(model).where(model.id.in_(gone)).execution_options(synchronize_session=False)
+            )
+        for index, row_id in deletes:
+            if row_id in gone:
+                result["deleted"].append(row_id)
+            else:
+                batch.reject("delete", index, "Not found", row_id)
+
+    updates = batch.pending("update")
+    if updates:
+        # An UPDATE by primary key fails outright if any row is gone
+        found = set(db.scalars(select(model.id).where(
+            model.id.in_([values["id"] for _, values in updates]), model.user_id == batch.user_id
+        ).with_for_update()))
+        for index, values in updates:
+            if values["id"] not in found:
+                batch.reject("update", index, "Not found", values["id"])
+        updates = [values for index, values in updates if values["id"] in found]
+        now = datetime.utcnow()
+        changed = [{**values, "updated_at": now} for values in updates if len(values) > 1]
+        if changed:
+            db.execute(update(model).execution_options(synchronize_session=False), changed)
+        if updates:
+            ids = [values["id"] for values in updates]
+            by_id = {obj.id: obj for obj in db.scalars(select(model).where(model.id.in_(ids)))}
+            result["updated"] = [by_id[row_id] for row_id in ids]
+
+    rows = [values for _, values in batch.pending("create")]
+    if rows:
+        if supports_returning(db):
+            # One multi-row INSERT; ids are assigned in VALUES order, so sorting
+            # by id restores request order (sort_by_parameter_order would make
+            # SQLite fall back to one INSERT per row)
+            created = db.scalars(insert(model).returning(model), rows)
+            result["created"] = sorted(created, key=lambda obj: obj.id)
+        else:
+            result["created"] = [model(**values) for values in rows]
+            db.add_all(result["created"])
+            db.flush()
+
+    for obj in result["created"] + result["updated"]:
+        db.expunge(obj)
+    return result
@@ -3,10 +3,13 @@ SQLAlchemy database models.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Boolean, Index, LargeBinary
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
+from app.db.compression import CompressedText
 from app.db.session import Base
 import enum
+from typing import Any, Dict, Optional
 
 
 class TaskStatus(str, enum.Enum):
@@ -32,20 +35,69 @@ class User(Base):
     calendar_events = relationship("CalendarEvent", back_populates="owner", cascade="all, delete-orphan")
 
 
+# Characters of content kept in Note.excerpt
+NOTE_EXCERPT_LENGTH = 200
+
+
+def note_summary_values(content: Optional[str]) -> Dict[str, Any]:
+    """Excerpt and length columns for a note's content (set with every content write)."""
+    if content is None:
+        return {"excerpt": None, "content_length": 0}
+    return {
+        "excerpt": " ".join(content[:NOTE_EXCERPT_LENGTH * 2].split())[:NOTE_EXCERPT_LENGTH],
+        "content_length": len(content),
+    }
+
+
 class Note(Base):
-    """Note model."""
+    """
+    Note model.
+    
+    The content lives in note_bodies (one row per note), so list scans and
+    sorts only read the narrow metadata rows. ``content`` reads through the
+    ``body`` relationship, which must be loaded explicitly (joinedload on
+    detail reads, or app.db.bodies after writes): lazy loading raises.
+    """
     
     __tablename__ = "notes"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
-    content = Column(Text, nullable=True)
+    # List-view fields, precomputed on write so lists never read content
+    excerpt = Column(String(NOTE_EXCERPT_LENGTH), nullable=True)
+    content_length = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     owner = relationship("User", back_populates="notes")
+    body = relationship(
+        "NoteBody", uselist=False, lazy="raise", cascade="all, delete-orphan", passive_deletes=True
+    )
+    content = association_proxy("body", "content", creator=lambda content: NoteBody(content=content))
+    
+    __table_args__ = (
+        # Note list: user's notes, most recently updated first (id breaks ties)
+        Index("ix_notes_user_updated", "user_id", "updated_at", "id"),
+    )
+
+
+class NoteBody(Base):
+    """Note content, split from notes so list queries never read it."""
+    
+    __tablename__ = "note_bodies"
+    
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    content = Column(CompressedText, nullable=True)  # compressed when large (NOTE_COMPRESSION)
+
+
+def note_summary_columns():
+    """Columns of a note list item (NoteSummary)."""
+    return (
+        Note.id, Note.user_id, Note.title, Note.excerpt, Note.content_length,
+        Note.created_at, Note.updated_at,
+    )
 
 
 class Task(Base):
@@ -54,7 +106,7 @@ class Task(Base):
     __tablename__ = "tasks"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     due_date = Column(DateTime, nullable=True, index=True)
@@ -67,13 +119,36 @@ class Task(Base):
     calendar_events = relationship("CalendarEvent", back_populates="linked_task")
 
 
+def task_due_order():
+    """
+    ORDER BY for task lists: due date ascending, tasks without one last, then id.
+    
+    Spelled as ``due_date IS NULL, due_date`` rather than NULLS LAST so the
+    task indexes below match it on both PostgreSQL and SQLite.
+    """
+    return (Task.due_date.is_(None), Task.due_date.asc(), Task.id.asc())
+
+
+# Task list indexes (filter by owner and optionally status, sort by due date)
+Index("ix_tasks_user_due", Task.user_id, *task_due_order())
+Index("ix_tasks_user_status_due", Task.user_id, Task.status, *task_due_order())
+# Open-task list: the partial index skips the (usually large) completed backlog
+Index(
+    "ix_tasks_user_open_due",
+    Task.user_id,
+    *task_due_order(),
+    postgresql_where=Task.status != TaskStatus.COMPLETED,
+    sqlite_where=Task.status != TaskStatus.COMPLETED,
+)
+
+
 class CalendarEvent(Base):
     """Calendar event model."""
     
     __tablename__ = "calendar_events"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     start_time = Column(DateTime, nullable=False, index=True)
@@ -85,3 +160,67 @@ class CalendarEvent(Base):
     # Relationships
     owner = relationship("User", back_populates="calendar_events")
     linked_task = relationship("Task", back_populates="calendar_events")
+    
+    __table_args__ = (
+        # Calendar list and conflict checks: user's events by start time (id breaks ties)
+        Index("ix_calendar_events_user_start", "user_id", "start_time", "id"),
+        # Upcoming events (end_time >= now): an index range count
+        Index("ix_calendar_events_user_end", "user_id", "end_time"),
+    )
+
+
+class UserCounters(Base):
+    """
+    Per-user entity counts, kept up to date by the write handlers.
+    
+    Adjusted in the same transaction as each create, update and delete
+    (see app.db.counters), so reading counts is a primary-key lookup.
+    """
+    
+    __tablename__ = "user_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    notes = Column(Integer, default=0, nullable=False)
+    tasks_todo = Column(Integer, default=0, nullable=False)
+    tasks_in_progress = Column(Integer, default=0, nullable=False)
+    tasks_completed = Column(Integer, default=0, nullable=False)
+    events = Column(Integer, default=0, nullable=False)
+
+
+class RevokedToken(Base):
+    """Revoked JWT (by jti) kept until the token would have expired anyway."""
+    
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CompressionDictionary(Base):
+    """zlib preset dictionary for note content (see app.db.compression)."""
+    
+    __tablename__ = "compression_dictionaries"
+    
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BcryptCost(Base):
+    """Single-row table with the bcrypt cost calibrated for this deployment (see app.db.hashing)."""
+    
+    __tablename__ = "bcrypt_cost"
+    
+    rounds = Column(Integer, primary_key=True)
+    target_ms = Column(Integer, nullable=False)
+    calibrated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class SchemaVersion(Base):
+    """Single-row table holding the applied migration version (see app.db.migrations)."""
+    
+    __tablename__ = "schema_version"
+    
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
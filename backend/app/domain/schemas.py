@@ -3,8 +3,9 @@ Pydantic schemas for request/response validation.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
+from app.core.config import settings
 from app.domain.models import TaskStatus
 
 
@@ -86,6 +87,32 @@ class NoteResponse(NoteBase):
         from_attributes = True
 
 
+class NoteSummary(BaseModel):
+    """Note list item without content: excerpt and content length instead."""
+    id: int
+    user_id: int
+    title: str
+    excerpt: Optional[str] = None
+    content_length: int = 0
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class NoteTitleSuggestion(BaseModel):
+    """A note whose title matches a typed prefix."""
+    id: int
+    title: str
+
+
+class NoteSuggestions(BaseModel):
+    """Search-as-you-type suggestions."""
+    titles: List[NoteTitleSuggestion] = []
+    terms: List[str] = []
+
+
 # ===== Task Schemas =====
 
 class TaskBase(BaseModel):
@@ -163,6 +190,111 @@ class CalendarEventResponse(CalendarEventBase):
         from_attributes = True
 
 
+# ===== Bootstrap Schemas =====
+
+class TaskCounts(BaseModel):
+    """Task counts by status."""
+    todo: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    total: int = 0
+
+
+class EntityCounts(BaseModel):
+    """Per-user entity counts."""
+    notes: int = 0
+    tasks: TaskCounts
+    events: int = 0
+    upcoming_events: int = 0
+
+
+class BootstrapResponse(BaseModel):
+    """Everything the frontend needs to render after login."""
+    user: UserResponse
+    counts: EntityCounts
+    notes: List[NoteSummary]
+    tasks: List[TaskResponse]
+    events: List[CalendarEventResponse]
+
+
+# ===== Batch Schemas =====
+
+def _batch_list():
+    """List field capped at BATCH_MAX_ITEMS."""
+    return Field(default_factory=list, max_length=settings.BATCH_MAX_ITEMS)
+
+
+class BatchItemError(BaseModel):
+    """A batch item that was rejected."""
+    op: str  # "create", "update" or "delete"
+    index: int  # position in that list
+    id: Optional[int] = None
+    detail: str
+
+
+class NoteBatchUpdate(NoteUpdate):
+    """Note update inside a batch."""
+    id: int
+
+
+class NoteBatchRequest(BaseModel):
+    """Create, update and delete notes in one transaction."""
+    create: List[NoteCreate] = _batch_list()
+    update: List[NoteBatchUpdate] = _batch_list()
+    delete: List[int] = _batch_list()
+    atomic: bool = True  # reject the whole batch if any item fails
+
+
+class NoteBatchResponse(BaseModel):
+    """Batch result for notes."""
+    created: List[NoteResponse] = []
+    updated: List[NoteResponse] = []
+    deleted: List[int] = []
+    errors: List[BatchItemError] = []
+
+
+class TaskBatchUpdate(TaskUpdate):
+    """Task update inside a batch."""
+    id: int
+
+
+class TaskBatchRequest(BaseModel):
+    """Create, update and delete tasks in one transaction."""
+    create: List[TaskCreate] = _batch_list()
+    update: List[TaskBatchUpdate] = _batch_list()
+    delete: List[int] = _batch_list()
+    atomic: bool = True
+
+
+class TaskBatchResponse(BaseModel):
+    """Batch result for tasks."""
+    created: List[TaskResponse] = []
+    updated: List[TaskResponse] = []
+    deleted: List[int] = []
+    errors: List[BatchItemError] = []
+
+
+class CalendarEventBatchUpdate(CalendarEventUpdate):
+    """Calendar event update inside a batch."""
+    id: int
+
+
+class CalendarEventBatchRequest(BaseModel):
+    """Create, update and delete calendar events in one transaction."""
+    create: List[CalendarEventCreate] = _batch_list()
+    update: List[CalendarEventBatchUpdate] = _batch_list()
+    delete: List[int] = _batch_list()
+    atomic: bool = True
+
+
+class CalendarEventBatchResponse(BaseModel):
+    """Batch result for calendar events."""
+    created: List[CalendarEventResponse] = []
+    updated: List[CalendarEventResponse] = []
+    deleted: List[int] = []
+    errors: List[BatchItemError] = []
+
+
 # ===== Pagination Schemas =====
 
 class PaginationParams(BaseModel):
@@ -7,8 +7,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from app.core.config import settings
-from app.db.session import init_db
-from app.api import auth, notes, tasks, calendar
+from app.core.security import set_bcrypt_rounds
+from app.core.rate_limit import rate_limit_middleware
+from app.db.routing import PIN_HEADER, read_your_writes_middleware, replica_urls
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.session import engine, async_engine
+from app.db.compression import load_dictionaries
+from app.db.hashing import load_bcrypt_rounds
+from app.db.migrations import ensure_schema
+from app.db.pool import warm_pool, warm_async_pool
+from app.api import auth, notes, tasks, calendar, bootstrap, stats, metrics
 import os
 from pathlib import Path
 
@@ -22,6 +30,13 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+# Enforce RATE_LIMIT_PER_MINUTE (registered before CORS so 429s carry CORS headers)
+app.middleware("http")(rate_limit_middleware)
+
+# Hand read-your-writes pins to clients (only needed with replicas)
+if replica_urls():
+    app.middleware("http")(read_your_writes_middleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PIN_HEADER],
 )
 
 # Include API routers
@@ -36,6 +52,10 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(notes.router, prefix="/api")
 app.include_router(tasks.router, prefix="/api")
 app.include_router(calendar.router, prefix="/api")
+app.include_router(bootstrap.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/api")
 
 # Mount frontend static files (CSS, JS, images)
 # Determine project root reliably (go up 2 parents from backend/app -> noteapp)
@@ -48,8 +68,26 @@ if frontend_dir.exists():
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
-    init_db()
+    """Check the schema version, load compression dictionaries, warm pools and set hashing cost."""
+    ensure_schema(engine, settings.DB_AUTO_MIGRATE)
+    if settings.NOTE_COMPRESSION != "none":
+        with engine.connect() as connection:
+            load_dictionaries(connection)
+    if settings.DB_POOL_WARMUP:
+        if async_engine is not None:
+            await warm_async_pool(async_engine, settings.DB_POOL_SIZE)
+        else:
+            warm_pool(engine, settings.DB_POOL_SIZE)
+    rounds = load_bcrypt_rounds(engine, settings.BCRYPT_CALIBRATE_ON_STARTUP, settings.BCRYPT_TARGET_MS)
+    if rounds is not None:
+        set_bcrypt_rounds(rounds)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async connections on shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 @app.get("/", response_class=HTMLResponse)
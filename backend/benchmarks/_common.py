@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark runs the app in-process against a throwaway SQLite
+database unless DATABASE_URL is already set in the environment, with
+rate limiting disabled.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_environment(**overrides: str) -> None:
+    """Point the app at a temporary database and apply setting overrides."""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    if "DATABASE_URL" not in os.environ:
+        db_path = Path(tempfile.mkdtemp(prefix="noteapp-bench-")) / "bench.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production-use")
+    # Benchmarks hammer one user; rate limiting would turn that into 429s
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+    os.environ.setdefault("RATE_LIMIT_PER_IP_PER_MINUTE", "0")
+    for key, value in overrides.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest rank)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples given in seconds as milliseconds."""
+    return {
+        "n": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """Print a small results table."""
+    print(f"\n{title}")
+    print(f"{'case':<28}{'n':>8}{'p50 ms':>12}{'p99 ms':>12}{'max ms':>12}")
+    for name, stats in rows.items():
+        print(
+            f"{name:<28}{stats['n']:>8}{stats['p50_ms']:>12.2f}"
+            f"{stats['p99_ms']:>12.2f}{stats['max_ms']:>12.2f}"
+        )
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Event-loop blocking benchmark for the authentication dependency.
+
+Fires concurrent authenticated requests while probing /health, with an
+artificial delay on every SQL statement to emulate a remote database.
+Compares the old inline lookup (sync query inside the async dependency)
+with the offloaded lookup used by get_current_user.
+
+Keep --concurrency below the connection pool size: with the inline
+lookup, sessions waiting on the loop hold their connections and the pool
+can run dry.
+
+Usage:
+    python benchmarks/bench_auth_loop.py --concurrency 10 --requests 500 --db-latency-ms 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from _common import setup_environment, summarize, print_table
+
+# Force every request down the database path
+setup_environment(PRINCIPAL_CACHE_SIZE="0")
+
+import httpx  # noqa: E402
+from fastapi import Depends, HTTPException  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db.session import engine, init_db  # noqa: E402
+from app.core.dependencies import get_db, get_current_user, oauth2_scheme  # noqa: E402
+from app.core.security import decode_token  # noqa: E402
+from app.domain.models import User  # noqa: E402
+
+
+EMAIL = f"bench_{int(time.time())}@example.com"
+PASSWORD = "BenchPass123"
+
+
+async def blocking_get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """The previous dependency: a sync query executed on the event loop."""
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access":
+        raise HTTPException(status_code=401)
+    user = db.query(User).filter(User.id == int(payload["sub"])).first()
+    if user is None:
+        raise HTTPException(status_code=401)
+    return user
+
+
+async def run_case(client: httpx.AsyncClient, headers: dict, args) -> dict:
+    """Run concurrent /auth/me calls plus /health probes; return latencies."""
+    auth_latencies, probe_latencies = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    async def auth_call():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get("/api/auth/me", headers=headers)
+            auth_latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.gather(*(auth_call() for _ in range(args.requests)))
+    done.set()
+    await probe_task
+    return {"auth": auth_latencies, "probe": probe_latencies}
+
+
+async def main(args):
+    init_db()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _simulated_network_latency(*_):
+        time.sleep(args.db_latency_ms / 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        response = await client.post(
+            "/api/auth/login", data={"username": EMAIL, "password": PASSWORD}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        rows = {}
+        app.dependency_overrides[get_current_user] = blocking_get_current_user
+        before = await run_case(client, headers, args)
+        app.dependency_overrides.clear()
+        after = await run_case(client, headers, args)
+
+        rows["inline  /auth/me"] = summarize(before["auth"])
+        rows["inline  /health probe"] = summarize(before["probe"])
+        rows["offload /auth/me"] = summarize(after["auth"])
+        rows["offload /health probe"] = summarize(after["probe"])
+
+    print_table(
+        f"Auth dependency, concurrency={args.concurrency}, "
+        f"db latency={args.db_latency_ms}ms",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
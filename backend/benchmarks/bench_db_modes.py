@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Load benchmark comparing the sync and async (DB_ASYNC) database modes.
+
+Each mode runs in its own process (settings are read at import time)
+against the same database: many concurrent clients list and create notes
+through the ASGI app. Point DATABASE_URL at a remote Postgres to see the
+effect of network round trips; against local SQLite both modes are
+mostly CPU bound.
+
+Usage:
+    python benchmarks/bench_db_modes.py --concurrency 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from _common import setup_environment, summarize, print_table
+
+
+EMAIL = "bench_db_modes@example.com"
+PASSWORD = "BenchPass123"
+
+
+async def run_child(args):
+    """Run the load in this process and print a JSON summary."""
+    import httpx
+    from app.main import app
+    from app.db.session import init_db
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        response = await client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def call(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                if i % 10 == 0:
+                    r = await client.post("/api/notes/", json={"title": f"n{i}", "content": "x" * 200}, headers=headers)
+                else:
+                    r = await client.get("/api/notes/", params={"limit": 20}, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if r.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "stats": summarize(latencies),
+        "rps": args.requests / elapsed,
+        "errors": errors,
+    }))
+
+
+def main(args):
+    rows, throughput = {}, {}
+    for mode in ("0", "1"):
+        env = dict(os.environ, DB_ASYNC=mode)
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--concurrency", str(args.concurrency),
+             "--requests", str(args.requests)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        name = "async (DB_ASYNC=1)" if mode == "1" else "sync threadpool"
+        rows[name] = result["stats"]
+        throughput[name] = (result["rps"], result["errors"])
+
+    print_table(f"Notes list/create, concurrency={args.concurrency}", rows)
+    for name, (rps, errors) in throughput.items():
+        print(f"{name:<28}{rps:>10.1f} req/s   errors={errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parsed = parser.parse_args()
+    setup_environment()
+    if parsed.child:
+        asyncio.run(run_child(parsed))
+    else:
+        main(parsed)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the note list queries with content inline vs in note_bodies.
+
+Builds two SQLite databases holding the same synthetic notes: the layout
+before migration 8 (content in the notes row, ahead of the excerpt
+columns added by migration 7) and the split layout (narrow notes rows plus
+note_bodies). Then times the statements behind GET /api/notes/summary and
+GET /api/notes/ for random users, with the app's SQLite pragma profile.
+
+With a warm OS page cache both layouts serve a page from about the same
+number of pages; the difference is in how much of the database a list
+workload keeps hot. --drop-caches (Linux, root) empties the OS page cache
+before each case to show the list endpoints reading from disk.
+
+Usage:
+    python benchmarks/bench_note_bodies.py --notes 1000000 --users 100 --requests 2000
+    python benchmarks/bench_note_bodies.py --directory /tmp/bodies --drop-caches
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import setup_environment, print_table, summarize
+
+setup_environment()
+
+from app.db.sqlite import sqlite_pragmas  # noqa: E402
+from app.domain.models import note_summary_values  # noqa: E402
+
+_INDEX = "CREATE INDEX ix_notes_user_updated ON notes (user_id, updated_at, id)"
+
+LAYOUTS = {
+    "inline": {
+        "schema": [
+            "CREATE TABLE notes (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+            "title VARCHAR(255) NOT NULL, content TEXT, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL, excerpt VARCHAR(200), content_length INTEGER NOT NULL)",
+            _INDEX,
+        ],
+        "insert": [
+            "INSERT INTO notes (id, user_id, title, content, created_at, updated_at, excerpt, content_length) "
+            "VALUES (:id, :user_id, :title, :content, :created_at, :updated_at, :excerpt, :content_length)",
+        ],
+        "full": (
+            "SELECT id, user_id, title, content, excerpt, content_length, created_at, updated_at "
+            "FROM notes WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?",
+        ),
+    },
+    "note_bodies": {
+        "schema": [
+            "CREATE TABLE notes (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+            "title VARCHAR(255) NOT NULL, excerpt VARCHAR(200), content_length INTEGER NOT NULL, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+            _INDEX,
+            "CREATE TABLE note_bodies (note_id INTEGER PRIMARY KEY REFERENCES notes (id) ON DELETE CASCADE, "
+            "content TEXT)",
+        ],
+        "insert": [
+            "INSERT INTO notes (id, user_id, title, excerpt, content_length, created_at, updated_at) "
+            "VALUES (:id, :user_id, :title, :excerpt, :content_length, :created_at, :updated_at)",
+            "INSERT INTO note_bodies (note_id, content) VALUES (:id, :content)",
+        ],
+        # The page, then its bodies (selectinload)
+        "full": (
+            "SELECT id, user_id, title, excerpt, content_length, created_at, updated_at "
+            "FROM notes WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?",
+            "SELECT note_id, content FROM note_bodies WHERE note_id IN ({ids})",
+        ),
+    },
+}
+
+SUMMARY = (
+    "SELECT id, user_id, title, excerpt, content_length, created_at, updated_at "
+    "FROM notes WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?"
+)
+
+# (statement kind, limit, offset) per case; limits are the endpoint defaults
+CASES = {
+    "summary, first page": ("summary", 10, 0),
+    "summary, skip 1000": ("summary", 10, 1000),
+    "full, first page": ("full", 10, 0),
+    "full, skip 1000": ("full", 10, 1000),
+}
+
+
+def _content_length(rng):
+    """Mostly short notes, some long ones that spill into overflow pages."""
+    bucket = rng.random()
+    if bucket < 0.70:
+        return rng.randint(100, 1000)
+    if bucket < 0.95:
+        return rng.randint(1000, 5000)
+    return rng.randint(5000, 20000)
+
+
+def _rows(args):
+    rng = random.Random(25)
+    words = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9))) for _ in range(5000)
+    ]
+    text = " ".join(rng.choices(words, k=200000))
+    base = datetime(2030, 1, 1)
+    for note_id in range(1, args.notes + 1):
+        length = _content_length(rng)
+        start = rng.randrange(len(text) - length)
+        content = text[start:start + length]
+        created = base + timedelta(seconds=note_id)
+        yield {
+            "id": note_id,
+            "user_id": rng.randint(1, args.users),
+            "title": " ".join(rng.choices(words, k=rng.randint(2, 6))),
+            "content": content,
+            "created_at": str(created),
+            "updated_at": str(created + timedelta(minutes=rng.randrange(100000))),
+            **note_summary_values(content),
+        }
+
+
+def _connect(path):
+    connection = sqlite3.connect(path)
+    for name, value in sqlite_pragmas().items():
+        connection.execute(f"PRAGMA {name}={value}")
+    return connection
+
+
+def build(path, layout, args):
+    """Create one database with the layout's schema and the synthetic notes."""
+    connection = _connect(path)
+    for statement in layout["schema"]:
+        connection.execute(statement)
+    batch = []
+    for row in _rows(args):
+        batch.append(row)
+        if len(batch) == 10000:
+            for statement in layout["insert"]:
+                connection.executemany(statement, batch)
+            connection.commit()
+            batch = []
+    for statement in layout["insert"]:
+        connection.executemany(statement, batch)
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
+
+
+def _drop_os_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as control:
+        control.write("3\n")
+
+
+def run(path, layout, args):
+    """Time each case on a fresh connection (cold SQLite page cache)."""
+    rows = {}
+    for name, (kind, limit, offset) in CASES.items():
+        statements = (SUMMARY,) if kind == "summary" else layout["full"]
+        rng = random.Random(name)
+        if args.drop_caches:
+            _drop_os_caches()
+        connection = _connect(path)
+        samples = []
+        for _ in range(args.requests):
+            user_id = rng.randint(1, args.users)
+            started = time.perf_counter()
+            page = connection.execute(statements[0], (user_id, limit, offset)).fetchall()
+            for statement in statements[1:]:
+                ids = [row[0] for row in page]
+                connection.execute(statement.format(ids=", ".join("?" * len(ids))), ids).fetchall()
+            samples.append(time.perf_counter() - started)
+        connection.close()
+        rows[name] = summarize(samples)
+    return rows
+
+
+def _table_sizes(path):
+    """MiB per table and index (needs SQLite built with dbstat), else the file size."""
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name NOT LIKE 'sqlite_%' GROUP BY name"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = [("file", os.path.getsize(path))]
+    finally:
+        connection.close()
+    return ", ".join(f"{name} {size / 2 ** 20:.0f} MiB" for name, size in rows)
+
+
+def main(args):
+    directory = Path(args.directory or tempfile.mkdtemp(prefix="noteapp-bench-bodies-"))
+    for name, layout in LAYOUTS.items():
+        path = directory / f"{name}.db"
+        if not path.exists():
+            started = time.perf_counter()
+            build(path, layout, args)
+            print(f"Built {name} layout ({args.notes} notes) in {time.perf_counter() - started:.0f}s")
+        print(f"{name}: {_table_sizes(path)}")
+        print_table(f"Note lists, content {name}", run(path, layout, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--directory", default=None, help="Reuse databases built by an earlier run (same --notes/--users)"
+    )
+    parser.add_argument(
+        "--drop-caches", action="store_true", help="Empty the OS page cache before each case"
+    )
+    main(parser.parse_args())
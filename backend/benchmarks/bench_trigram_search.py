@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for typo-tolerant note search and search-as-you-type.
+
+Builds one user's note index over synthetic notes and times searches for
+words with one typo (a swapped pair of letters), a two-word search, and
+suggestions for typed prefixes.
+
+Then times GET /api/notes/suggest end to end for a user with --notes notes
+in three states of the per-worker index cache: warm; expired (older than
+the TTL, served while it is rebuilt in the background); and cold (not
+built: titles come from the database while the build runs), with the
+background builds running alongside. The last row mixes the three, with
+--cold-share and --expired-share of the requests cold and expired.
+
+Usage:
+    python benchmarks/bench_trigram_search.py --notes 20000 --searches 2000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from _common import setup_environment, print_table, summarize
+
+setup_environment()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.trigrams import TrigramIndex, note_trigram_indexes  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.domain.models import Note, NoteBody, note_summary_values  # noqa: E402
+
+
+def _vocabulary(rng, size):
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+def _typo(rng, word):
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _notes(rng, words, count):
+    for _ in range(count):
+        yield (
+            " ".join(rng.choices(words, k=rng.randint(2, 6))),
+            " ".join(rng.choices(words, k=rng.randint(20, 120))),
+        )
+
+
+def run_endpoint(args, words):
+    """Time GET /api/notes/suggest with a warm, expired and cold index."""
+    rng = random.Random(22)
+    cache = note_trigram_indexes
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/auth/register", json={"email": "bench-suggest@example.com", "password": "Passw0rdX"}
+        )
+        user_id = response.json()["id"]
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        db = SessionLocal()
+        notes = list(_notes(rng, words, args.notes))
+        ids = db.scalars(insert(Note).returning(Note.id), [
+            {"user_id": user_id, "title": title, **note_summary_values(content)} for title, content in notes
+        ]).all()
+        db.execute(insert(NoteBody), [
+            {"note_id": note_id, "content": content} for note_id, (_, content) in zip(ids, notes)
+        ])
+        db.commit()
+        db.close()
+
+        # Each state is held for every request; the background builds it
+        # starts keep running alongside the requests, as they would in a worker
+        def expire():
+            entry = cache._indexes.get(user_id)
+            index = entry[0] if entry else cache.wait(user_id)
+            cache._indexes.set(user_id, (index, 0.0))
+
+        states = {"warm": lambda: cache.wait(user_id), "expired": expire, "cold": cache.clear}
+        samples = {}
+        for state, prepare in states.items():
+            samples[state] = []
+            for _ in range(args.searches):
+                prepare()
+                prefix = rng.choice(words)[:3]
+                started = time.perf_counter()
+                client.get("/api/notes/suggest", params={"prefix": prefix}, headers=headers).raise_for_status()
+                samples[state].append(time.perf_counter() - started)
+        cache.wait(user_id)
+
+    rows = {f"suggest, {state}": summarize(values) for state, values in samples.items()}
+    cold = round(args.searches * args.cold_share)
+    expired = round(args.searches * args.expired_share)
+    rows["suggest, all requests"] = summarize(
+        samples["cold"][:cold] + samples["expired"][:expired] + samples["warm"][:args.searches - cold - expired]
+    )
+    return rows
+
+
+def main(args):
+    rng = random.Random(21)
+    words = _vocabulary(rng, args.vocabulary)
+    index = TrigramIndex()
+
+    start = time.perf_counter()
+    for note_id, (title, content) in enumerate(_notes(rng, words, args.notes), start=1):
+        index.add(note_id, title, content)
+    index.finish_build()
+    build = time.perf_counter() - start
+
+    cases = {
+        "one word, one typo": (index.search, lambda: _typo(rng, rng.choice(words))),
+        "two words, one typo": (
+            index.search, lambda: f"{rng.choice(words)} {_typo(rng, rng.choice(words))}"
+        ),
+        "suggest, 1-letter prefix": (index.suggest, lambda: rng.choice(words)[:1]),
+        "suggest, 3-letter prefix": (index.suggest, lambda: rng.choice(words)[:3]),
+    }
+    rows = {}
+    for name, (lookup, make_text) in cases.items():
+        samples = []
+        for _ in range(args.searches):
+            text = make_text()
+            started = time.perf_counter()
+            lookup(text, 10)
+            samples.append(time.perf_counter() - started)
+        rows[name] = summarize(samples)
+
+    print(f"\nIndexed {args.notes} notes in {build:.2f}s")
+    print_table("Note index lookups", rows)
+    print_table(
+        f"GET /api/notes/suggest ({args.cold_share:.0%} cold, {args.expired_share:.0%} expired in all requests)",
+        run_endpoint(args, words),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--cold-share", type=float, default=0.01)
+    parser.add_argument("--expired-share", type=float, default=0.05)
+    main(parser.parse_args())
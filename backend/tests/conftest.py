@@ -0,0 +1,35 @@
+"""
+Pytest configuration for backend tests.
+
+Points the app at a throwaway SQLite database before it is imported, with
+rate limiting off (tests that need it install a limiter themselves).
+Run with DB_ASYNC=1 to drive the same tests through the async engine.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_data_dir = tempfile.mkdtemp(prefix="noteapp-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_data_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-change-me-0123456789abcdef")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+os.environ.setdefault("RATE_LIMIT_PER_IP_PER_MINUTE", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def register_user():
+    """Register a user through the API: register(client, email) -> (user id, auth headers)."""
+    from app.core.security import create_access_token
+
+    def register(client, email, password="Passw0rdX"):
+        response = client.post("/api/auth/register", json={"email": email, "password": password})
+        assert response.status_code == 201, response.text
+        user_id = response.json()["id"]
+        return user_id, {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+    return register
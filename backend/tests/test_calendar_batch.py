@@ -0,0 +1,47 @@
+"""
+Calendar batches check new events against where the batch moves existing ones.
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def _event(title, start, hours=1):
+    return {"title": title, "start_time": start.isoformat(), "end_time": (start + timedelta(hours=hours)).isoformat()}
+
+
+def test_creates_are_checked_against_updated_times(register_user):
+    day = datetime(2031, 3, 3, 0, 0)
+    with TestClient(app) as client:
+        _, headers = register_user(client, "batch-moves@example.com")
+        moving = client.post("/api/calendar/", json=_event("moving", day.replace(hour=10)), headers=headers).json()
+        far = client.post("/api/calendar/", json=_event("far", day + timedelta(days=5)), headers=headers).json()
+
+        def batch(create, update):
+            return client.post(
+                "/api/calendar/batch",
+                json={"create": create, "update": update, "atomic": False},
+                headers=headers,
+            ).json()
+
+        # The slot "moving" leaves is free; the one it moves to is taken, as is
+        # the slot "far" is moved into from outside the batch's window
+        result = batch(
+            [
+                _event("into old slot", day.replace(hour=10)),
+                _event("into new slot", day.replace(hour=12, minute=30)),
+                _event("beside far", day.replace(hour=14, minute=30)),
+            ],
+            [
+                {"id": moving["id"], **{k: v for k, v in _event("moved", day.replace(hour=12)).items() if k != "title"}},
+                {"id": far["id"], **_event("far moved", day.replace(hour=14))},
+            ],
+        )
+        assert [event["title"] for event in result["created"]] == ["into old slot"]
+        assert sorted(error["detail"] for error in result["errors"]) == [
+            "Event conflicts with existing event: far moved",
+            "Event conflicts with existing event: moving",
+        ]
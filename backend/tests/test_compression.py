@@ -0,0 +1,59 @@
+"""
+Compressed note content: transparent to the API and search, convertible in place.
+"""
+
+import random
+
+from fastapi.testclient import TestClient
+from sqlalchemy import Text, select, type_coerce
+
+from app import cli
+from app.main import app
+from app.core.config import settings
+from app.db.session import engine
+from app.domain.models import NoteBody
+
+
+def _stored(note_id):
+    with engine.connect() as connection:
+        return connection.scalar(
+            select(type_coerce(NoteBody.__table__.c.content, Text)).where(NoteBody.note_id == note_id)
+        )
+
+
+def _long_text(rng, marker):
+    words = ["meeting", "budget", "roadmap", "release", "customer", "review", "design", "notes"]
+    return " ".join(rng.choice(words) for _ in range(400)) + f" {marker}"
+
+
+def test_compressed_content_round_trips_and_stays_searchable(monkeypatch, register_user):
+    rng = random.Random(23)
+    monkeypatch.setattr(settings, "NOTE_COMPRESSION", "zlib")
+    with TestClient(app) as client:
+        _, headers = register_user(client, "zip@example.com")
+
+        content = _long_text(rng, "zeppelin")
+        note = client.post("/api/notes/", json={"title": "Long", "content": content}, headers=headers).json()
+        short = client.post("/api/notes/", json={"title": "Short", "content": "tiny"}, headers=headers).json()
+
+        assert note["content"] == content
+        assert isinstance(_stored(note["id"]), bytes) and len(_stored(note["id"])) < len(content)
+        assert _stored(short["id"]) == "tiny"
+        assert client.get(f"/api/notes/{note['id']}", headers=headers).json()["content"] == content
+        assert [n["id"] for n in client.get("/api/notes/", params={"search": "zeppelin"}, headers=headers).json()] == [note["id"]]
+
+        updated = _long_text(rng, "hovercraft")
+        client.put(f"/api/notes/{note['id']}", json={"content": updated}, headers=headers)
+        assert client.get("/api/notes/", params={"search": "zeppelin"}, headers=headers).json() == []
+        assert client.get("/api/notes/", params={"search": "hovercraft"}, headers=headers).json()[0]["content"] == updated
+
+        # Dictionary-compressed rewrite, then back to plain text
+        assert cli.main(["train-dictionary"]) == 0
+        assert cli.main(["recompress", "--batch-size", "1"]) == 0
+        assert _stored(note["id"])[:1] == b"\x02"
+        assert client.get(f"/api/notes/{note['id']}", headers=headers).json()["content"] == updated
+
+        monkeypatch.setattr(settings, "NOTE_COMPRESSION", "none")
+        assert cli.main(["recompress"]) == 0
+        assert _stored(note["id"]) == updated
+        assert client.get("/api/notes/", params={"search": "hovercraft"}, headers=headers).json()[0]["id"] == note["id"]
@@ -0,0 +1,154 @@
+"""
+Entity counters stay equal to the real row counts across write paths.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import notes as notes_api, tasks as tasks_api
+from app.db import counters
+from app.db.counters import adjust_counters, task_status_deltas
+from app.db.writes import delete_owned
+from app.db.session import SessionLocal
+from app.domain.models import Note, Task, TaskStatus, CalendarEvent, UserCounters
+
+
+def _actual_counts(user_id):
+    db = SessionLocal()
+    try:
+        def count(model, *criteria):
+            return db.query(model).filter(model.user_id == user_id, *criteria).count()
+
+        return {
+            "notes": count(Note),
+            "tasks": {
+                "todo": count(Task, Task.status == TaskStatus.TODO),
+                "in_progress": count(Task, Task.status == TaskStatus.IN_PROGRESS),
+                "completed": count(Task, Task.status == TaskStatus.COMPLETED),
+            },
+            "events": count(CalendarEvent),
+            "upcoming_events": count(CalendarEvent, CalendarEvent.end_time >= datetime.utcnow()),
+        }
+    finally:
+        db.close()
+
+
+def test_counters_follow_single_and_batch_writes(register_user):
+    rng = random.Random(19)
+    statuses = [task_status.value for task_status in TaskStatus]
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "counters@example.com")
+        start = datetime.utcnow() - timedelta(days=3)
+        note_ids, task_ids, event_ids = [], [], []
+
+        for step in range(60):
+            action = rng.choice(["note", "task", "status", "event", "delete", "batch"])
+            if action == "note":
+                note_ids.append(client.post("/api/notes/", json={"title": "n"}, headers=headers).json()["id"])
+            elif action == "task":
+                task = {"title": "t", "status": rng.choice(statuses)}
+                task_ids.append(client.post("/api/tasks/", json=task, headers=headers).json()["id"])
+            elif action == "status" and task_ids:
+                client.put(f"/api/tasks/{rng.choice(task_ids)}", json={"status": rng.choice(statuses)}, headers=headers)
+            elif action == "event":
+                event_start = start + timedelta(hours=2 * step)
+                event = {
+                    "title": "e",
+                    "start_time": event_start.isoformat(),
+                    "end_time": (event_start + timedelta(hours=1)).isoformat(),
+                }
+                event_ids.append(client.post("/api/calendar/", json=event, headers=headers).json()["id"])
+            elif action == "delete":
+                for path, ids in (("notes", note_ids), ("tasks", task_ids), ("calendar", event_ids)):
+                    if ids:
+                        client.delete(f"/api/{path}/{ids.pop(rng.randrange(len(ids)))}", headers=headers)
+            elif action == "batch":
+                payload = {
+                    "atomic": False,
+                    "create": [{"title": "bt", "status": rng.choice(statuses)} for _ in range(3)],
+                    "update": [{"id": task_id, "status": rng.choice(statuses)} for task_id in task_ids[:2]],
+                    "delete": task_ids[2:3] + [10 ** 9],
+                }
+                result = client.post("/api/tasks/batch", json=payload, headers=headers).json()
+                task_ids = [task_id for task_id in task_ids if task_id not in result["deleted"]]
+                task_ids += [task["id"] for task in result["created"]]
+
+        counts = client.get("/api/stats/counts", headers=headers).json()
+
+    expected = _actual_counts(user_id)
+    assert counts["notes"] == expected["notes"]
+    assert counts["events"] == expected["events"]
+    assert counts["upcoming_events"] == expected["upcoming_events"]
+    assert {key: counts["tasks"][key] for key in expected["tasks"]} == expected["tasks"]
+    assert counts["tasks"]["total"] == sum(expected["tasks"].values())
+
+
+def test_batch_counters_skip_rows_deleted_meanwhile(monkeypatch, register_user):
+    def deleting_first(module, model, ids, deltas):
+        """Run another request's deletes of ``ids`` just before the batch is applied."""
+        apply_batch = module.apply_batch
+
+        def apply(db, batch_model, batch):
+            for row_id in ids:
+                row = delete_owned(db, model, row_id, batch.user_id)
+                adjust_counters(db, batch.user_id, **deltas(row))
+            return apply_batch(db, batch_model, batch)
+
+        monkeypatch.setattr(module, "apply_batch", apply)
+
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "raced@example.com")
+        task_ids = [client.post("/api/tasks/", json={"title": "t"}, headers=headers).json()["id"] for _ in range(3)]
+        note_ids = [client.post("/api/notes/", json={"title": "n"}, headers=headers).json()["id"] for _ in range(3)]
+
+        deleting_first(tasks_api, Task, task_ids[:2], lambda task: task_status_deltas(removed=[task.status]))
+        result = client.post("/api/tasks/batch", headers=headers, json={
+            "atomic": False,
+            "update": [{"id": task_ids[0], "status": "completed"}, {"id": task_ids[2], "status": "completed"}],
+            "delete": [task_ids[1]],
+        })
+        assert result.status_code == 200
+        assert [task["id"] for task in result.json()["updated"]] == [task_ids[2]]
+        assert result.json()["deleted"] == []
+        assert [error["id"] for error in result.json()["errors"]] == [task_ids[1], task_ids[0]]
+
+        deleting_first(notes_api, Note, note_ids[:2], lambda note: {"notes": -1})
+        result = client.post("/api/notes/batch", headers=headers, json={
+            "atomic": False,
+            "update": [{"id": note_ids[0], "content": "gone"}, {"id": note_ids[2], "content": "kept"}],
+            "delete": [note_ids[1]],
+        })
+        assert result.status_code == 200
+        assert [note["content"] for note in result.json()["updated"]] == ["kept"]
+        assert result.json()["deleted"] == []
+
+        counts = client.get("/api/stats/counts", headers=headers).json()
+
+    expected = _actual_counts(user_id)
+    assert counts["notes"] == expected["notes"] == 1
+    assert {key: counts["tasks"][key] for key in expected["tasks"]} == expected["tasks"]
+    assert expected["tasks"]["completed"] == 1
+
+
+def test_missing_counters_row_created_by_racing_writes(monkeypatch, register_user):
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "counters-race@example.com")
+        client.post("/api/notes/", json={"title": "n"}, headers=headers)
+
+    db = SessionLocal()
+    try:
+        db.query(UserCounters).filter(UserCounters.user_id == user_id).delete()
+        db.commit()
+        # Both writes see no row; the second finds the one the first inserted
+        upsert = counters._upsert_counters
+        monkeypatch.setattr(counters, "_upsert_counters", lambda db, user_id, deltas: (
+            upsert(db, user_id, deltas), upsert(db, user_id, deltas)
+        ))
+        adjust_counters(db, user_id, notes=1)
+        db.commit()
+        assert db.get(UserCounters, user_id).notes == 2  # the data (1) plus the second write's delta
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""
+bcrypt cost: calibrated once and shared through the database, never lowered.
+"""
+
+from contextlib import contextmanager
+
+import bcrypt
+import pytest
+from sqlalchemy import create_engine
+
+from app.core import security
+from app.core.config import settings
+from app.db import hashing
+from app.db.migrations import migrate
+
+
+def test_cost_is_calibrated_once_and_shared(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cost.db'}")
+    migrate(engine)
+    calls = []
+    monkeypatch.setattr(hashing, "calibrate_bcrypt_rounds", lambda target_ms: calls.append(target_ms) or 13)
+
+    assert hashing.load_bcrypt_rounds(engine, calibrate=False, target_ms=250) is None
+    assert hashing.load_bcrypt_rounds(engine, calibrate=True, target_ms=250) == 13
+    # Later workers read the stored value instead of measuring again, without the lock
+    monkeypatch.setattr(hashing, "locked_transaction", None)
+    assert hashing.load_bcrypt_rounds(engine, calibrate=True, target_ms=250) == 13
+    assert calls == [250]
+    engine.dispose()
+
+
+def test_worker_that_waited_for_the_lock_uses_the_cost_stored_meanwhile(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cost.db'}")
+    migrate(engine)
+    monkeypatch.setattr(hashing, "calibrate_bcrypt_rounds", lambda target_ms: pytest.fail("calibrated twice"))
+    locked_transaction = hashing.locked_transaction
+
+    @contextmanager
+    def after_another_worker(engine):
+        with locked_transaction(engine) as connection:
+            hashing.save_bcrypt_rounds(connection, 14, 250)
+        with locked_transaction(engine) as connection:
+            yield connection
+
+    monkeypatch.setattr(hashing, "locked_transaction", after_another_worker)
+    assert hashing.load_bcrypt_rounds(engine, calibrate=True, target_ms=250) == 14
+    engine.dispose()
+
+
+def test_cost_never_drops_below_setting_and_hashes_only_upgrade(monkeypatch):
+    monkeypatch.setattr(security, "_bcrypt_rounds", settings.BCRYPT_ROUNDS)
+    security.set_bcrypt_rounds(settings.BCRYPT_ROUNDS - 2)
+    assert security.get_bcrypt_rounds() == settings.BCRYPT_ROUNDS
+
+    def stored(rounds):
+        return bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=rounds)).decode()
+
+    current = settings.BCRYPT_ROUNDS
+    assert security.password_needs_rehash(stored(current - 1))
+    assert not security.password_needs_rehash(stored(current))
+    assert not security.password_needs_rehash(f"$2b${current + 1:02d}$" + "x" * 53)
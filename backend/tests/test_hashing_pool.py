@@ -0,0 +1,77 @@
+"""
+Password hashing pool: bounded queue, queue-wait timeout, 503 with Retry-After when saturated.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import hashing
+from app.core.hashing import PasswordHasherBusy, PasswordHasherPool
+
+
+def test_full_pool_rejects_instead_of_queueing():
+    pool = PasswordHasherPool(max_workers=1, max_queue=0, queue_timeout=1.5)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordHasherBusy) as busy:
+            await pool.run(lambda: None)
+        release.set()
+        assert await running is True
+        return busy.value.retry_after
+
+    assert asyncio.run(scenario()) == 2
+    assert (pool.stats()["rejected_full"], pool.stats()["completed"]) == (1, 1)
+
+
+def test_queued_callers_are_rejected_at_the_queue_timeout():
+    pool = PasswordHasherPool(max_workers=1, max_queue=5, queue_timeout=0.2)
+    ran = []
+
+    async def queued():
+        started = time.monotonic()
+        with pytest.raises(PasswordHasherBusy):
+            await pool.run(ran.append, "queued")
+        return time.monotonic() - started
+
+    async def scenario():
+        slow = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0.01)
+        waits = await asyncio.gather(*(queued() for _ in range(5)))
+        # The slots of dropped jobs are free again while the slow job still runs
+        assert not slow.done()
+        assert pool.stats()["pending"] == 1
+        await slow
+        return waits
+
+    waits = asyncio.run(scenario())
+    assert all(0.2 <= wait < 0.4 for wait in waits), waits
+    assert ran == []
+    assert (pool.stats()["rejected_timeout"], pool.stats()["completed"]) == (5, 1)
+
+
+def test_started_jobs_are_not_cut_off_by_the_queue_timeout():
+    pool = PasswordHasherPool(max_workers=1, max_queue=0, queue_timeout=0.05)
+    assert asyncio.run(pool.run(lambda: time.sleep(0.2) or "hashed")) == "hashed"
+    assert pool.stats()["rejected_timeout"] == 0
+
+
+def test_saturated_pool_returns_503_with_retry_after(monkeypatch, register_user):
+    saturated = PasswordHasherPool(max_workers=1, max_queue=0, queue_timeout=3)
+    saturated._slots.acquire()  # the only slot is taken
+    with TestClient(app) as client:
+        register_user(client, "hashing@example.com")
+        monkeypatch.setattr(hashing, "password_pool", saturated)
+
+        register = client.post("/api/auth/register", json={"email": "busy@example.com", "password": "Passw0rdX"})
+        login = client.post("/api/auth/login", data={"username": "hashing@example.com", "password": "Passw0rdX"})
+    for response in (register, login):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,63 @@
+"""
+Login brute-force protection: exponential lockout, rejected before the database and bcrypt.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import auth
+from app.core import login_guard
+from app.core.login_guard import LoginThrottle, login_keys
+
+
+def _throttle():
+    return LoginThrottle(threshold=3, base_delay=1.0, max_delay=4.0, maxsize=100, window=3600)
+
+
+def test_lockout_backs_off_exponentially_up_to_the_cap(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(login_guard.time, "monotonic", lambda: now[0])
+    throttle = _throttle()
+    keys = login_keys(" Someone@Example.com ", "10.0.0.1")
+    assert keys == ("account:someone@example.com", "ip:10.0.0.1")
+
+    lockouts = []
+    for _ in range(6):
+        throttle.record_failure(keys)
+        lockouts.append(throttle.retry_after(keys))
+    assert lockouts == [0.0, 0.0, 1.0, 2.0, 4.0, 4.0]
+    assert throttle.stats()["rejected"] == 4
+
+    now[0] += 4.0
+    assert throttle.retry_after(keys) == 0.0
+    # A success clears the account; the IP keeps its count
+    throttle.reset(keys[0])
+    throttle.record_failure(keys)
+    assert throttle.retry_after([keys[0]]) == 0.0
+    assert throttle.retry_after([keys[1]]) == 4.0
+
+
+def test_locked_login_gets_429_without_checking_the_password(monkeypatch, register_user):
+    throttle = _throttle()
+    monkeypatch.setattr(auth, "login_throttle", throttle)
+    with TestClient(app) as client:
+        register_user(client, "locked@example.com")
+
+        def login(password):
+            return client.post("/api/auth/login", data={"username": "locked@example.com", "password": password})
+
+        assert [login("wrong").status_code for _ in range(3)] == [401, 401, 401]
+
+        def unreachable(*args):
+            raise AssertionError("a locked out login reached the database or bcrypt")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(auth, "_get_user_by_email", unreachable)
+            patched.setattr(auth, "check_password", unreachable)
+            response = login("Passw0rdX")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+
+        throttle.reset(login_keys("locked@example.com", "testclient")[0])
+        throttle.reset(login_keys("locked@example.com", "testclient")[1])
+        assert login("Passw0rdX").status_code == 200
@@ -0,0 +1,109 @@
+"""
+Schema migration tests against throwaway SQLite files.
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.db import migrations
+from app.db.migrations import HEAD, current_version, ensure_schema, migrate
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_empty_database_is_created_at_head(fresh_engine):
+    assert current_version(fresh_engine) is None
+    migrate(fresh_engine)
+    assert current_version(fresh_engine) == HEAD
+    assert "ix_notes_user_updated" in _index_names(fresh_engine, "notes")
+    assert migrate(fresh_engine) == []
+
+
+def test_pre_versioning_database_is_upgraded(fresh_engine, monkeypatch):
+    monkeypatch.setattr(migrations, "_BATCH_SIZE", 1)  # data migrations take several batches
+    with fresh_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(255))"))
+        for table in ("notes", "tasks", "calendar_events"):
+            connection.execute(text(
+                f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, user_id INTEGER, title VARCHAR(255), "
+                "content TEXT, updated_at DATETIME, due_date DATETIME, status VARCHAR(11), start_time DATETIME, end_time DATETIME)"
+            ))
+            connection.execute(text(f"CREATE INDEX ix_{table}_user_id ON {table} (user_id)"))
+        connection.execute(text("INSERT INTO users (id, email) VALUES (1, 'old@example.com')"))
+        connection.execute(text("INSERT INTO notes (user_id, title) VALUES (1, 'a'), (1, 'b')"))
+        connection.execute(text("UPDATE notes SET content = 'legacy body' WHERE title = 'b'"))
+        connection.execute(text("INSERT INTO tasks (user_id, title, status) VALUES (1, 't', 'COMPLETED')"))
+
+    assert current_version(fresh_engine) == 1
+    applied = migrate(fresh_engine)
+
+    # Everything up to the contract step: notes.content stays for old workers
+    assert [migration.version for migration in applied] == list(range(2, HEAD))
+    assert current_version(fresh_engine) == HEAD - 1
+    ensure_schema(fresh_engine, auto_migrate=False)
+    assert {"revoked_tokens", "user_counters"} <= set(inspect(fresh_engine).get_table_names())
+    assert _index_names(fresh_engine, "notes") >= {"ix_notes_user_updated"}
+    assert "ix_notes_user_id" not in _index_names(fresh_engine, "notes")
+    with fresh_engine.begin() as connection:
+        counters = connection.execute(text(
+            "SELECT notes, tasks_todo, tasks_completed, events FROM user_counters WHERE user_id = 1"
+        )).one()
+        summary = connection.execute(
+            text("SELECT excerpt, content_length FROM notes WHERE title = 'b'")
+        ).one()
+        bodies = connection.execute(text("SELECT note_id, content FROM note_bodies ORDER BY note_id")).all()
+        # Old and new writers see each other's content
+        connection.execute(text("UPDATE notes SET content = 'old worker' WHERE id = 1"))
+        connection.execute(text("UPDATE note_bodies SET content = 'new worker' WHERE note_id = 2"))
+        synced = connection.execute(text(
+            "SELECT notes.content, note_bodies.content FROM notes "
+            "JOIN note_bodies ON note_bodies.note_id = notes.id ORDER BY notes.id"
+        )).all()
+    assert tuple(counters) == (2, 0, 1, 0)
+    assert tuple(summary) == ("legacy body", 11)
+    assert [tuple(body) for body in bodies] == [(1, None), (2, "legacy body")]
+    assert [tuple(row) for row in synced] == [("old worker", "old worker"), ("new worker", "new worker")]
+
+    # An old worker's note created after the copy, then the contract step
+    with fresh_engine.begin() as connection:
+        connection.execute(text("INSERT INTO notes (user_id, title, excerpt, content_length) VALUES (1, 'c', '', 0)"))
+    assert [migration.version for migration in migrate(fresh_engine, contract=True)] == [HEAD]
+    assert current_version(fresh_engine) == HEAD
+    assert "content" not in {column["name"] for column in inspect(fresh_engine).get_columns("notes")}
+    with fresh_engine.connect() as connection:
+        bodies = connection.execute(text("SELECT note_id FROM note_bodies ORDER BY note_id")).scalars().all()
+        matches = connection.execute(text("SELECT rowid FROM notes_fts WHERE notes_fts MATCH 'worker'")).all()
+    assert bodies == [1, 2, 3]
+    assert len(matches) == 2
+
+
+def test_copy_keeps_bodies_written_meanwhile(fresh_engine, monkeypatch):
+    monkeypatch.setattr(migrations, "_BATCH_SIZE", 2)
+    with fresh_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, content TEXT)"))
+        connection.execute(text("CREATE TABLE note_bodies (note_id INTEGER PRIMARY KEY, content TEXT)"))
+        connection.execute(text("INSERT INTO notes (id, content) VALUES (1, 'copied'), (2, 'copied'), "
+                                "(3, 'stale'), (4, 'copied'), (5, 'copied')"))
+        # Written by a worker (through the sync triggers) before the copy got there
+        connection.execute(text("INSERT INTO note_bodies (note_id, content) VALUES (3, 'kept')"))
+    assert migrations.copy_note_bodies(fresh_engine) == 4
+    assert migrations.copy_note_bodies(fresh_engine) == 0
+    with fresh_engine.connect() as connection:
+        bodies = connection.execute(text("SELECT note_id, content FROM note_bodies ORDER BY note_id")).all()
+    assert [content for _, content in bodies] == ["copied", "copied", "kept", "copied", "copied"]
+
+
+def test_startup_check_refuses_outdated_schema(fresh_engine):
+    with pytest.raises(RuntimeError, match="app.cli migrate"):
+        ensure_schema(fresh_engine, auto_migrate=False)
+    ensure_schema(fresh_engine, auto_migrate=True)
+    ensure_schema(fresh_engine, auto_migrate=False)
@@ -0,0 +1,37 @@
+"""
+Note summaries: precomputed excerpts and lengths follow every content write.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.domain.models import NOTE_EXCERPT_LENGTH
+
+
+def test_summaries_follow_content_writes(register_user):
+    with TestClient(app) as client:
+        _, headers = register_user(client, "summary@example.com")
+
+        def summaries():
+            return {note["id"]: note for note in client.get("/api/notes/summary", headers=headers).json()}
+
+        long_content = "first   line\n" + "x" * 5000
+        note = client.post("/api/notes/", json={"title": "Long", "content": long_content}, headers=headers).json()
+        empty = client.post("/api/notes/", json={"title": "Empty"}, headers=headers).json()
+
+        summary = summaries()[note["id"]]
+        assert "content" not in summary
+        assert summary["content_length"] == len(long_content)
+        assert summary["excerpt"].startswith("first line x") and len(summary["excerpt"]) == NOTE_EXCERPT_LENGTH
+        assert (summaries()[empty["id"]]["excerpt"], summaries()[empty["id"]]["content_length"]) == (None, 0)
+
+        client.put(f"/api/notes/{note['id']}", json={"content": "short now"}, headers=headers)
+        client.put(f"/api/notes/{empty['id']}", json={"title": "Still empty"}, headers=headers)
+        client.post("/api/notes/batch", json={
+            "create": [{"title": "Batch", "content": "from a batch"}],
+            "update": [{"id": empty["id"], "content": "filled"}],
+        }, headers=headers)
+
+        by_excerpt = {item["excerpt"]: item["content_length"] for item in summaries().values()}
+        assert by_excerpt == {"short now": 9, "filled": 6, "from a batch": 12}
+        assert client.get("/api/bootstrap/", headers=headers).json()["notes"][0].keys() == summary.keys()
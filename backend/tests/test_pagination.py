@@ -0,0 +1,23 @@
+"""
+Keyset cursors: null is only accepted where the sort key can be null.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_null_only_for_nullable_keys():
+    when = datetime(2031, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor(when, 7), datetime, int) == (when, 7)
+    assert decode_cursor(encode_cursor(None, 7), Optional[datetime], int) == (None, 7)
+    for cursor in (encode_cursor(None, 7), encode_cursor(when, None)):
+        with pytest.raises(HTTPException) as excinfo:
+            decode_cursor(cursor, datetime, int)
+        assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(when, None), Optional[datetime], int)
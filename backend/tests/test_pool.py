@@ -0,0 +1,102 @@
+"""
+Connection pools: configured sizing, warm-up to the pool size, checkout counters.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_options, pool_stats, warm_async_pool, warm_pool,
+)
+
+
+@pytest.fixture
+def sizing(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.1)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+
+
+def _connects(engine):
+    opened = []
+    event.listen(engine, "connect", lambda *args: opened.append(1))
+    return opened
+
+
+def test_pool_options_follow_the_settings(sizing):
+    assert pool_options("postgresql://db/app", "primary") == {
+        "pool_pre_ping": False,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": 3,
+        "max_overflow": 2,
+        "pool_timeout": 0.1,
+        "pool_recycle": 600,
+        "pool_logging_name": "primary",
+    }
+    assert pool_options("sqlite:///app.db", "replica-0-async", is_async=True)["poolclass"] is InstrumentedAsyncQueuePool
+    # In-memory SQLite keeps SQLAlchemy's own pool
+    assert pool_options("sqlite://", "primary") == {"pool_pre_ping": False}
+    assert pool_options("sqlite:///:memory:", "primary") == {"pool_pre_ping": False}
+
+
+def test_warm_pool_opens_the_configured_connections(sizing, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warm.db'}", **pool_options("sqlite:///warm.db", "warm-sync"))
+    opened = _connects(engine)
+    warm_pool(engine, settings.DB_POOL_SIZE)
+    stats = pool_stats(engine)
+    assert len(opened) == 3
+    assert (stats["size"], stats["idle"], stats["checked_out"], stats["overflow"]) == (3, 3, 0, 0)
+
+    # Later checkouts reuse the warm connections
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert len(opened) == 3
+    engine.dispose()
+
+
+def test_warm_async_pool_opens_the_configured_connections(sizing, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm-async.db'}",
+        **pool_options("sqlite:///warm-async.db", "warm-async", is_async=True),
+    )
+    opened = _connects(engine.sync_engine)
+
+    async def scenario():
+        await warm_async_pool(engine, settings.DB_POOL_SIZE)
+        stats = pool_stats(engine.sync_engine)
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert len(opened) == 3
+    assert (stats["class"], stats["idle"], stats["checked_out"]) == ("InstrumentedAsyncQueuePool", 3, 0)
+
+
+def test_checkout_counters_track_waits_and_timeouts(sizing, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}", **pool_options("sqlite:///c.db", "counters"))
+    assert "checkouts" not in pool_stats(engine)
+
+    held = engine.connect()
+    stats = pool_stats(engine)
+    assert (stats["checkouts"], stats["checked_out"], stats["idle"], stats["timeouts"]) == (1, 1, 0, 0)
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    stats = pool_stats(engine)
+    assert (stats["checkouts"], stats["timeouts"]) == (2, 1)
+    assert stats["max_wait_ms"] >= 100  # waited out DB_POOL_TIMEOUT
+
+    held.close()
+    with engine.connect():
+        pass
+    stats = pool_stats(engine)
+    assert (stats["checkouts"], stats["checked_out"], stats["idle"], stats["timeouts"]) == (3, 0, 1, 1)
+    engine.dispose()
@@ -0,0 +1,31 @@
+"""
+Principal cache: authenticated requests reuse the user, writes to the row drop it.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.principals import get_cached_principal
+from app.db.session import SessionLocal
+from app.domain.models import User
+
+
+def test_principal_cache_drops_updated_and_deleted_users(register_user):
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "cached@example.com")
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        assert get_cached_principal(user_id) is not None
+
+        db = SessionLocal()
+        try:
+            db.get(User, user_id).email = "renamed@example.com"
+            db.commit()
+            assert get_cached_principal(user_id) is None
+            assert client.get("/api/auth/me", headers=headers).json()["email"] == "renamed@example.com"
+
+            db.delete(db.get(User, user_id))
+            db.commit()
+        finally:
+            db.close()
+        assert get_cached_principal(user_id) is None
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
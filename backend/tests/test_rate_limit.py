@@ -0,0 +1,54 @@
+"""
+Rate limiting middleware: 429 with Retry-After once a client's bucket is empty.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import rate_limit
+from app.core.config import settings
+
+
+def test_requests_over_budget_get_429_with_retry_after(monkeypatch, register_user):
+    with TestClient(app) as client:
+        _, headers = register_user(client, "limited@example.com")
+        _, other = register_user(client, "unlimited@example.com")
+        monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 2)
+        monkeypatch.setattr(rate_limit, "limiter", rate_limit.MemoryRateLimiter(2))
+
+        first, second, third = (client.get("/api/auth/me", headers=headers) for _ in range(3))
+        assert (first.status_code, second.status_code) == (200, 200)
+        assert (first.headers["X-RateLimit-Remaining"], second.headers["X-RateLimit-Remaining"]) == ("1", "0")
+        assert third.status_code == 429
+        assert third.json() == {"detail": "Rate limit exceeded"}
+        assert third.headers["Retry-After"] == "30"  # one token every 30 seconds
+
+        # Buckets are per user; documentation paths are never limited
+        assert client.get("/api/auth/me", headers=other).status_code == 200
+        assert client.get("/api/docs", headers=headers).status_code == 200
+
+
+def test_anonymous_requests_are_limited_per_client_ip(monkeypatch):
+    monkeypatch.setattr(rate_limit, "limiter", rate_limit.MemoryRateLimiter(1))
+    with TestClient(app) as client:
+        assert client.get("/api/auth/me").status_code == 401
+        limited = client.get("/api/auth/me", headers={"Authorization": "Bearer not-a-token"})
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == 60
+
+
+def test_every_request_also_draws_from_the_client_ip_bucket(monkeypatch, register_user):
+    with TestClient(app) as client:
+        _, first = register_user(client, "ip-first@example.com")
+        _, second = register_user(client, "ip-second@example.com")
+        monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 10)
+        monkeypatch.setattr(settings, "RATE_LIMIT_PER_IP_PER_MINUTE", 3)
+        monkeypatch.setattr(rate_limit, "limiter", rate_limit.MemoryRateLimiter(10))
+        monkeypatch.setattr(rate_limit, "ip_limiter", rate_limit.MemoryRateLimiter(3))
+
+        # Switching accounts does not reset the budget of the client behind them
+        responses = [client.get("/api/auth/me", headers=headers) for headers in (first, second, first, second)]
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[0].headers["X-RateLimit-Limit"] == "3"
+    assert responses[2].headers["X-RateLimit-Remaining"] == "0"
+    assert responses[3].headers["Retry-After"] == "20"
@@ -0,0 +1,33 @@
+"""
+Shared SQLite rate limiter: idle buckets are pruned, unknown backends rejected.
+"""
+
+import sqlite3
+
+import pytest
+
+from app.core import rate_limit
+from app.core.config import settings
+
+
+def test_idle_buckets_are_deleted(tmp_path, monkeypatch):
+    limiter = rate_limit.SQLiteRateLimiter(per_minute=2, path=str(tmp_path / "buckets.db"))
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: clock[0])
+
+    assert limiter.hit("ip:a")[0] and limiter.hit("ip:a")[0]
+    assert not limiter.hit("ip:a")[0]
+    clock[0] += 30
+    limiter.hit("ip:b")
+
+    clock[0] += 45  # a refilled 75 s after its last hit, b only 45 s
+    limiter.hit("ip:c")
+    keys = {key for (key,) in sqlite3.connect(limiter.path).execute("SELECT key FROM buckets")}
+    assert keys == {"ip:b", "ip:c"}
+    assert limiter.hit("ip:a")[1] == 1  # a full bucket again
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "redis")
+    with pytest.raises(ValueError, match="RATE_LIMIT_BACKEND"):
+        rate_limit._create_limiter(60)
@@ -0,0 +1,95 @@
+"""
+Replica routing and read-your-writes pins (signed by the writing request, honoured by any worker).
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, table, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db import routing
+
+
+def _routing_sessions(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+
+    class Session(routing.RoutingSession):
+        replicas = [replica]
+
+    return primary, replica, sessionmaker(bind=primary, class_=Session)
+
+
+def test_reads_go_to_replicas_until_the_user_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "recent_writers", routing.TTLCache(maxsize=10, ttl=60))
+    primary, replica, SessionLocal = _routing_sessions(tmp_path)
+    db = SessionLocal()
+    assert db.get_bind() is primary  # not marked read-only
+    db.info["read_only"] = True
+    assert db.get_bind() is primary  # no user: nothing to scope a pin to
+    db.info["user_id"] = 1
+    assert db.get_bind() is replica
+    assert db.get_bind(clause=delete(table("t"))) is primary  # writes never go to a replica
+    db.close()
+
+    # A committed write pins the writer (only) to the primary
+    writer = SessionLocal()
+    writer.info.update(user_id=1)
+    writer.execute(text("CREATE TABLE t (x INTEGER)"))
+    writer.info["wrote"] = True
+    writer.commit()
+    writer.close()
+    for user_id, bind in ((1, primary), (2, replica)):
+        reader = SessionLocal()
+        reader.info.update(read_only=True, user_id=user_id)
+        assert reader.get_bind() is bind
+        reader.close()
+
+
+def test_pin_is_signed_and_expires(monkeypatch):
+    pin = routing.sign_pin(7, 1000.0)
+    monkeypatch.setattr(routing.time, "time", lambda: 1000.0 + settings.READ_YOUR_WRITES_SECONDS / 2)
+    assert routing.pinned_user(pin) == 7
+    assert routing.pinned_user(pin.replace("7.", "8.", 1)) is None
+    assert routing.pinned_user("garbage") is None and routing.pinned_user(None) is None
+    monkeypatch.setattr(routing.time, "time", lambda: 1000.0 + settings.READ_YOUR_WRITES_SECONDS)
+    assert routing.pinned_user(pin) is None
+
+
+def test_pinned_reads_go_to_primary(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "recent_writers", routing.TTLCache(maxsize=10, ttl=60))
+    primary, replica, SessionLocal = _routing_sessions(tmp_path)
+    db = SessionLocal()
+    db.info.update(read_only=True, user_id=1, pinned_user_id=None)
+    assert db.get_bind() is replica
+    db.info["pinned_user_id"] = 2  # someone else's pin
+    assert db.get_bind() is replica
+    db.info["pinned_user_id"] = 1
+    assert db.get_bind() is primary
+    db.close()
+
+
+def test_committed_write_returns_pin(tmp_path):
+    primary, replica, SessionLocal = _routing_sessions(tmp_path)
+    app = FastAPI()
+    app.middleware("http")(routing.read_your_writes_middleware)
+
+    @app.post("/write")
+    def write():
+        db = SessionLocal()
+        db.info["user_id"] = 5
+        db.execute(text("CREATE TABLE IF NOT EXISTS t (x INTEGER)"))
+        db.info["wrote"] = True  # raw SQL is not tracked as an ORM write
+        db.commit()
+        db.close()
+
+    @app.get("/read")
+    def read():
+        return None
+
+    client = TestClient(app)
+    response = client.post("/write")
+    assert routing.pinned_user(response.headers[routing.PIN_HEADER]) == 5
+    assert routing.pinned_user(response.cookies[routing.PIN_COOKIE]) == 5
+    assert routing.PIN_HEADER not in client.get("/read").headers
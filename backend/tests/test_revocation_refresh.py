@@ -0,0 +1,78 @@
+"""
+Token revocation: logout and refresh rotation, and a revoke that commits while a refresh is reading is kept.
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.main import app
+from app.core import revocation
+from app.db.migrations import migrate
+
+
+def test_revoke_during_refresh_is_not_lost(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'revoked.db'}")
+    migrate(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    store = revocation.RevocationStore(refresh_interval=0)
+    exp = int(time.time()) + 3600
+    store.revoke(SessionLocal(), "before", exp)
+
+    class RacingSession(Session):
+        def close(self):
+            # Another request revokes after the snapshot was read
+            if not store.is_revoked("during"):
+                store.revoke(SessionLocal(), "during", exp)
+            super().close()
+
+    monkeypatch.setattr(revocation, "SessionLocal", sessionmaker(bind=engine, class_=RacingSession))
+    store.refresh()
+    assert store.is_revoked("before") and store.is_revoked("during")
+
+    # The next snapshot contains the row itself
+    monkeypatch.setattr(revocation, "SessionLocal", SessionLocal)
+    store.refresh()
+    assert store.is_revoked("during") and store._local == {}
+    engine.dispose()
+
+
+def _login(client, email):
+    response = client.post("/api/auth/login", data={"username": email, "password": "Passw0rdX"})
+    assert response.status_code == 200, response.text
+    tokens = response.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}, tokens["refresh_token"]
+
+
+def test_logout_revokes_access_and_refresh_tokens(register_user):
+    with TestClient(app) as client:
+        register_user(client, "logout@example.com")
+        headers, refresh_token = _login(client, "logout@example.com")
+        other_headers, other_refresh = _login(client, "logout@example.com")
+
+        response = client.post("/api/auth/logout", params={"refresh_token": refresh_token}, headers=headers)
+        assert response.status_code == 204
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+        assert client.post("/api/auth/refresh", params={"refresh_token": refresh_token}).status_code == 401
+        # Other sessions of the same user are untouched
+        assert client.get("/api/auth/me", headers=other_headers).status_code == 200
+        assert client.post("/api/auth/refresh", params={"refresh_token": other_refresh}).status_code == 200
+
+
+def test_refresh_rotates_the_refresh_token(register_user):
+    with TestClient(app) as client:
+        register_user(client, "rotate@example.com")
+        _, refresh_token = _login(client, "rotate@example.com")
+
+        rotated = client.post("/api/auth/refresh", params={"refresh_token": refresh_token})
+        assert rotated.status_code == 200
+        assert client.post("/api/auth/refresh", params={"refresh_token": refresh_token}).status_code == 401
+
+        tokens = rotated.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        # An access token is not a refresh token
+        assert client.post("/api/auth/refresh", params={"refresh_token": tokens["access_token"]}).status_code == 401
+        assert client.post("/api/auth/refresh", params={"refresh_token": tokens["refresh_token"]}).status_code == 200
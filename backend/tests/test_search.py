@@ -0,0 +1,96 @@
+"""
+Note search follows note writes, ranks title matches first and tolerates typos.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core.trigrams import note_trigram_indexes
+
+
+def test_search_matches_title_and_content_and_follows_writes(register_user):
+    with TestClient(app) as client:
+        _, headers = register_user(client, "search@example.com")
+        _, other = register_user(client, "search-other@example.com")
+
+        def search(term, who=headers):
+            response = client.get("/api/notes/", params={"search": term}, headers=who)
+            assert response.status_code == 200, response.text
+            return [note["id"] for note in response.json()]
+
+        in_content = client.post(
+            "/api/notes/", json={"title": "Groceries", "content": "buy oranges and apples"}, headers=headers
+        ).json()["id"]
+        in_title = client.post("/api/notes/", json={"title": "Orange cake recipe"}, headers=headers).json()["id"]
+        client.post("/api/notes/", json={"title": "Oranges", "content": "not yours"}, headers=other)
+
+        assert search("orange") == [in_title, in_content]  # prefix match, title weighs more
+        assert search("apples oranges") == [in_content]  # every term must match
+        assert search("%") == []
+
+        client.put(f"/api/notes/{in_content}", json={"content": "buy pears"}, headers=headers)
+        assert search("orange") == [in_title]
+        assert search("pears") == [in_content]
+
+        client.put(f"/api/notes/{in_title}", json={"title": "Lemon cake recipe"}, headers=headers)
+        assert search("orange") == []
+        assert search("lemon") == [in_title]
+
+        client.delete(f"/api/notes/{in_title}", headers=headers)
+        assert search("lemon") == []
+        assert len(search("orange", other)) == 1
+
+        response = client.get("/api/notes/", params={"search": "pears", "cursor": "x"}, headers=headers)
+        assert response.status_code == 400
+
+
+def test_misspelled_search_falls_back_to_trigram_matches(register_user):
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "typos@example.com")
+
+        def search(term):
+            return [note["id"] for note in client.get(
+                "/api/notes/", params={"search": term}, headers=headers
+            ).json()]
+
+        meeting = client.post(
+            "/api/notes/", json={"title": "Quarterly meeting", "content": "agenda and budget"}, headers=headers
+        ).json()["id"]
+        # Starts the index build; only threadpool handlers wait for it
+        assert search("meetign") == ([] if settings.DB_ASYNC else [meeting])
+        note_trigram_indexes.wait(user_id)
+        assert search("meetign") == [meeting]
+
+        # Writes after the build update the cached index
+        budget = client.post("/api/notes/", json={"title": "Budget draft"}, headers=headers).json()["id"]
+        assert search("budgte") == [budget, meeting]  # title match first
+        client.put(f"/api/notes/{meeting}", json={"content": "minutes"}, headers=headers)
+        assert search("budgte") == [budget]
+        client.delete(f"/api/notes/{budget}", headers=headers)
+        assert search("budgte") == []
+        assert search("xyzzy") == []
+
+
+def test_suggestions_follow_note_writes(register_user):
+    with TestClient(app) as client:
+        user_id, headers = register_user(client, "suggest@example.com")
+
+        def suggest(prefix):
+            response = client.get("/api/notes/suggest", params={"prefix": prefix}, headers=headers)
+            assert response.status_code == 200, response.text
+            return [title["title"] for title in response.json()["titles"]], response.json()["terms"]
+
+        client.post("/api/notes/", json={"title": "Weekly planning", "content": "plan the week"}, headers=headers)
+        client.post("/api/notes/", json={"title": "Trip plan", "content": "planes and trains"}, headers=headers)
+        # Cold: titles starting with the prefix, from the database, while the index builds
+        assert suggest("week") == (["Weekly planning"], [])
+        note_trigram_indexes.wait(user_id)
+        assert suggest("pla") == (["Trip plan", "Weekly planning"], ["plan", "planes", "planning"])
+        assert suggest("Week pla") == (["Weekly planning"], ["plan", "planes", "planning"])
+
+        created = client.post("/api/notes/", json={"title": "Plants to water"}, headers=headers).json()
+        assert suggest("pla")[0] == ["Plants to water", "Trip plan", "Weekly planning"]  # starts with it first
+        client.put(f"/api/notes/{created['id']}", json={"title": "Garden"}, headers=headers)
+        assert suggest("plant") == ([], [])
+        assert suggest("-") == ([], [])
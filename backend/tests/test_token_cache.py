@@ -0,0 +1,28 @@
+"""
+Verified-token cache: claims are reused until the token's exp, never past it.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from app.core import cache, security
+
+
+def _cache_key(token):
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def test_cached_claims_expire_with_the_token(monkeypatch):
+    token = security.create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=30))
+    assert security.decode_token(token)["sub"] == "1"
+    assert security.token_cache.get(_cache_key(token)) is not None
+
+    # The entry lives until exp, not for the cache's own (longer) TTL
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 31)
+    assert security.token_cache.ttl > 31
+    assert security.token_cache.get(_cache_key(token)) is None
+
+    expired = security.create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert security.decode_token(expired) is None
+    assert security.token_cache.get(_cache_key(expired)) is None
@@ -0,0 +1,62 @@
+"""
+Note index cache: one background build per user, writes during it kept, stale served.
+"""
+
+import threading
+import time
+
+from app.core import trigrams
+from app.core.trigrams import TrigramIndex, TrigramIndexCache
+
+
+class _Note:
+    def __init__(self, note_id, title, content=None):
+        self.id, self.title, self.content = note_id, title, content
+
+
+def test_one_build_per_user_and_writes_during_it_are_kept():
+    release = threading.Event()
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        release.wait(5)
+        return [(1, "Quarterly meeting", "budget")]
+
+    cache = TrigramIndexCache(maxsize=10, ttl=60, loader=loader)
+    assert cache.get(7) is None and cache.get(7) is None  # never blocks
+    cache.update(7, [_Note(2, "Budget draft")])
+    cache.update(7, deleted=[1])
+    release.set()
+    index = cache.wait(7)
+    assert loads == [7]
+    assert index.search("budgte", 10) == [2]
+
+
+def test_old_index_is_served_while_rebuilding(monkeypatch):
+    rows = [[(1, "First note", None)]]
+    cache = TrigramIndexCache(maxsize=10, ttl=60, loader=lambda user_id: rows[0])
+    old = cache.wait(1)
+    rows[0] = [(1, "First note", None), (2, "Second note", None)]
+
+    start = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: start + 30)
+    assert cache.get(1) is old  # use keeps it cached past its first TTL
+    monkeypatch.setattr(time, "monotonic", lambda: start + 61)
+    assert cache.get(1) is old  # a TTL old: still served while it is rebuilt
+    monkeypatch.undo()
+    deadline = time.monotonic() + 5
+    while cache.builds < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(cache.get(1)) == 2
+
+
+def test_builds_sort_in_short_runs_with_the_same_result(monkeypatch):
+    monkeypatch.setattr(trigrams, "_SORT_RUN", 3)
+    titles = ["delta", "alpha", "echo", "charlie", "bravo", "alpha beta", "foxtrot"]
+    index = TrigramIndex()
+    for note_id, title in enumerate(titles, start=1):
+        index.add(note_id, title, None)
+    index.finish_build()
+    assert trigrams._sorted_sliced(reversed(range(10))) == list(range(10))
+    assert index.suggest("al", 5)[0] == [(6, "alpha beta"), (2, "alpha")]
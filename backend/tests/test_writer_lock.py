@@ -0,0 +1,93 @@
+"""
+SQLite writer lock: write transactions queue behind each other, reads do not.
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.sqlite import writer_lock
+from app.domain.models import User
+
+
+@pytest.fixture(autouse=True)
+def started_app():
+    with TestClient(app):  # startup creates the schema
+        yield
+
+
+def _user_id():
+    db = SessionLocal()
+    try:
+        user = User(email="writer-lock@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def test_second_writer_waits_for_the_first_to_commit():
+    user_id = _user_id()
+    first = SessionLocal()
+    events = []
+    second_started = threading.Event()
+
+    def second_writer():
+        db = SessionLocal()
+        try:
+            second_started.set()
+            db.execute(update(User).where(User.id == user_id).values(email="second@example.com"))
+            events.append("second wrote")
+            db.commit()
+        finally:
+            db.close()
+
+    contended = writer_lock.contended
+    first.execute(update(User).where(User.id == user_id).values(email="first@example.com"))
+    assert first.info["sqlite_writer"]
+    thread = threading.Thread(target=second_writer)
+    thread.start()
+    second_started.wait()
+
+    # Readers are not queued behind the writer
+    reader = SessionLocal()
+    assert reader.scalar(select(User.email).where(User.id == user_id)) == "writer-lock@example.com"
+    reader.close()
+    thread.join(0.2)
+    assert thread.is_alive() and events == []
+
+    events.append("first committed")
+    first.commit()
+    thread.join(5)
+    first.close()
+
+    assert events == ["first committed", "second wrote"]
+    assert writer_lock.contended == contended + 1
+    db = SessionLocal()
+    assert db.scalar(select(User.email).where(User.id == user_id)) == "second@example.com"
+    db.close()
+
+
+def test_lock_is_released_on_rollback_and_taken_once_per_transaction():
+    db = SessionLocal()
+    acquisitions = writer_lock.acquisitions
+    db.add(User(email="rolled-back@example.com", password_hash="x"))
+    db.flush()
+    db.execute(update(User).where(User.email == "rolled-back@example.com").values(password_hash="y"))
+    db.rollback()
+    assert "sqlite_writer" not in db.info
+    assert writer_lock.acquisitions == acquisitions + 1
+
+    # Nothing left holding it: another session can write straight away
+    other = SessionLocal()
+    contended = writer_lock.contended
+    other.add(User(email="after-rollback@example.com", password_hash="x"))
+    other.commit()
+    other.close()
+    db.close()
+    assert writer_lock.contended == contended
@@ -0,0 +1,84 @@
+"""
+Owner-scoped writes: one RETURNING statement each, same results on the ORM fallback.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect
+
+from app.main import app
+from app.db import writes
+from app.db.session import SessionLocal, engine
+from app.domain.models import Task, TaskStatus, User
+
+
+@pytest.fixture(scope="module")
+def owners():
+    with TestClient(app):  # startup creates the schema
+        db = SessionLocal()
+        try:
+            users = [User(email=f"writes-{index}@example.com", password_hash="x") for index in range(2)]
+            db.add_all(users)
+            db.commit()
+            yield [user.id for user in users]
+        finally:
+            db.close()
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "orm-fallback"])
+def returning(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(writes, "supports_returning", lambda db: False)
+    return request.param
+
+
+def _statements(run):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_owned_writes_round_trip_in_one_statement(owners, returning):
+    owner, stranger = owners
+    db = SessionLocal()
+    try:
+        task, statements = _statements(lambda: writes.insert_row(db, Task, {"user_id": owner, "title": "write"}))
+        assert statements == ["INSERT"]
+        assert inspect(task).detached
+        assert (task.title, task.status) == ("write", TaskStatus.TODO)  # server-side defaults loaded
+        db.commit()
+        assert task.id is not None and task.created_at is not None  # not expired by the commit
+
+        assert writes.update_owned(db, Task, task.id, stranger, {"title": "stolen"}) is None
+        updated, statements = _statements(
+            lambda: writes.update_owned(db, Task, task.id, owner, {"status": TaskStatus.COMPLETED})
+        )
+        assert statements == (["UPDATE"] if returning else ["SELECT", "UPDATE"])
+        assert (updated.title, updated.status) == ("write", TaskStatus.COMPLETED)
+        assert inspect(updated).detached
+        # Extra criteria must hold for the row to be updated
+        assert writes.update_owned(
+            db, Task, task.id, owner, {"title": "again"}, Task.status == TaskStatus.TODO
+        ) is None
+        db.commit()
+
+        assert writes.delete_owned(db, Task, task.id, stranger) is None
+        deleted, statements = _statements(lambda: writes.delete_owned(db, Task, task.id, owner))
+        if returning:
+            assert statements == ["DELETE"]
+        else:  # the ORM also loads relationships before deleting
+            assert (statements[0], statements[-1]) == ("SELECT", "DELETE")
+        assert (deleted.id, deleted.status) == (task.id, TaskStatus.COMPLETED)
+        db.commit()
+        assert db.get(Task, task.id) is None
+        assert writes.delete_owned(db, Task, task.id, owner) is None
+    finally:
+        db.close()
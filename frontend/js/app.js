@@ -99,6 +99,14 @@ async function login() {
 
 function logout() {
     if (confirm('Are you sure you want to logout?')) {
+        if (accessToken) {
+            // Revoke the token server-side; the local session is cleared regardless
+            fetch(`${API_URL}/auth/logout`, {
+                method: 'POST',
+                headers: { 'Authorization': `Bearer ${accessToken}` },
+                keepalive: true
+            }).catch(() => {});
+        }
         accessToken = null;
         currentUser = {};
         localStorage.removeItem('accessToken');
@@ -115,10 +123,19 @@ function showApp() {
     document.getElementById('authContainer').style.display = 'none';
     document.getElementById('appContainer').style.display = 'block';
     document.getElementById('userEmail').textContent = currentUser.email || '';
-    loadNotes();
-    loadTasks();
-    loadEvents();
-    updateCounts();
+    loadBootstrap();
+}
+
+async function loadBootstrap() {
+    // Profile, counts and first pages of every list in a single request
+    const data = await apiCall('/bootstrap');
+    if (!data) {
+        return;
+    }
+    renderNotes(data.notes);
+    renderTasks(data.tasks);
+    renderEvents(data.events);
+    renderCounts(data.counts);
 }
 
 // ===========================
@@ -233,7 +250,12 @@ function hideAllForms() {
 // ===========================
 
 async function loadNotes() {
-    const notes = await apiCall('/notes');
+    const notes = await apiCall('/notes/summary');
+    renderNotes(notes);
+    updateCounts();
+}
+
+function renderNotes(notes) {
     const container = document.getElementById('notesList');
     
     if (!notes || notes.length === 0) {
@@ -250,7 +272,7 @@ async function loadNotes() {
     container.innerHTML = notes.map(note => `
         <div class="card">
             <h4>${escapeHtml(note.title)}</h4>
-            <p>${escapeHtml(note.content || 'No content')}</p>
+            <p>${escapeHtml(noteExcerpt(note))}</p>
             <div class="card-meta">
                 <small><i class="fas fa-clock"></i> ${formatDate(note.created_at)}</small>
                 <div class="card-actions">
@@ -261,7 +283,11 @@ async function loadNotes() {
             </div>
         </div>
     `).join('');
-    updateCounts();
+}
+
+function noteExcerpt(note) {
+    if (!note.excerpt) return 'No content';
+    return note.content_length > note.excerpt.length ? `${note.excerpt}…` : note.excerpt;
 }
 
 async function createNote() {
@@ -297,6 +323,11 @@ async function deleteNote(id) {
 
 async function loadTasks() {
     const tasks = await apiCall('/tasks');
+    renderTasks(tasks);
+    updateCounts();
+}
+
+function renderTasks(tasks) {
     const container = document.getElementById('tasksList');
     
     if (!tasks || tasks.length === 0) {
@@ -332,7 +363,6 @@ async function loadTasks() {
             </div>
         </div>
     `).join('');
-    updateCounts();
 }
 
 async function createTask() {
@@ -372,6 +402,11 @@ async function deleteTask(id) {
 
 async function loadEvents() {
     const events = await apiCall('/calendar');
+    renderEvents(events);
+    updateCounts();
+}
+
+function renderEvents(events) {
     const container = document.getElementById('eventsList');
     
     if (!events || events.length === 0) {
@@ -402,7 +437,6 @@ async function loadEvents() {
             </div>
         </div>
     `).join('');
-    updateCounts();
 }
 
 async function createEvent() {
@@ -452,17 +486,21 @@ async function deleteEvent(id) {
 // ===========================
 
 function updateCounts() {
-    apiCall('/notes').then(notes => {
-        document.getElementById('noteCount').textContent = notes ? notes.length : 0;
-    });
-    apiCall('/tasks').then(tasks => {
-        document.getElementById('taskCount').textContent = tasks ? tasks.length : 0;
-    });
-    apiCall('/calendar').then(events => {
-        document.getElementById('eventCount').textContent = events ? events.length : 0;
+    // Maintained server-side counters: one small request, exact for any data size
+    apiCall('/stats/counts').then(counts => {
+        if (counts) {
+            renderCounts(counts);
+        }
     });
 }
 
+function renderCounts(counts) {
+    document.getElementById('noteCount').textContent = counts.notes;
+    document.getElementById('taskCount').textContent = counts.tasks.total;
+    // All events, like the calendar list (bootstrap only prefetches upcoming ones)
+    document.getElementById('eventCount').textContent = counts.events;
+}
+
 function showSpinner() {
     document.getElementById('loadingSpinner').style.display = 'flex';
 }
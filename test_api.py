@@ -515,6 +515,137 @@ def main():
     except Exception as e:
         results.add_test("OpenAPI schema available", False, str(e))
     
+    # ========================================
+    # STEP 11: Session Bootstrap
+    # ========================================
+    print_header("🚀 STEP 11: Session Bootstrap")
+    
+    # Test 11.1: Single-request app state
+    try:
+        response = requests.get(f"{BASE_URL}/api/bootstrap/", headers=headers, timeout=5)
+        if response.status_code == 200:
+            data = response.json()
+            has_sections = all(key in data for key in ("user", "counts", "notes", "tasks", "events"))
+            if has_sections and data["user"].get("email") == TEST_EMAIL:
+                results.add_test("Bootstrap returns user, counts and lists", True,
+                                 f"Notes: {data['counts']['notes']}, Tasks: {data['counts']['tasks']['total']}")
+            else:
+                results.add_test("Bootstrap returns user, counts and lists", False, f"Keys: {list(data)}")
+        else:
+            results.add_test("Bootstrap returns user, counts and lists", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Bootstrap returns user, counts and lists", False, str(e))
+    
+    # ========================================
+    # STEP 12: Batch Operations
+    # ========================================
+    print_header("📦 STEP 12: Batch Operations")
+    
+    # Test 12.1: Batch create notes
+    batch_ids = []
+    try:
+        payload = {"create": [{"title": f"Batch note {i}", "content": "Created in bulk"} for i in range(5)]}
+        response = requests.post(f"{BASE_URL}/api/notes/batch", json=payload, headers=headers, timeout=5)
+        if response.status_code == 200 and len(response.json()["created"]) == 5:
+            batch_ids = [note["id"] for note in response.json()["created"]]
+            results.add_test("Batch create notes", True, f"IDs: {batch_ids}")
+        else:
+            results.add_test("Batch create notes", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Batch create notes", False, str(e))
+    
+    # Test 12.2: Atomic batch with a bad id is rejected as a whole
+    try:
+        payload = {"update": [{"id": batch_ids[0], "title": "Renamed"}], "delete": [999999]}
+        response = requests.post(f"{BASE_URL}/api/notes/batch", json=payload, headers=headers, timeout=5)
+        unchanged = requests.get(f"{BASE_URL}/api/notes/{batch_ids[0]}", headers=headers, timeout=5).json()
+        if response.status_code == 422 and unchanged["title"] == "Batch note 0":
+            results.add_test("Atomic batch rejected", True, "Nothing applied")
+        else:
+            results.add_test("Atomic batch rejected", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Atomic batch rejected", False, str(e))
+    
+    # Test 12.3: Non-atomic batch applies valid items and reports the rest
+    try:
+        payload = {"atomic": False, "delete": batch_ids + [999999]}
+        response = requests.post(f"{BASE_URL}/api/notes/batch", json=payload, headers=headers, timeout=5)
+        data = response.json()
+        if response.status_code == 200 and len(data["deleted"]) == 5 and len(data["errors"]) == 1:
+            results.add_test("Partial batch applied", True, f"Errors: {data['errors']}")
+        else:
+            results.add_test("Partial batch applied", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Partial batch applied", False, str(e))
+    
+    # ========================================
+    # STEP 13: Entity Counts
+    # ========================================
+    print_header("🔢 STEP 13: Entity Counts")
+    
+    # Test 13.1: Counters match the note list
+    try:
+        response = requests.get(f"{BASE_URL}/api/stats/counts", headers=headers, timeout=5)
+        notes_list = requests.get(f"{BASE_URL}/api/notes/", params={"limit": 100}, headers=headers, timeout=5).json()
+        if response.status_code == 200 and response.json()["notes"] == len(notes_list):
+            data = response.json()
+            results.add_test("Counts endpoint", True,
+                             f"Notes: {data['notes']}, Tasks: {data['tasks']['total']}, Events: {data['events']}")
+        else:
+            results.add_test("Counts endpoint", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Counts endpoint", False, str(e))
+    
+    # ========================================
+    # STEP 14: Full-Text Search
+    # ========================================
+    print_header("🔎 STEP 14: Full-Text Search")
+    
+    # Test 14.1: Search matches note content, not only titles
+    try:
+        created = requests.post(f"{BASE_URL}/api/notes/", json={
+            "title": "Search target",
+            "content": "zanzibar itinerary"
+        }, headers=headers, timeout=5).json()
+        response = requests.get(f"{BASE_URL}/api/notes/", params={"search": "zanzib"}, headers=headers, timeout=5)
+        if response.status_code == 200 and created["id"] in [note["id"] for note in response.json()]:
+            results.add_test("Full-text search", True, f"{len(response.json())} match(es)")
+        else:
+            results.add_test("Full-text search", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Full-text search", False, str(e))
+    
+    # ========================================
+    # STEP 15: Search Suggestions
+    # ========================================
+    print_header("💡 STEP 15: Search Suggestions")
+    
+    # Test 15.1: Prefix suggestions include the note created in step 14
+    try:
+        response = requests.get(f"{BASE_URL}/api/notes/suggest", params={"prefix": "searc"}, headers=headers, timeout=5)
+        if response.status_code == 200 and any(t["title"] == "Search target" for t in response.json()["titles"]):
+            results.add_test("Search suggestions", True, f"Terms: {response.json()['terms']}")
+        else:
+            results.add_test("Search suggestions", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Search suggestions", False, str(e))
+    
+    # ========================================
+    # STEP 16: Note Summaries
+    # ========================================
+    print_header("📋 STEP 16: Note Summaries")
+    
+    # Test 16.1: Summaries carry an excerpt instead of the full content
+    try:
+        response = requests.get(f"{BASE_URL}/api/notes/summary", headers=headers, timeout=5)
+        notes = response.json() if response.status_code == 200 else []
+        if notes and all("excerpt" in note and "content" not in note for note in notes):
+            results.add_test("Note summaries", True, f"{len(notes)} summaries")
+        else:
+            results.add_test("Note summaries", False, f"Status: {response.status_code}")
+    except Exception as e:
+        results.add_test("Note summaries", False, str(e))
+    
     # Print summary
     results.print_summary()
 